@@ -0,0 +1,130 @@
+"""Denormalize teacher/group onto lessons and enforce clash-free scheduling
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 10:00:00.000000
+
+Existing double-bookings must be resolved before upgrading, otherwise
+creating the unique indexes fails.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+ACTIVE_STATUSES = "status IN ('PLANNED', 'CONFIRMED')"
+
+
+def upgrade():
+    op.add_column('lesson_instances', sa.Column('teacher_id', sa.Integer(), nullable=True))
+    op.add_column('lesson_instances', sa.Column('group_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_lesson_instances_teacher_id', 'lesson_instances', 'teachers',
+        ['teacher_id'], ['teacher_id']
+    )
+    op.create_foreign_key(
+        'fk_lesson_instances_group_id', 'lesson_instances', 'groups',
+        ['group_id'], ['group_id']
+    )
+
+    # Backfill from enrollments
+    op.execute("""
+        UPDATE lesson_instances li
+        SET group_id = e.group_id,
+            teacher_id = ca.teacher_id
+        FROM enrollments e
+        JOIN course_assignments ca ON ca.assignment_id = e.assignment_id
+        WHERE e.enrollment_id = li.enrollment_id
+    """)
+
+    # Keep the denormalized columns in sync on lesson writes
+    op.execute("""
+        CREATE OR REPLACE FUNCTION lesson_instances_set_teacher_group() RETURNS trigger AS $$
+        BEGIN
+            SELECT e.group_id, ca.teacher_id
+            INTO NEW.group_id, NEW.teacher_id
+            FROM enrollments e
+            JOIN course_assignments ca ON ca.assignment_id = e.assignment_id
+            WHERE e.enrollment_id = NEW.enrollment_id;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_lesson_instances_set_teacher_group
+        BEFORE INSERT OR UPDATE OF enrollment_id ON lesson_instances
+        FOR EACH ROW EXECUTE FUNCTION lesson_instances_set_teacher_group();
+    """)
+
+    # ...and when an enrollment or assignment is re-pointed
+    op.execute("""
+        CREATE OR REPLACE FUNCTION enrollments_propagate_teacher_group() RETURNS trigger AS $$
+        BEGIN
+            UPDATE lesson_instances li
+            SET group_id = NEW.group_id,
+                teacher_id = ca.teacher_id
+            FROM course_assignments ca
+            WHERE ca.assignment_id = NEW.assignment_id
+              AND li.enrollment_id = NEW.enrollment_id;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_enrollments_propagate_teacher_group
+        AFTER UPDATE OF group_id, assignment_id ON enrollments
+        FOR EACH ROW EXECUTE FUNCTION enrollments_propagate_teacher_group();
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION course_assignments_propagate_teacher() RETURNS trigger AS $$
+        BEGIN
+            UPDATE lesson_instances li
+            SET teacher_id = NEW.teacher_id
+            FROM enrollments e
+            WHERE e.assignment_id = NEW.assignment_id
+              AND li.enrollment_id = e.enrollment_id;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_course_assignments_propagate_teacher
+        AFTER UPDATE OF teacher_id ON course_assignments
+        FOR EACH ROW EXECUTE FUNCTION course_assignments_propagate_teacher();
+    """)
+
+    op.create_index(
+        'uq_lesson_teacher_date_slot', 'lesson_instances',
+        ['org_id', 'date', 'slot_id', 'teacher_id'],
+        unique=True,
+        postgresql_where=sa.text(ACTIVE_STATUSES)
+    )
+    op.create_index(
+        'uq_lesson_group_date_slot', 'lesson_instances',
+        ['org_id', 'date', 'slot_id', 'group_id'],
+        unique=True,
+        postgresql_where=sa.text(ACTIVE_STATUSES)
+    )
+
+
+def downgrade():
+    op.drop_index('uq_lesson_group_date_slot', table_name='lesson_instances')
+    op.drop_index('uq_lesson_teacher_date_slot', table_name='lesson_instances')
+
+    op.execute("DROP TRIGGER IF EXISTS trg_course_assignments_propagate_teacher ON course_assignments")
+    op.execute("DROP FUNCTION IF EXISTS course_assignments_propagate_teacher()")
+    op.execute("DROP TRIGGER IF EXISTS trg_enrollments_propagate_teacher_group ON enrollments")
+    op.execute("DROP FUNCTION IF EXISTS enrollments_propagate_teacher_group()")
+    op.execute("DROP TRIGGER IF EXISTS trg_lesson_instances_set_teacher_group ON lesson_instances")
+    op.execute("DROP FUNCTION IF EXISTS lesson_instances_set_teacher_group()")
+
+    op.drop_constraint('fk_lesson_instances_group_id', 'lesson_instances', type_='foreignkey')
+    op.drop_constraint('fk_lesson_instances_teacher_id', 'lesson_instances', type_='foreignkey')
+    op.drop_column('lesson_instances', 'group_id')
+    op.drop_column('lesson_instances', 'teacher_id')
@@ -0,0 +1,92 @@
+"""Add incrementally maintained workload rollups
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+# Aggregate a lesson transition table into signed per-(teacher|group, week, status) deltas
+ROLLUP_DELTA_SQL = """
+    INSERT INTO workload_rollups (org_id, kind, resource_id, week_start, status, lesson_count, minutes)
+    SELECT l.org_id, k.kind, k.resource_id, date_trunc('week', l.date)::date, l.status,
+           {sign} count(*),
+           {sign} coalesce(sum((EXTRACT(EPOCH FROM ts.end_time - ts.start_time) / 60)::int), 0)
+    FROM {rows} l
+    JOIN time_slots ts ON ts.slot_id = l.slot_id
+    CROSS JOIN LATERAL (VALUES ('teacher', l.teacher_id), ('group', l.group_id)) AS k(kind, resource_id)
+    WHERE k.resource_id IS NOT NULL
+    GROUP BY 1, 2, 3, 4, 5
+    ON CONFLICT (org_id, kind, resource_id, week_start, status) DO UPDATE
+    SET lesson_count = workload_rollups.lesson_count + EXCLUDED.lesson_count,
+        minutes = workload_rollups.minutes + EXCLUDED.minutes;
+"""
+
+
+def upgrade():
+    op.create_table('workload_rollups',
+        sa.Column('org_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=10), nullable=False),
+        sa.Column('resource_id', sa.Integer(), nullable=False),
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.Column('status', postgresql.ENUM('PLANNED', 'CONFIRMED', 'COMPLETED', 'CANCELLED', 'SKIPPED', 'MOVED', name='lessonstatus', create_type=False), nullable=False),
+        sa.Column('lesson_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('minutes', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['org_id'], ['organizations.org_id'], ),
+        sa.PrimaryKeyConstraint('org_id', 'kind', 'resource_id', 'week_start', 'status')
+    )
+
+    # Statement-level triggers see the whole batch via transition tables, so a
+    # bulk generation apply costs one upsert per statement rather than per row
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION workload_rollups_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                {ROLLUP_DELTA_SQL.format(sign='-', rows='old_rows')}
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                {ROLLUP_DELTA_SQL.format(sign='', rows='new_rows')}
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_workload_rollups_insert
+        AFTER INSERT ON lesson_instances
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION workload_rollups_apply();
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_workload_rollups_update
+        AFTER UPDATE ON lesson_instances
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION workload_rollups_apply();
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_workload_rollups_delete
+        AFTER DELETE ON lesson_instances
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION workload_rollups_apply();
+    """)
+
+    # Backfill from existing lessons
+    op.execute(ROLLUP_DELTA_SQL.format(sign='', rows='lesson_instances'))
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_workload_rollups_delete ON lesson_instances")
+    op.execute("DROP TRIGGER IF EXISTS trg_workload_rollups_update ON lesson_instances")
+    op.execute("DROP TRIGGER IF EXISTS trg_workload_rollups_insert ON lesson_instances")
+    op.execute("DROP FUNCTION IF EXISTS workload_rollups_apply()")
+    op.drop_table('workload_rollups')
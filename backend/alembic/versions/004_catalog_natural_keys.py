@@ -0,0 +1,37 @@
+"""Unique natural keys for catalog upserts
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 12:00:00.000000
+
+Backs INSERT ... ON CONFLICT in the catalog import. Duplicate rooms,
+courses, course assignments or enrollments must be merged before
+upgrading, otherwise creating the constraints fails.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_unique_constraint('uq_org_room_number', 'rooms', ['org_id', 'number'])
+    op.create_unique_constraint('uq_org_course_name', 'courses', ['org_id', 'name'])
+    op.create_unique_constraint(
+        'uq_org_assignment_course_teacher', 'course_assignments', ['org_id', 'course_id', 'teacher_id']
+    )
+    op.create_unique_constraint(
+        'uq_org_enrollment_assignment_group', 'enrollments', ['org_id', 'assignment_id', 'group_id']
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_org_enrollment_assignment_group', 'enrollments', type_='unique')
+    op.drop_constraint('uq_org_assignment_course_teacher', 'course_assignments', type_='unique')
+    op.drop_constraint('uq_org_course_name', 'courses', type_='unique')
+    op.drop_constraint('uq_org_room_number', 'rooms', type_='unique')
@@ -0,0 +1,82 @@
+"""Add per-organization schedule versions
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+# Tables whose writes change what a published schedule looks like
+VERSIONED_TABLES = ('lesson_instances', 'time_slots')
+
+
+def upgrade():
+    op.create_table('schedule_versions',
+        sa.Column('org_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['org_id'], ['organizations.org_id'], ),
+        sa.PrimaryKeyConstraint('org_id')
+    )
+
+    # One bump per statement and organization, however many rows it touched
+    op.execute("""
+        CREATE OR REPLACE FUNCTION schedule_versions_bump() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                INSERT INTO schedule_versions (org_id, version, updated_at)
+                SELECT DISTINCT org_id, 1, now() FROM old_rows
+                ON CONFLICT (org_id) DO UPDATE
+                SET version = schedule_versions.version + 1, updated_at = now();
+            ELSE
+                INSERT INTO schedule_versions (org_id, version, updated_at)
+                SELECT DISTINCT org_id, 1, now() FROM new_rows
+                ON CONFLICT (org_id) DO UPDATE
+                SET version = schedule_versions.version + 1, updated_at = now();
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in VERSIONED_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_version_insert
+            AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION schedule_versions_bump();
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_version_update
+            AFTER UPDATE ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION schedule_versions_bump();
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_version_delete
+            AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION schedule_versions_bump();
+        """)
+
+    op.execute("""
+        INSERT INTO schedule_versions (org_id, version)
+        SELECT org_id, 1 FROM organizations
+    """)
+
+
+def downgrade():
+    for table in VERSIONED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_version_delete ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_version_update ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_version_insert ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS schedule_versions_bump()")
+    op.drop_table('schedule_versions')
@@ -0,0 +1,104 @@
+"""Per-organization lesson change sequence for delta sync
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 14:00:00.000000
+
+Every insert, update or delete of a lesson takes the next value of its
+organization's change sequence. The counter lives on the organization's
+schedule_versions row, whose row lock serializes concurrent writers, so
+sequence order matches commit order and a client that has synced up to N
+never misses a change numbered below N that commits later.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+NEXT_CHANGE_SEQ_SQL = """
+    INSERT INTO schedule_versions (org_id, version, change_seq)
+    VALUES ({org_id}, 0, 1)
+    ON CONFLICT (org_id) DO UPDATE SET change_seq = schedule_versions.change_seq + 1
+    RETURNING change_seq INTO {target};
+"""
+
+
+def upgrade():
+    op.add_column('schedule_versions', sa.Column('change_seq', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('lesson_instances', sa.Column('change_seq', sa.BigInteger(), nullable=True))
+
+    op.create_table('lesson_tombstones',
+        sa.Column('org_id', sa.Integer(), nullable=False),
+        sa.Column('lesson_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['org_id'], ['organizations.org_id'], ),
+        sa.PrimaryKeyConstraint('org_id', 'change_seq')
+    )
+
+    # Number existing lessons before the triggers exist, so a first sync from 0 returns them
+    op.execute("""
+        WITH numbered AS (
+            SELECT lesson_id, row_number() OVER (PARTITION BY org_id ORDER BY lesson_id) AS seq
+            FROM lesson_instances
+        )
+        UPDATE lesson_instances l SET change_seq = numbered.seq
+        FROM numbered WHERE numbered.lesson_id = l.lesson_id
+    """)
+    op.execute("""
+        INSERT INTO schedule_versions (org_id, version, change_seq)
+        SELECT org_id, 0, max(change_seq) FROM lesson_instances GROUP BY org_id
+        ON CONFLICT (org_id) DO UPDATE SET change_seq = EXCLUDED.change_seq
+    """)
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION lesson_instances_stamp_change() RETURNS trigger AS $$
+        BEGIN
+            {NEXT_CHANGE_SEQ_SQL.format(org_id='NEW.org_id', target='NEW.change_seq')}
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_lesson_instances_change_seq
+        BEFORE INSERT OR UPDATE ON lesson_instances
+        FOR EACH ROW EXECUTE FUNCTION lesson_instances_stamp_change();
+    """)
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION lesson_instances_tombstone() RETURNS trigger AS $$
+        DECLARE
+            seq BIGINT;
+        BEGIN
+            {NEXT_CHANGE_SEQ_SQL.format(org_id='OLD.org_id', target='seq')}
+            INSERT INTO lesson_tombstones (org_id, lesson_id, date, change_seq)
+            VALUES (OLD.org_id, OLD.lesson_id, OLD.date, seq);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_lesson_instances_tombstone
+        AFTER DELETE ON lesson_instances
+        FOR EACH ROW EXECUTE FUNCTION lesson_instances_tombstone();
+    """)
+
+    op.create_index('ix_lesson_instances_org_change_seq', 'lesson_instances', ['org_id', 'change_seq'])
+
+
+def downgrade():
+    op.drop_index('ix_lesson_instances_org_change_seq', table_name='lesson_instances')
+    op.execute("DROP TRIGGER IF EXISTS trg_lesson_instances_tombstone ON lesson_instances")
+    op.execute("DROP TRIGGER IF EXISTS trg_lesson_instances_change_seq ON lesson_instances")
+    op.execute("DROP FUNCTION IF EXISTS lesson_instances_tombstone()")
+    op.execute("DROP FUNCTION IF EXISTS lesson_instances_stamp_change()")
+    op.drop_table('lesson_tombstones')
+    op.drop_column('lesson_instances', 'change_seq')
+    op.drop_column('schedule_versions', 'change_seq')
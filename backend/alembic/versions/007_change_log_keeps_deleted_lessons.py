@@ -0,0 +1,30 @@
+"""Keep audit records of deleted lessons
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 16:00:00.000000
+
+change_logs is written in batches after the lesson change commits, and
+the history of a deleted lesson is worth keeping, so the foreign key to
+lesson_instances goes away.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_constraint('change_logs_lesson_id_fkey', 'change_logs', type_='foreignkey')
+
+
+def downgrade():
+    op.execute("DELETE FROM change_logs WHERE lesson_id NOT IN (SELECT lesson_id FROM lesson_instances)")
+    op.create_foreign_key(
+        'change_logs_lesson_id_fkey', 'change_logs', 'lesson_instances', ['lesson_id'], ['lesson_id']
+    )
@@ -0,0 +1,209 @@
+"""Range-partition lesson_instances by date and change_logs by created_at
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 18:00:00.000000
+
+Both tables become declaratively partitioned by calendar month, so queries
+filtered by date only scan the partitions of the months they touch and
+old months can be detached and archived without a bulk DELETE.
+
+The tables are rebuilt: each is renamed away, recreated as a partitioned
+table with the same columns, refilled and dropped. Both are locked for the
+duration, so run this in a maintenance window. Partitions are created
+for every month holding data plus PREMAKE_MONTHS ahead, with a DEFAULT
+partition catching anything outside; scripts/maintain_partitions.py keeps
+creating months ahead afterwards.
+
+Partitioned tables need the partition key in every unique constraint, so
+the primary keys become (lesson_id, date) and (id, created_at). Nothing
+references either table by foreign key any more.
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+PREMAKE_MONTHS = 12
+
+ACTIVE_STATUSES = "status IN ('PLANNED', 'CONFIRMED')"
+
+# Constraint names as created by earlier revisions, so their downgrades still apply
+LESSON_FOREIGN_KEYS = (
+    ('lesson_instances_created_by_fkey', 'created_by', 'users', 'user_id'),
+    ('lesson_instances_enrollment_id_fkey', 'enrollment_id', 'enrollments', 'enrollment_id'),
+    ('lesson_instances_org_id_fkey', 'org_id', 'organizations', 'org_id'),
+    ('lesson_instances_room_id_fkey', 'room_id', 'rooms', 'room_id'),
+    ('lesson_instances_slot_id_fkey', 'slot_id', 'time_slots', 'slot_id'),
+    ('lesson_instances_term_id_fkey', 'term_id', 'terms', 'term_id'),
+    ('lesson_instances_updated_by_fkey', 'updated_by', 'users', 'user_id'),
+    ('fk_lesson_instances_teacher_id', 'teacher_id', 'teachers', 'teacher_id'),
+    ('fk_lesson_instances_group_id', 'group_id', 'groups', 'group_id'),
+)
+
+LESSON_INDEXES = (
+    'date', 'enrollment_id', 'lesson_id', 'org_id', 'room_id', 'slot_id', 'status', 'term_id'
+)
+
+CHANGE_LOG_FOREIGN_KEYS = (
+    ('org_id', 'organizations', 'org_id'),
+    ('user_id', 'users', 'user_id'),
+)
+
+CHANGE_LOG_INDEXES = ('created_at', 'id', 'lesson_id', 'org_id', 'user_id')
+
+# Triggers created on lesson_instances by earlier revisions
+LESSON_TRIGGERS = (
+    """CREATE TRIGGER trg_lesson_instances_set_teacher_group
+       BEFORE INSERT OR UPDATE OF enrollment_id ON lesson_instances
+       FOR EACH ROW EXECUTE FUNCTION lesson_instances_set_teacher_group()""",
+    """CREATE TRIGGER trg_lesson_instances_change_seq
+       BEFORE INSERT OR UPDATE ON lesson_instances
+       FOR EACH ROW EXECUTE FUNCTION lesson_instances_stamp_change()""",
+    """CREATE TRIGGER trg_lesson_instances_tombstone
+       AFTER DELETE ON lesson_instances
+       FOR EACH ROW EXECUTE FUNCTION lesson_instances_tombstone()""",
+    """CREATE TRIGGER trg_workload_rollups_insert
+       AFTER INSERT ON lesson_instances
+       REFERENCING NEW TABLE AS new_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION workload_rollups_apply()""",
+    """CREATE TRIGGER trg_workload_rollups_update
+       AFTER UPDATE ON lesson_instances
+       REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION workload_rollups_apply()""",
+    """CREATE TRIGGER trg_workload_rollups_delete
+       AFTER DELETE ON lesson_instances
+       REFERENCING OLD TABLE AS old_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION workload_rollups_apply()""",
+    """CREATE TRIGGER trg_lesson_instances_version_insert
+       AFTER INSERT ON lesson_instances
+       REFERENCING NEW TABLE AS new_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION schedule_versions_bump()""",
+    """CREATE TRIGGER trg_lesson_instances_version_update
+       AFTER UPDATE ON lesson_instances
+       REFERENCING NEW TABLE AS new_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION schedule_versions_bump()""",
+    """CREATE TRIGGER trg_lesson_instances_version_delete
+       AFTER DELETE ON lesson_instances
+       REFERENCING OLD TABLE AS old_rows
+       FOR EACH STATEMENT EXECUTE FUNCTION schedule_versions_bump()""",
+)
+
+
+def _create_monthly_partitions(table, column, timestamp):
+    """Create month partitions covering existing rows and PREMAKE_MONTHS ahead, plus a default."""
+    bound = "(month::timestamp AT TIME ZONE 'UTC')" if timestamp else "month"
+    next_bound = (
+        "((month + interval '1 month')::timestamp AT TIME ZONE 'UTC')" if timestamp
+        else "(month + interval '1 month')::date"
+    )
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', coalesce((SELECT min({column}) FROM {table}_old), now())),
+                    date_trunc('month', greatest((SELECT max({column}) FROM {table}_old), now()))
+                        + interval '{PREMAKE_MONTHS} months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_p' || to_char(month, 'YYYY_MM'), {bound}, {next_bound}
+                );
+            END LOOP;
+        END $$;
+    """)
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def _rebuild(table, id_column, partition_column=None, timestamp=False):
+    """Recreate a table with the same columns, partitioned or not, and copy its rows over.
+
+    Indexes, constraints and triggers of the old table are dropped with it
+    and have to be recreated by the caller.
+    """
+    partition_clause = f"PARTITION BY RANGE ({partition_column})" if partition_column else ""
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+    op.execute(f"CREATE TABLE {table} (LIKE {table}_old INCLUDING DEFAULTS) {partition_clause}")
+    if partition_column:
+        _create_monthly_partitions(table, partition_column, timestamp)
+    op.execute(f"INSERT INTO {table} SELECT * FROM {table}_old")
+    # The id sequence belongs to the old table and would be dropped with it
+    op.execute(f"ALTER SEQUENCE {table}_{id_column}_seq OWNED BY {table}.{id_column}")
+    op.execute(f"DROP TABLE {table}_old")
+
+
+def _create_lesson_constraints(primary_key):
+    op.create_primary_key('lesson_instances_pkey', 'lesson_instances', list(primary_key))
+    op.create_unique_constraint(
+        'uq_org_date_slot_room', 'lesson_instances', ['org_id', 'date', 'slot_id', 'room_id']
+    )
+    for name, column, referred_table, referred_column in LESSON_FOREIGN_KEYS:
+        op.create_foreign_key(name, 'lesson_instances', referred_table, [column], [referred_column])
+    for column in LESSON_INDEXES:
+        op.create_index(f'ix_lesson_instances_{column}', 'lesson_instances', [column])
+    op.create_index('ix_lesson_instances_org_change_seq', 'lesson_instances', ['org_id', 'change_seq'])
+    for kind in ('teacher', 'group'):
+        op.execute(f"""
+            CREATE UNIQUE INDEX uq_lesson_{kind}_date_slot ON lesson_instances
+            (org_id, date, slot_id, {kind}_id) WHERE {ACTIVE_STATUSES}
+        """)
+    for trigger in LESSON_TRIGGERS:
+        op.execute(trigger)
+
+
+def _create_change_log_constraints(primary_key):
+    op.create_primary_key('change_logs_pkey', 'change_logs', list(primary_key))
+    for column, referred_table, referred_column in CHANGE_LOG_FOREIGN_KEYS:
+        op.create_foreign_key(
+            f'change_logs_{column}_fkey', 'change_logs', referred_table, [column], [referred_column]
+        )
+    for column in CHANGE_LOG_INDEXES:
+        op.create_index(f'ix_change_logs_{column}', 'change_logs', [column])
+
+
+def upgrade():
+    # A lesson moved to another month is deleted from one partition and inserted
+    # into another; it is still there when this fires and must not get a tombstone
+    op.execute("""
+        CREATE OR REPLACE FUNCTION lesson_instances_tombstone() RETURNS trigger AS $$
+        DECLARE
+            seq BIGINT;
+        BEGIN
+            IF EXISTS (SELECT 1 FROM lesson_instances WHERE lesson_id = OLD.lesson_id) THEN
+                RETURN NULL;
+            END IF;
+            INSERT INTO schedule_versions (org_id, version, change_seq)
+            VALUES (OLD.org_id, 0, 1)
+            ON CONFLICT (org_id) DO UPDATE SET change_seq = schedule_versions.change_seq + 1
+            RETURNING change_seq INTO seq;
+            INSERT INTO lesson_tombstones (org_id, lesson_id, date, change_seq)
+            VALUES (OLD.org_id, OLD.lesson_id, OLD.date, seq);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    _rebuild('lesson_instances', 'lesson_id', partition_column='date')
+    _create_lesson_constraints(('lesson_id', 'date'))
+
+    _rebuild('change_logs', 'id', partition_column='created_at', timestamp=True)
+    _create_change_log_constraints(('id', 'created_at'))
+
+
+def downgrade():
+    # Archived partitions are not brought back; only attached rows survive
+    _rebuild('change_logs', 'id')
+    _create_change_log_constraints(('id',))
+
+    _rebuild('lesson_instances', 'lesson_id')
+    _create_lesson_constraints(('lesson_id',))
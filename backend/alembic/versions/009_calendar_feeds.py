@@ -0,0 +1,42 @@
+"""Add revocable calendar feed links
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-20 09:00:00.000000
+
+Feed tokens now name a calendar_feeds row, so one link can be revoked
+without rotating JWT_SECRET. Tokens handed out before this revision
+carry no feed_id and stop working.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('calendar_feeds',
+        sa.Column('feed_id', sa.Integer(), nullable=False),
+        sa.Column('org_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=10), nullable=False),
+        sa.Column('resource_id', sa.Integer(), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['org_id'], ['organizations.org_id'], ),
+        sa.ForeignKeyConstraint(['created_by'], ['users.user_id'], ),
+        sa.PrimaryKeyConstraint('feed_id')
+    )
+    op.create_index(op.f('ix_calendar_feeds_feed_id'), 'calendar_feeds', ['feed_id'], unique=False)
+    op.create_index(op.f('ix_calendar_feeds_org_id'), 'calendar_feeds', ['org_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_calendar_feeds_org_id'), table_name='calendar_feeds')
+    op.drop_index(op.f('ix_calendar_feeds_feed_id'), table_name='calendar_feeds')
+    op.drop_table('calendar_feeds')
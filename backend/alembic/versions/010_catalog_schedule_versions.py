@@ -0,0 +1,51 @@
+"""Bump schedule versions on catalog writes
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-20 09:30:00.000000
+
+Feeds show course, teacher, group and room names, and which teacher and
+group an enrollment stands for, so writes to those tables change the
+published schedule as much as lesson writes do. They get the statement
+triggers of revision 005.
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+CATALOG_TABLES = ('courses', 'teachers', 'groups', 'rooms', 'course_assignments', 'enrollments')
+
+
+def upgrade():
+    for table in CATALOG_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_version_insert
+            AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION schedule_versions_bump();
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_version_update
+            AFTER UPDATE ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION schedule_versions_bump();
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_version_delete
+            AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION schedule_versions_bump();
+        """)
+
+
+def downgrade():
+    for table in CATALOG_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_version_delete ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_version_update ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_version_insert ON {table}")
@@ -0,0 +1,128 @@
+"""Number lesson changes from a sequence instead of a locked counter
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-20 10:00:00.000000
+
+Revision 006 took each change number from a counter on the organization's
+schedule_versions row. Its row lock kept number order equal to commit
+order, but it also serialized every lesson write of an organization until
+commit.
+
+Change numbers now come from the lesson_change_seq sequence, which takes
+no lock, and every lesson and tombstone also records the id of the
+transaction that wrote it. Number order no longer matches commit order,
+so /lessons/changes only returns changes of transactions older than every
+transaction still running, and hands that horizon back to the client so
+the next call also picks up lower numbers committed in between. Rows
+written before this revision get transaction id 0.
+
+schedule_versions.change_seq gives way to pruned_change_seq, the highest
+tombstone number removed by retention (scripts/maintain_partitions.py).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+# Transaction id of the current transaction as a bigint; xid8 never wraps around
+CURRENT_XID_SQL = "pg_current_xact_id()::text::bigint"
+
+
+def upgrade():
+    op.execute("CREATE SEQUENCE lesson_change_seq")
+    op.execute("""
+        SELECT setval('lesson_change_seq', greatest(
+            (SELECT max(change_seq) FROM schedule_versions),
+            (SELECT max(change_seq) FROM lesson_tombstones),
+            1
+        ))
+    """)
+
+    # A constant default fills existing rows without rewriting the tables
+    op.add_column('lesson_instances', sa.Column('change_xid', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('lesson_tombstones', sa.Column('change_xid', sa.BigInteger(), nullable=False, server_default='0'))
+    op.create_index('ix_lesson_instances_org_change_xid', 'lesson_instances', ['org_id', 'change_xid'])
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION lesson_instances_stamp_change() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_seq := nextval('lesson_change_seq');
+            NEW.change_xid := {CURRENT_XID_SQL};
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    # Same as revision 008 apart from where the number comes from
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION lesson_instances_tombstone() RETURNS trigger AS $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM lesson_instances WHERE lesson_id = OLD.lesson_id) THEN
+                RETURN NULL;
+            END IF;
+            INSERT INTO lesson_tombstones (org_id, lesson_id, date, change_seq, change_xid)
+            VALUES (OLD.org_id, OLD.lesson_id, OLD.date, nextval('lesson_change_seq'), {CURRENT_XID_SQL});
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.drop_column('schedule_versions', 'change_seq')
+    op.add_column('schedule_versions', sa.Column('pruned_change_seq', sa.BigInteger(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('schedule_versions', 'pruned_change_seq')
+    op.add_column('schedule_versions', sa.Column('change_seq', sa.BigInteger(), nullable=False, server_default='0'))
+    op.execute("""
+        INSERT INTO schedule_versions (org_id, version, change_seq)
+        SELECT org_id, 0, max(change_seq) FROM (
+            SELECT org_id, change_seq FROM lesson_instances
+            UNION ALL
+            SELECT org_id, change_seq FROM lesson_tombstones
+        ) numbered
+        WHERE change_seq IS NOT NULL
+        GROUP BY org_id
+        ON CONFLICT (org_id) DO UPDATE SET change_seq = EXCLUDED.change_seq
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION lesson_instances_stamp_change() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO schedule_versions (org_id, version, change_seq)
+            VALUES (NEW.org_id, 0, 1)
+            ON CONFLICT (org_id) DO UPDATE SET change_seq = schedule_versions.change_seq + 1
+            RETURNING change_seq INTO NEW.change_seq;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION lesson_instances_tombstone() RETURNS trigger AS $$
+        DECLARE
+            seq BIGINT;
+        BEGIN
+            IF EXISTS (SELECT 1 FROM lesson_instances WHERE lesson_id = OLD.lesson_id) THEN
+                RETURN NULL;
+            END IF;
+            INSERT INTO schedule_versions (org_id, version, change_seq)
+            VALUES (OLD.org_id, 0, 1)
+            ON CONFLICT (org_id) DO UPDATE SET change_seq = schedule_versions.change_seq + 1
+            RETURNING change_seq INTO seq;
+            INSERT INTO lesson_tombstones (org_id, lesson_id, date, change_seq)
+            VALUES (OLD.org_id, OLD.lesson_id, OLD.date, seq);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.drop_index('ix_lesson_instances_org_change_xid', table_name='lesson_instances')
+    op.drop_column('lesson_tombstones', 'change_xid')
+    op.drop_column('lesson_instances', 'change_xid')
+    op.execute("DROP SEQUENCE IF EXISTS lesson_change_seq")
@@ -1,8 +1,11 @@
 """Authentication and authorization utilities."""
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
+import asyncio
 import hashlib
+import time
 
 import bcrypt
 from jose import JWTError, jwt
@@ -11,7 +14,9 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from .config import settings
 from .database import get_db
-from ..models.user import User
+from .user_cache import user_cache, detached_user
+from ..models.user import User, UserRole
+from ..models.scheduling import CalendarFeed
 from ..repositories.user import UserRepository
 
 # JWT
@@ -51,18 +56,86 @@ def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(_hash_secret(password), bcrypt.gensalt()).decode("utf-8")
 
 
+class PasswordHashExecutor:
+    """Bounded thread pool for bcrypt work.
+    
+    bcrypt releases the GIL, so hashing in worker threads keeps the event
+    loop free for other requests. Work beyond the worker count queues up
+    to ``max_queue`` tasks; further calls are rejected with 503.
+    """
+    
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="password-hash"
+        )
+    
+    @property
+    def queue_depth(self) -> int:
+        """Number of tasks waiting for a free worker."""
+        return max(0, self.in_flight - self.max_workers)
+    
+    def stats(self) -> dict:
+        """Snapshot of executor load for health and metrics endpoints."""
+        return {
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected
+        }
+    
+    async def run(self, func, *args):
+        """Run a password function in the pool, rejecting when saturated."""
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent authentication requests",
+                headers={"Retry-After": "1"},
+            )
+        
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+
+
+password_executor = PasswordHashExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password off the event loop."""
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password off the event loop."""
+    return await password_executor.run(get_password_hash, password)
+
+
 def create_access_token(
     data: dict, 
     expires_delta: Optional[timedelta] = None
 ) -> str:
     """Create JWT access token."""
     to_encode = data.copy()
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(seconds=settings.JWT_EXPIRES)
+        expire = now + timedelta(seconds=settings.JWT_EXPIRES)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": now})
     encoded_jwt = jwt.encode(
         to_encode, 
         settings.JWT_SECRET, 
@@ -71,6 +144,65 @@ def create_access_token(
     return encoded_jwt
 
 
+def create_user_access_token(
+    user: User,
+    expires_delta: Optional[timedelta] = None
+) -> str:
+    """Create JWT access token carrying the claims handlers need."""
+    return create_access_token(
+        data={
+            "sub": str(user.user_id),
+            "org_id": user.org_id,
+            "email": user.email,
+            "role": user.role.value if isinstance(user.role, UserRole) else user.role,
+            "is_active": user.is_active
+        },
+        expires_delta=expires_delta
+    )
+
+
+def create_feed_token(feed: CalendarFeed) -> str:
+    """Create a token for a calendar subscription URL.
+    
+    Calendar apps cannot send Authorization headers, so the feed URL itself
+    grants read access to one resource's schedule. The link stops working
+    when its CalendarFeed row is revoked or after ICAL_FEED_EXPIRES_DAYS.
+    """
+    payload = {
+        "scope": "ical",
+        "feed_id": feed.feed_id,
+        "org_id": feed.org_id,
+        "kind": feed.kind,
+        "resource_id": feed.resource_id
+    }
+    if settings.ICAL_FEED_EXPIRES_DAYS is not None:
+        payload["exp"] = datetime.utcnow() + timedelta(days=settings.ICAL_FEED_EXPIRES_DAYS)
+    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+
+
+async def decode_feed_token(token: str, db: AsyncSession) -> CalendarFeed:
+    """Resolve a calendar feed token to its feed, 404 if expired or revoked."""
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        payload = {}
+    
+    feed = None
+    if payload.get("scope") == "ical" and "feed_id" in payload:
+        feed = await db.get(CalendarFeed, payload["feed_id"])
+    if (
+        feed is None
+        or feed.revoked_at is not None
+        or (feed.org_id, feed.kind, feed.resource_id)
+        != (payload["org_id"], payload["kind"], payload["resource_id"])
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Calendar feed not found"
+        )
+    return feed
+
+
 def decode_token(token: str) -> dict:
     """Decode JWT token."""
     try:
@@ -88,6 +220,49 @@ def decode_token(token: str) -> dict:
         )
 
 
+def _user_from_claims(payload: dict) -> Optional[User]:
+    """Build a detached user from token claims if they are complete and fresh."""
+    if not all(key in payload for key in ("org_id", "email", "role", "is_active", "iat")):
+        return None
+    
+    user_id = int(payload["sub"])
+    issued_at = float(payload["iat"])
+    if time.time() - issued_at > settings.AUTH_CLAIMS_MAX_AGE_SECONDS:
+        return None
+    if user_cache.invalidated_since(user_id, issued_at):
+        return None
+    
+    return detached_user({
+        "user_id": user_id,
+        "org_id": payload["org_id"],
+        "email": payload["email"],
+        "role": UserRole(payload["role"]),
+        "is_active": payload["is_active"]
+    })
+
+
+async def _resolve_user(payload: dict, db: AsyncSession) -> User:
+    """Resolve the token's user from claims, the user cache or the database."""
+    user = _user_from_claims(payload)
+    if user is not None:
+        return user
+    
+    user_id = int(payload["sub"])
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    
+    user_repo = UserRepository(db)
+    user = await user_repo.get_by_id(user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    user_cache.set(user)
+    return user
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
@@ -107,14 +282,7 @@ async def get_current_user(
             detail="Could not validate credentials"
         )
     
-    user_repo = UserRepository(db)
-    user = await user_repo.get_by_id(int(user_id))
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    return user
+    return await _resolve_user(payload, db)
 
 
 async def get_current_active_user(
@@ -134,8 +302,17 @@ async def get_current_user_or_demo(
     db: AsyncSession = Depends(get_db)
 ) -> User:
     """Get current user or return demo user for demo tokens."""
+    return await user_from_token_or_demo(credentials.credentials, db)
+
+
+async def user_from_token_or_demo(token: str, db: AsyncSession) -> User:
+    """Resolve a raw access token the way get_current_user_or_demo does.
+    
+    Used directly by SSE and WebSocket endpoints, whose clients pass the
+    token as a query parameter instead of an Authorization header.
+    """
     try:
-        payload = decode_token(credentials.credentials)
+        payload = decode_token(token)
         user_id: str = payload.get("sub")
         org_id: int = payload.get("org_id", 1)
         
@@ -161,14 +338,8 @@ async def get_current_user_or_demo(
         demo_user.is_active = True
         return demo_user
     
-    # For real users, look up in database
-    user_repo = UserRepository(db)
-    user = await user_repo.get_by_id(int(user_id))
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
+    # For real users, resolve from claims, cache or database
+    user = await _resolve_user(payload, db)
     
     # Ensure all users use org_id = 1 for consistency
     user.org_id = 1
@@ -11,11 +11,36 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Per worker process; total connections = workers * (pool size + overflow)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Connections go through pgbouncer in transaction mode (disables statement caching)
+    DB_PGBOUNCER: bool = False
+    DB_POOL_WARMUP_CONNECTIONS: int = 5
+    # Optional streaming replica for read-only endpoints
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 2.0
     
     # JWT
     JWT_SECRET: str = secrets.token_urlsafe(32)
     JWT_EXPIRES: int = 3600
     JWT_ALGORITHM: str = "HS256"
+    # Tokens younger than this are trusted on their claims without a user lookup.
+    # Run several workers with SCHEDULE_EVENTS_BACKEND=postgres so role changes
+    # and deactivations reach every worker's user cache.
+    AUTH_CLAIMS_MAX_AGE_SECONDS: int = 300
+    USER_CACHE_TTL_SECONDS: int = 60
+    # Lifetime of calendar feed links; None keeps them valid until revoked
+    ICAL_FEED_EXPIRES_DAYS: Optional[int] = 365
+    
+    # Password hashing (bcrypt runs in a bounded thread pool)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 64
     
     # Organization defaults
     ORG_DEFAULT_LOCALE: str = "ru"
@@ -39,10 +64,52 @@ class Settings(BaseSettings):
     # App settings
     DEBUG: bool = False
     LOG_LEVEL: str = "INFO"
+    # Query count and DB time per request in a Server-Timing header
+    SERVER_TIMING_ENABLED: bool = True
+    # Requests running more statements than this are logged as warnings
+    REQUEST_QUERY_WARNING_COUNT: int = 50
+    # Prometheus scrape endpoint at /metrics; keep it off the public proxy
+    METRICS_ENABLED: bool = True
+    # Stack sampling of slow requests, or of an admin's requests sent with the debug header
+    PROFILING_ENABLED: bool = False
+    PROFILING_SLOW_REQUEST_SECONDS: Optional[float] = 2.0
+    PROFILING_SAMPLE_INTERVAL_MS: int = 10
+    # Share of requests watched for slowness, and how many are sampled at once
+    PROFILING_SAMPLE_RATE: float = 0.1
+    PROFILING_MAX_ACTIVE_REQUESTS: int = 16
+    PROFILING_MAX_DUMPS_PER_MINUTE: int = 6
+    PROFILING_MAX_FILES: int = 500
+    PROFILING_DEBUG_HEADER: str = "X-Debug-Profile"
+    # "collapsed" (flamegraph.pl) or "speedscope" (JSON)
+    PROFILING_FORMAT: str = "collapsed"
+    PROFILING_OUTPUT_DIR: str = "/app/logs/profiles"
     
     # Schedule generation
     MAX_GENERATION_JOBS_PER_ORG: int = 5
     GENERATION_TIMEOUT_SECONDS: int = 300
+    # Trace the Python heap peak of each generation phase (slows generation down)
+    GENERATION_TRACE_MEMORY: bool = False
+    
+    # Reports
+    WORKLOAD_ROLLUPS_ENABLED: bool = True
+    
+    # Schedule change events: "memory" (single worker) or "postgres" (LISTEN/NOTIFY)
+    SCHEDULE_EVENTS_BACKEND: str = "memory"
+    SCHEDULE_EVENTS_QUEUE_SIZE: int = 256
+    SCHEDULE_EVENTS_HEARTBEAT_SECONDS: int = 15
+    
+    # Audit log writes are buffered and flushed in batches
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_QUEUE_SIZE: int = 50000
+    
+    # Monthly partitions of lesson_instances and change_logs (scripts/maintain_partitions.py)
+    PARTITION_PREMAKE_MONTHS: int = 12
+    CHANGE_LOG_RETENTION_MONTHS: Optional[int] = 24
+    LESSON_RETENTION_MONTHS: Optional[int] = None
+    PARTITION_ARCHIVE_SCHEMA: str = "archive"
+    # Deleted lessons stay visible to /lessons/changes this long; older cursors must resync
+    LESSON_TOMBSTONE_RETENTION_DAYS: Optional[int] = 90
     
     class Config:
         env_file = ".env"
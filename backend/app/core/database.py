@@ -1,21 +1,63 @@
 """Database connection and session management."""
 
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
     pass
 
 
+def engine_options(database_url: str) -> dict:
+    """Keyword arguments for create_async_engine built from settings."""
+    url = make_url(database_url)
+    options = {
+        "echo": settings.DEBUG,
+        "future": True,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING
+    }
+    
+    # SQLite (tests, local tooling) does not use a sized queue pool
+    if url.get_backend_name() == "sqlite":
+        return options
+    
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS
+    )
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+        }
+        if settings.DB_PGBOUNCER:
+            # In transaction mode a statement prepared on one server connection
+            # may be looked up on another: disable both statement caches and
+            # give every prepared statement a unique name
+            options["connect_args"].update(
+                prepared_statement_cache_size=0,
+                statement_cache_size=0,
+                prepared_statement_name_func=lambda: f"__asyncpg_{uuid.uuid4()}__"
+            )
+    return options
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True
-)
+engine = create_async_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -24,6 +66,119 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
+# Optional read replica for read-only endpoints
+replica_engine = None
+ReplicaSessionLocal = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_async_engine(
+        settings.DATABASE_REPLICA_URL,
+        **engine_options(settings.DATABASE_REPLICA_URL)
+    )
+    ReplicaSessionLocal = async_sessionmaker(
+        replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False
+    )
+
+# Replay lag in seconds; 0 when the replica has applied everything it received.
+# NULL when no WAL receiver is running (pg_stat_wal_receiver is then empty) or
+# nothing was replayed yet: a disconnected replica can look caught up while
+# falling arbitrarily behind, so it is treated as lagging.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+class ReplicaLagMonitor:
+    """Cached check of whether the replica is fresh enough to serve reads."""
+    
+    def __init__(self, max_lag_seconds: float, check_interval_seconds: float):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.lag_seconds: float = None
+        self._usable = False
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+    
+    async def is_usable(self) -> bool:
+        """Whether reads may go to the replica, re-checking lag when stale."""
+        if time.monotonic() - self._checked_at < self.check_interval_seconds:
+            return self._usable
+        
+        async with self._lock:
+            # Another request may have refreshed while we waited
+            if time.monotonic() - self._checked_at >= self.check_interval_seconds:
+                await self._refresh()
+        return self._usable
+    
+    async def _query_lag(self) -> Optional[float]:
+        """Replica lag in seconds, None when it cannot be measured."""
+        async with replica_engine.connect() as conn:
+            lag = (await conn.execute(REPLICA_LAG_SQL)).scalar()
+        return None if lag is None else float(lag)
+    
+    async def _refresh(self) -> None:
+        try:
+            self.lag_seconds = await self._query_lag()
+            usable = self.lag_seconds is not None and self.lag_seconds <= self.max_lag_seconds
+        except Exception as e:
+            logger.warning(f"Replica lag check failed: {e}")
+            self.lag_seconds = None
+            usable = False
+        
+        if usable != self._usable:
+            logger.warning(
+                f"Routing reads to {'replica' if usable else 'primary'} "
+                f"(replica lag: {self.lag_seconds})"
+            )
+        self._usable = usable
+        self._checked_at = time.monotonic()
+
+
+replica_monitor = ReplicaLagMonitor(
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval_seconds=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS
+)
+
+
+async def _warm_up_engine(target_engine, connections: int) -> None:
+    async with AsyncExitStack() as stack:
+        async def open_connection():
+            conn = await stack.enter_async_context(target_engine.connect())
+            await conn.execute(text("SELECT 1"))
+        
+        await asyncio.gather(*(open_connection() for _ in range(connections)))
+
+
+async def warm_up_pool(connections: int = None) -> int:
+    """Open pooled connections up front so first requests skip connection setup.
+    
+    Both the primary and, when configured, the replica pool are warmed.
+    Connections are held concurrently so each one is distinct, then returned
+    to the pool. Returns the number of connections opened.
+    """
+    if connections is None:
+        connections = settings.DB_POOL_WARMUP_CONNECTIONS
+    connections = min(connections, settings.DB_POOL_SIZE)
+    if connections <= 0:
+        return 0
+    
+    await _warm_up_engine(engine, connections)
+    if replica_engine is None:
+        return connections
+    
+    # A replica that is down must not fail startup; reads fall back to the primary
+    try:
+        await _warm_up_engine(replica_engine, connections)
+    except Exception as e:
+        logger.warning(f"Replica pool warm-up failed: {e}")
+        return connections
+    return connections * 2
+
 
 async def get_db() -> AsyncSession:
     """Dependency to get database session."""
@@ -32,3 +187,36 @@ async def get_db() -> AsyncSession:
             yield session
         finally:
             await session.close()
+
+
+async def _read_session_factory() -> async_sessionmaker:
+    """Replica session factory when it is configured and fresh, else the primary."""
+    if ReplicaSessionLocal is not None and await replica_monitor.is_usable():
+        return ReplicaSessionLocal
+    return AsyncSessionLocal
+
+
+async def get_read_db() -> AsyncSession:
+    """Dependency to get a session for read-only endpoints.
+    
+    Uses the replica when one is configured and its lag is within
+    REPLICA_MAX_LAG_SECONDS, otherwise the primary.
+    """
+    session_factory = await _read_session_factory()
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+@asynccontextmanager
+async def read_session():
+    """Read-only session for work that outlives the request handler.
+    
+    Streaming responses open their own session here rather than relying
+    on a request dependency staying open while the body is sent.
+    """
+    session_factory = await _read_session_factory()
+    async with session_factory() as session:
+        yield session
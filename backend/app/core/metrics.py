@@ -0,0 +1,279 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Counters, gauges and histograms are kept per worker and served by
+``GET /metrics``; each worker is scraped on its own. Values that already
+live elsewhere (pool state, executor and cache stats) are read at scrape
+time by collectors instead of being mirrored into gauges.
+"""
+
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; request latencies from a cached read to a slow export
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Seconds; generation runs from a one-week preview to a term-long solve
+GENERATION_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Labels, float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base of labelled metrics; one child value per label combination."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels) -> Optional[float]:
+        return self._values.get(self._key(labels))
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: counts per bucket (non-cumulative, last is +Inf), sum
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[Sample]:
+        samples = []
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                cumulative = 0
+                for bound, count in zip((*self.buckets, math.inf), counts):
+                    cumulative += count
+                    samples.append((f"{self.name}_bucket", key + (("le", _format_value(bound)),), cumulative))
+                samples.append((f"{self.name}_sum", key, total[0]))
+                samples.append((f"{self.name}_count", key, cumulative))
+        return samples
+
+
+# A collector returns (name, type, help, samples) families computed at scrape time
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+
+class MetricsRegistry:
+    """Metrics and scrape-time collectors of this worker."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the text exposition format, version 0.0.4."""
+        families = [
+            (metric.name, metric.type_name, metric.documentation, metric.samples())
+            for metric in self._metrics.values()
+        ]
+        for collector in self._collectors:
+            families.extend(collector())
+
+        lines = []
+        for name, type_name, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {type_name}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status")
+)
+http_request_queries = metrics.counter(
+    "http_request_db_queries_total",
+    "SQL statements executed by HTTP requests.",
+    ("method", "route")
+)
+http_request_db_seconds = metrics.counter(
+    "http_request_db_seconds_total",
+    "Database time spent by HTTP requests.",
+    ("method", "route")
+)
+
+generation_runs = metrics.counter(
+    "generation_runs_total",
+    "Schedule generation runs by kind and outcome.",
+    ("kind", "outcome")
+)
+generation_duration = metrics.histogram(
+    "generation_duration_seconds",
+    "Schedule generation wall time by kind.",
+    ("kind",),
+    buckets=GENERATION_BUCKETS
+)
+generation_lessons = metrics.counter(
+    "generation_lessons_total",
+    "Lessons proposed by schedule generation runs.",
+    ("kind",)
+)
+
+cp_sat_solves = metrics.counter(
+    "cp_sat_solves_total",
+    "CP-SAT solves by solver status.",
+    ("status",)
+)
+cp_sat_wall_time = metrics.histogram(
+    "cp_sat_wall_time_seconds",
+    "CP-SAT solve wall time.",
+    buckets=GENERATION_BUCKETS
+)
+cp_sat_conflicts = metrics.counter("cp_sat_conflicts_total", "CP-SAT conflicts over all solves.")
+cp_sat_branches = metrics.counter("cp_sat_branches_total", "CP-SAT branches over all solves.")
+cp_sat_last_solve = metrics.gauge(
+    "cp_sat_last_solve",
+    "Statistics of the most recent CP-SAT solve: variables, constraints, conflicts, "
+    "branches, wall_seconds and objective_gap (relative distance of objective to bound).",
+    ("stat",)
+)
+
+feed_requests = metrics.counter(
+    "calendar_feed_requests_total",
+    "Calendar feed requests by whether the client's copy was current.",
+    ("result",)
+)
+
+
+def record_cp_sat_solve(model, solver, status: int) -> None:
+    """Record statistics of a finished CP-SAT solve."""
+    proto = model.Proto()
+    status_name = solver.StatusName(status)
+    objective = solver.ObjectiveValue() if proto.HasField("objective") else None
+    bound = solver.BestObjectiveBound() if proto.HasField("objective") else None
+
+    cp_sat_solves.inc(status=status_name)
+    cp_sat_wall_time.observe(solver.WallTime())
+    cp_sat_conflicts.inc(solver.NumConflicts())
+    cp_sat_branches.inc(solver.NumBranches())
+
+    stats = {
+        "variables": len(proto.variables),
+        "constraints": len(proto.constraints),
+        "conflicts": solver.NumConflicts(),
+        "branches": solver.NumBranches(),
+        "wall_seconds": solver.WallTime(),
+    }
+    if objective is not None and status_name in ("OPTIMAL", "FEASIBLE"):
+        stats["objective_gap"] = abs(objective - bound) / max(1.0, abs(objective))
+    for stat, value in stats.items():
+        cp_sat_last_solve.set(value, stat=stat)
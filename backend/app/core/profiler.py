@@ -0,0 +1,358 @@
+"""Statistical stack sampling of slow or explicitly profiled requests.
+
+While requests are in flight a background thread samples the event loop
+thread every PROFILING_SAMPLE_INTERVAL_MS. Each sample is attributed to
+the request whose task was running; requests that were not running get a
+``<waiting for I/O>`` or ``<event loop busy>`` pseudo-frame instead, so a
+profile also tells database waits apart from loop starvation by other
+requests. When a request took longer than PROFILING_SLOW_REQUEST_SECONDS,
+or an admin sent PROFILING_DEBUG_HEADER, its samples are written to
+PROFILING_OUTPUT_DIR as collapsed stacks (flamegraph.pl, speedscope) or
+speedscope JSON. Dumps are rate limited per worker.
+
+Sampling itself is bounded too: only PROFILING_SAMPLE_RATE of requests
+are watched for slowness, at most PROFILING_MAX_ACTIVE_REQUESTS at a
+time, and event streams and exports, which are long by design, never.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from jose import JWTError, jwt
+
+from .config import settings
+from .query_stats import current_query_stats, route_template
+from .user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+# Innermost frames kept per sample
+MAX_STACK_DEPTH = 128
+
+# Samples kept per request; at 10 ms that covers 100 s of a request's runtime
+MAX_SAMPLES_PER_REQUEST = 10000
+
+WAITING_FRAME = "<waiting for I/O>"
+BUSY_FRAME = "<event loop busy>"
+
+PROFILE_ROLES = ("ADMIN", "SUPERADMIN")
+
+# Long-lived responses, the same ones StreamAwareGZipMiddleware leaves alone
+EXCLUDED_PATH_PREFIXES = (f"{settings.API_V1_PREFIX}/events/", f"{settings.API_V1_PREFIX}/exports/")
+
+Frame = Tuple[str, str, int]
+
+
+class RequestProfile:
+    """Samples collected for one in-flight request."""
+
+    def __init__(self, task: Optional[asyncio.Task], method: str, path: str):
+        self.task = task
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.samples: List[Tuple[Frame, ...]] = []
+        self.dropped = 0
+
+    def add(self, stack: Tuple[Frame, ...]) -> None:
+        if len(self.samples) < MAX_SAMPLES_PER_REQUEST:
+            self.samples.append(stack)
+        else:
+            self.dropped += 1
+
+
+def _frame_key(frame) -> Frame:
+    code = frame.f_code
+    return (getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+
+
+def _stack(frame) -> Tuple[Frame, ...]:
+    """Frames from the outermost call to ``frame``."""
+    frames = []
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        frames.append(_frame_key(frame))
+        frame = frame.f_back
+    frames.reverse()
+    return tuple(frames)
+
+
+_warned_no_current_tasks = False
+
+
+def _current_task(loop: asyncio.AbstractEventLoop) -> Optional[asyncio.Task]:
+    """Task running on ``loop``, read from another thread.
+
+    asyncio.current_task only works on the loop's own thread; the mapping
+    behind it is a plain dict that is safe to read under the GIL.
+    """
+    global _warned_no_current_tasks
+    current_tasks = getattr(asyncio.tasks, "_current_tasks", None)
+    if current_tasks is None:
+        if not _warned_no_current_tasks:
+            _warned_no_current_tasks = True
+            logger.warning(
+                "asyncio.tasks._current_tasks is not available on this Python; "
+                "request profiles will only show waiting samples"
+            )
+        return None
+    return current_tasks.get(loop)
+
+
+class SamplingProfiler:
+    """Samples the event loop thread for every request that is being profiled."""
+
+    def __init__(self, interval_seconds: float, max_dumps_per_minute: int, max_active: int):
+        self.interval_seconds = interval_seconds
+        self.max_dumps_per_minute = max_dumps_per_minute
+        self.max_active = max_active
+        self._active: Dict[int, RequestProfile] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._dump_times: List[float] = []
+        self.dumps = 0
+        self.rate_limited = 0
+        self.skipped = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+        self._thread.start()
+
+    def begin(self, method: str, path: str, force: bool = False) -> Optional[RequestProfile]:
+        """Start collecting samples for the request running in the current task.
+
+        Returns None when max_active requests are already being sampled,
+        unless ``force`` is set.
+        """
+        self._ensure_started()
+        profile = RequestProfile(asyncio.current_task(), method, path)
+        with self._lock:
+            if not force and len(self._active) >= self.max_active:
+                self.skipped += 1
+                return None
+            self._active[id(profile)] = profile
+        self._wakeup.set()
+        return profile
+
+    def end(self, profile: RequestProfile) -> float:
+        """Stop collecting samples; returns the request's wall time."""
+        with self._lock:
+            self._active.pop(id(profile), None)
+        return time.perf_counter() - profile.started
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            with self._lock:
+                active = list(self._active.values())
+                if not active:
+                    self._wakeup.clear()
+                    continue
+            self._sample(active)
+            time.sleep(self.interval_seconds)
+
+    def _sample(self, active: List[RequestProfile]) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        running = _current_task(self._loop)
+        stack = _stack(frame) if frame is not None and running is not None else None
+        for profile in active:
+            if stack is None:
+                profile.add(((WAITING_FRAME, "", 0),))
+            elif profile.task is None or running is profile.task:
+                profile.add(stack)
+            else:
+                profile.add(((BUSY_FRAME, "", 0),))
+
+    def allow_dump(self) -> bool:
+        """Whether another dump fits into this minute's budget."""
+        now = time.monotonic()
+        self._dump_times = [at for at in self._dump_times if now - at < 60]
+        if len(self._dump_times) >= self.max_dumps_per_minute:
+            self.rate_limited += 1
+            return False
+        self._dump_times.append(now)
+        return True
+
+    def stats(self) -> dict:
+        """Snapshot of profiler activity for metrics."""
+        return {
+            "active": len(self._active),
+            "dumps": self.dumps,
+            "rate_limited": self.rate_limited,
+            "skipped": self.skipped
+        }
+
+
+sampling_profiler = SamplingProfiler(
+    interval_seconds=settings.PROFILING_SAMPLE_INTERVAL_MS / 1000,
+    max_dumps_per_minute=settings.PROFILING_MAX_DUMPS_PER_MINUTE,
+    max_active=settings.PROFILING_MAX_ACTIVE_REQUESTS
+)
+
+
+def collapsed_stacks(profile: RequestProfile) -> str:
+    """Samples as ``outer;inner count`` lines, the input of flamegraph.pl."""
+    counts = Counter(
+        ";".join(f"{name} ({os.path.basename(filename)}:{line})" if filename else name
+                 for name, filename, line in stack)
+        for stack in profile.samples
+    )
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+def speedscope_json(profile: RequestProfile, name: str, interval_seconds: float) -> str:
+    """Samples in speedscope's sampled profile format."""
+    frames: List[dict] = []
+    frame_index: Dict[Frame, int] = {}
+    samples = []
+    for stack in profile.samples:
+        indexes = []
+        for frame in stack:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                entry = {"name": frame[0]}
+                if frame[1]:
+                    entry.update(file=frame[1], line=frame[2])
+                frames.append(entry)
+            indexes.append(frame_index[frame])
+        samples.append(indexes)
+
+    return json.dumps({
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": settings.PROJECT_NAME,
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": len(samples) * interval_seconds,
+            "samples": samples,
+            "weights": [interval_seconds] * len(samples)
+        }]
+    })
+
+
+def _is_admin_token(authorization: Optional[str]) -> bool:
+    """Whether a bearer token belongs to an admin, from its signed claims."""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return False
+    try:
+        payload = jwt.decode(authorization[7:], settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        return False
+    if payload.get("role") not in PROFILE_ROLES or "sub" not in payload:
+        return False
+    # A role change since the token was issued revokes it here too
+    issued_at = float(payload.get("iat", 0))
+    return not user_cache.invalidated_since(int(payload["sub"]), issued_at)
+
+
+class ProfilingMiddleware:
+    """Profiles requests and writes out the slow or explicitly requested ones.
+
+    A request with the debug header from an admin is always written and
+    gets the profile's file name back in the same header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.profiler = sampling_profiler
+        self.debug_header = settings.PROFILING_DEBUG_HEADER.lower().encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXCLUDED_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        requested = self.debug_header in headers and _is_admin_token(
+            headers.get(b"authorization", b"").decode("latin-1")
+        )
+        watched = (
+            settings.PROFILING_SLOW_REQUEST_SECONDS is not None
+            and random.random() < settings.PROFILING_SAMPLE_RATE
+        )
+        profile = None
+        if requested or watched:
+            profile = self.profiler.begin(scope["method"], scope["path"], force=requested)
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def send_with_profile_id(message):
+            if requested and message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (self.debug_header, profile_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            elapsed = self.profiler.end(profile)
+            slow = (
+                settings.PROFILING_SLOW_REQUEST_SECONDS is not None
+                and elapsed >= settings.PROFILING_SLOW_REQUEST_SECONDS
+            )
+            if (requested or slow) and profile.samples and self.profiler.allow_dump():
+                await self._dump(scope, profile, profile_id, elapsed, "requested" if requested else "slow")
+
+    async def _dump(self, scope, profile: RequestProfile, profile_id: str, elapsed: float, reason: str) -> None:
+        route = route_template(scope)
+        query_stats = current_query_stats()
+        name = f"{profile.method} {route} {elapsed * 1000:.0f}ms"
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        if settings.PROFILING_FORMAT == "speedscope":
+            path = os.path.join(settings.PROFILING_OUTPUT_DIR, f"{stamp}-{profile_id}.speedscope.json")
+            content = speedscope_json(profile, name, self.profiler.interval_seconds)
+        else:
+            path = os.path.join(settings.PROFILING_OUTPUT_DIR, f"{stamp}-{profile_id}.collapsed.txt")
+            content = collapsed_stacks(profile)
+
+        try:
+            await asyncio.to_thread(_write_profile, path, content)
+        except OSError as e:
+            logger.warning(f"Could not write request profile {path}: {e}")
+            return
+
+        self.profiler.dumps += 1
+        logger.warning(
+            f"Profiled {reason} request: method={profile.method} route={route} "
+            f"duration_ms={elapsed * 1000:.1f} samples={len(profile.samples)} "
+            f"queries={query_stats.count if query_stats else 'n/a'} profile={path}"
+        )
+
+
+def _write_profile(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    _prune_profiles(os.path.dirname(path))
+
+
+def _prune_profiles(directory: str) -> None:
+    """Keep only the newest PROFILING_MAX_FILES profiles."""
+    entries = sorted(
+        (entry for entry in os.scandir(directory) if entry.is_file()),
+        key=lambda entry: entry.stat().st_mtime
+    )
+    for entry in entries[:max(0, len(entries) - settings.PROFILING_MAX_FILES)]:
+        os.remove(entry.path)
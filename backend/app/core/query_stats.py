@@ -0,0 +1,164 @@
+"""Per-request SQL statement counts and database time.
+
+Engine events add every executed statement to the QueryStats of the
+current context. ``QueryStatsMiddleware`` opens one per request, reports
+it in a ``Server-Timing`` header and logs it with the route template, so
+N+1 query patterns show up in the browser and in the logs. Tests use
+``count_queries`` to put an upper bound on an endpoint's query count.
+The same pass feeds the per-route request metrics.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+
+from .config import settings
+from .metrics import http_request_duration, http_request_queries, http_request_db_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Statement count and database time; nested stats also count into their parent."""
+
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.parent = parent
+        self.count = 0
+        self.seconds = 0.0
+
+    def add(self, seconds: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+            stats = stats.parent
+
+    @property
+    def milliseconds(self) -> float:
+        return round(self.seconds * 1000, 1)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Count the statements executed inside the block, including nested requests."""
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+# Registered on the Engine class so the primary, the replica and test engines
+# are all covered. SQLAlchemy's async layer carries context variables into
+# the greenlet that runs these hooks.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started_at"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add(time.perf_counter() - started)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        started = connection.info["query_started_at"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.add(time.perf_counter() - started)
+
+
+def route_template(scope) -> str:
+    """Path template of the route that handled a request, e.g. /api/v1/lessons/{lesson_id}."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    app = scope.get("app")
+    if app is not None:
+        for route in app.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", scope["path"])
+    return "unmatched"
+
+
+class QueryStatsMiddleware:
+    """Reports statement count and database time of every HTTP request.
+
+    The ``Server-Timing`` header covers queries made before the response
+    starts; the log line written when the response finishes also counts
+    queries of streamed bodies.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+                    header = (
+                        f'db;dur={stats.milliseconds};desc="{stats.count} queries", '
+                        f'app;dur={elapsed_ms}'
+                    )
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", header.encode())]
+            await send(message)
+
+        with count_queries() as stats:
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                self._log(scope, status_code, stats, time.perf_counter() - started)
+
+    @staticmethod
+    def _log(scope, status_code: int, stats: QueryStats, elapsed: float) -> None:
+        route = route_template(scope)
+        method = scope["method"]
+        http_request_duration.observe(elapsed, method=method, route=route, status=status_code)
+        http_request_queries.inc(stats.count, method=method, route=route)
+        http_request_db_seconds.inc(stats.seconds, method=method, route=route)
+        
+        fields = {
+            "method": method,
+            "route": route,
+            "status": status_code,
+            "queries": stats.count,
+            "db_ms": stats.milliseconds,
+            "duration_ms": round(elapsed * 1000, 1)
+        }
+        message = " ".join(f"{key}={value}" for key, value in fields.items())
+        if stats.count > settings.REQUEST_QUERY_WARNING_COUNT:
+            logger.warning(f"Too many queries: {message}", extra=fields)
+        else:
+            logger.info(message, extra=fields)
@@ -0,0 +1,91 @@
+"""Short-TTL in-process cache of authenticated users.
+
+Invalidations reach other workers through the schedule event broker
+(see ``ScheduleEventBroker.invalidate_user``); with the in-process broker
+they stay local, which is only enough for a single worker.
+"""
+
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .config import settings
+from ..models.user import User
+
+
+# User attributes handlers rely on; cached and carried as token claims
+USER_FIELDS = ("user_id", "org_id", "email", "role", "is_active")
+
+
+def detached_user(fields: Dict[str, Any]) -> User:
+    """Build a session-less user from its cached or claimed fields."""
+    return User(**{field: fields[field] for field in USER_FIELDS})
+
+
+class UserCache:
+    """Per-worker cache of users keyed by user_id.
+
+    Besides cached users it remembers when each user was last invalidated,
+    so tokens issued before a role change or deactivation stop being
+    trusted on their claims alone.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+        self._invalidated_at: Dict[int, float] = {}
+        self._all_invalidated_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[User]:
+        """Return a fresh detached copy of a cached user if not expired."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, fields = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(user_id, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return detached_user(fields)
+
+    def set(self, user: User) -> None:
+        """Cache a user for the configured TTL."""
+        fields = {field: getattr(user, field) for field in USER_FIELDS}
+        self._entries[user.user_id] = (time.monotonic() + self.ttl_seconds, fields)
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a cached user and distrust tokens issued before now."""
+        self._entries.pop(user_id, None)
+        self._invalidated_at[user_id] = time.time()
+
+    def invalidate_all(self) -> None:
+        """Drop every cached user and distrust all tokens issued before now."""
+        self._entries.clear()
+        self._all_invalidated_at = time.time()
+
+    def invalidated_since(self, user_id: int, issued_at: float) -> bool:
+        """Whether the user was invalidated after a token was issued."""
+        if self._all_invalidated_at is not None and self._all_invalidated_at >= issued_at:
+            return True
+        invalidated_at = self._invalidated_at.get(user_id)
+        return invalidated_at is not None and invalidated_at >= issued_at
+
+    def stats(self) -> dict:
+        """Snapshot of cache size and lookups for metrics."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+    
+    def clear(self) -> None:
+        """Forget all cached users and invalidations."""
+        self._entries.clear()
+        self._invalidated_at.clear()
+        self._all_invalidated_at = None
+
+
+user_cache = UserCache(ttl_seconds=settings.USER_CACHE_TTL_SECONDS)
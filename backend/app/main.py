@@ -2,14 +2,22 @@
 
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.gzip import GZipMiddleware
 import logging
 
 from .core.config import settings
+from .core.auth import password_executor
+from .core.database import engine, replica_engine, warm_up_pool
+from .core.query_stats import QueryStatsMiddleware
+from .core.metrics import metrics
+from .core.profiler import ProfilingMiddleware, sampling_profiler
+from .core.user_cache import user_cache
+from .services.schedule_events import schedule_events
+from .services.audit import audit_log
 from .routers import (
     auth, organizations, users, academic_real as academic, educational_real as educational, 
-    facilities_real as facilities, scheduling, generation, reports, lessons
+    facilities_real as facilities, scheduling, generation, reports, lessons, imports, exports, events
 )
 
 # Configure logging
@@ -24,25 +32,44 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     docs_url=f"{settings.API_V1_PREFIX}/docs",
     redoc_url=f"{settings.API_V1_PREFIX}/redoc",
-    default_response_class=JSONResponse
+    default_response_class=ORJSONResponse
 )
 
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip that leaves event streams alone.
+    
+    The compressor holds small writes back, which would delay server-sent
+    events until enough of them accumulate.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(f"{settings.API_V1_PREFIX}/events/"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
 # Add middleware
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1000)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+# Outermost, so its timing covers the other middleware too
+app.add_middleware(QueryStatsMiddleware)
 
 
 # Global exception handler
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Handle HTTP exceptions with consistent format."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": {
@@ -50,7 +77,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
                 "message": exc.detail,
                 "type": "http_error"
             }
-        }
+        },
+        headers=getattr(exc, "headers", None)
     )
 
 
@@ -58,7 +86,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle general exceptions."""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": {
@@ -70,11 +98,132 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 
+@app.on_event("startup")
+async def warm_up_database():
+    """Pre-open database connections before serving traffic."""
+    try:
+        opened = await warm_up_pool()
+        logger.info(f"Database pool warmed up with {opened} connections")
+    except Exception as e:
+        logger.warning(f"Database pool warm-up failed: {e}")
+
+
+@app.on_event("startup")
+async def start_schedule_events():
+    """Connect the schedule change broker."""
+    try:
+        await schedule_events.start()
+    except Exception as e:
+        logger.warning(f"Schedule event broker failed to start: {e}")
+
+
+@app.on_event("startup")
+async def start_audit_log():
+    """Start the background audit log writer."""
+    await audit_log.start()
+
+
+@app.on_event("shutdown")
+async def stop_audit_log():
+    """Write out buffered audit records before connections are closed."""
+    await audit_log.stop()
+
+
+@app.on_event("shutdown")
+async def stop_schedule_events():
+    """Disconnect the schedule change broker."""
+    await schedule_events.stop()
+
+
+@app.on_event("shutdown")
+async def dispose_database():
+    """Close pooled database connections."""
+    await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+
+
 # Health check
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "version": settings.PROJECT_VERSION}
+    return {
+        "status": "healthy",
+        "version": settings.PROJECT_VERSION,
+        "password_hashing": password_executor.stats(),
+        "audit_log": audit_log.stats()
+    }
+
+
+def _runtime_metrics():
+    """Pool, executor, cache and broker state read at scrape time."""
+    pools = []
+    for name, pool_engine in (("primary", engine), ("replica", replica_engine)):
+        pool = pool_engine.pool if pool_engine is not None else None
+        # Only sized queue pools report these; SQLite pools do not
+        if pool is not None and hasattr(pool, "checkedout"):
+            pools.append((name, pool))
+    yield "db_pool_size", "gauge", "Configured pool size per engine.", [
+        ("db_pool_size", (("engine", name),), pool.size()) for name, pool in pools
+    ]
+    yield "db_pool_checked_out", "gauge", "Connections currently checked out per engine.", [
+        ("db_pool_checked_out", (("engine", name),), pool.checkedout()) for name, pool in pools
+    ]
+    yield "db_pool_overflow", "gauge", "Connections open beyond the pool size per engine.", [
+        ("db_pool_overflow", (("engine", name),), max(0, pool.overflow())) for name, pool in pools
+    ]
+    
+    executor = password_executor.stats()
+    yield "password_hash_in_flight", "gauge", "Password hash calls running or queued.", [
+        ("password_hash_in_flight", (), executor["in_flight"])
+    ]
+    yield "password_hash_rejected_total", "counter", "Password hash calls rejected with 503.", [
+        ("password_hash_rejected_total", (), executor["rejected"])
+    ]
+    
+    audit = audit_log.stats()
+    yield "audit_log_queued", "gauge", "Audit records waiting to be written.", [
+        ("audit_log_queued", (), audit["queued"])
+    ]
+    yield "audit_log_records_total", "counter", "Audit records by outcome.", [
+        ("audit_log_records_total", (("outcome", outcome),), audit[outcome])
+        for outcome in ("written", "dropped", "failed")
+    ]
+    
+    cache = user_cache.stats()
+    lookups = cache["hits"] + cache["misses"]
+    yield "user_cache_size", "gauge", "Users held in the auth cache.", [
+        ("user_cache_size", (), cache["size"])
+    ]
+    yield "user_cache_lookups_total", "counter", "Auth cache lookups by result.", [
+        ("user_cache_lookups_total", (("result", "hit"),), cache["hits"]),
+        ("user_cache_lookups_total", (("result", "miss"),), cache["misses"])
+    ]
+    yield "user_cache_hit_ratio", "gauge", "Share of auth cache lookups that hit.", [
+        ("user_cache_hit_ratio", (), cache["hits"] / lookups if lookups else 0)
+    ]
+    
+    yield "schedule_event_subscribers", "gauge", "Open schedule event streams on this worker.", [
+        ("schedule_event_subscribers", (), schedule_events.subscriber_count)
+    ]
+    
+    profiler = sampling_profiler.stats()
+    yield "request_profiles_total", "counter", "Request profiles written, or skipped by the rate limit or the active cap.", [
+        ("request_profiles_total", (("result", "written"),), profiler["dumps"]),
+        ("request_profiles_total", (("result", "rate_limited"),), profiler["rate_limited"]),
+        ("request_profiles_total", (("result", "skipped"),), profiler["skipped"])
+    ]
+
+
+metrics.add_collector(_runtime_metrics)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus metrics of this worker."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 # Include routers
@@ -87,6 +236,9 @@ app.include_router(facilities.router, prefix=f"{settings.API_V1_PREFIX}/faciliti
 app.include_router(lessons.router, prefix=f"{settings.API_V1_PREFIX}/lessons", tags=["lessons"])
 app.include_router(generation.router, prefix=f"{settings.API_V1_PREFIX}/generation", tags=["generation"])
 app.include_router(reports.router, prefix=f"{settings.API_V1_PREFIX}/reports", tags=["reports"])
+app.include_router(imports.router, prefix=f"{settings.API_V1_PREFIX}/imports", tags=["imports"])
+app.include_router(exports.router, prefix=f"{settings.API_V1_PREFIX}/exports", tags=["exports"])
+app.include_router(events.router, prefix=f"{settings.API_V1_PREFIX}/events", tags=["events"])
 
 
 if __name__ == "__main__":
@@ -4,7 +4,10 @@ from .user import User, UserRole
 from .academic import AcademicYear, Term
 from .educational import Group, Teacher, Course, CourseAssignment, Enrollment
 from .facilities import Room, TimeTableSlot, TeacherAvailability, Holiday
-from .scheduling import LessonInstance, LessonStatus, ChangeLog, GenerationJob, GenerationStatus, GenerationScope
+from .scheduling import (
+    LessonInstance, LessonStatus, ChangeLog, GenerationJob, GenerationStatus, GenerationScope, WorkloadRollup,
+    ScheduleVersion, LessonTombstone, CalendarFeed
+)
 
 __all__ = [
     "Organization",
@@ -12,5 +15,6 @@ __all__ = [
     "AcademicYear", "Term",
     "Group", "Teacher", "Course", "CourseAssignment", "Enrollment",
     "Room", "TimeTableSlot", "TeacherAvailability", "Holiday", 
-    "LessonInstance", "LessonStatus", "ChangeLog", "GenerationJob", "GenerationStatus", "GenerationScope"
+    "LessonInstance", "LessonStatus", "ChangeLog", "GenerationJob", "GenerationStatus", "GenerationScope",
+    "WorkloadRollup", "ScheduleVersion", "LessonTombstone", "CalendarFeed"
 ]
@@ -69,6 +69,9 @@ class Course(Base):
     type = Column(String(50), nullable=True)  # lecture, seminar, lab, etc.
     is_active = Column(Boolean, nullable=False, default=True)
     
+    # Unique constraint: name unique within organization
+    __table_args__ = (UniqueConstraint('org_id', 'name', name='uq_org_course_name'),)
+    
     # Relationships
     organization = relationship("Organization", back_populates="courses")
     course_assignments = relationship("CourseAssignment", back_populates="course", cascade="all, delete-orphan")
@@ -87,6 +90,11 @@ class CourseAssignment(Base):
     course_id = Column(Integer, ForeignKey("courses.course_id"), nullable=False, index=True)
     teacher_id = Column(Integer, ForeignKey("teachers.teacher_id"), nullable=False, index=True)
     
+    # Unique constraint: one assignment per course/teacher pair
+    __table_args__ = (
+        UniqueConstraint('org_id', 'course_id', 'teacher_id', name='uq_org_assignment_course_teacher'),
+    )
+    
     # Relationships
     organization = relationship("Organization", back_populates="course_assignments")
     course = relationship("Course", back_populates="course_assignments")
@@ -109,6 +117,11 @@ class Enrollment(Base):
     planned_hours = Column(Integer, nullable=False)
     unit = Column(String(20), nullable=False, default="per_week")
     
+    # Unique constraint: a group takes each course assignment once
+    __table_args__ = (
+        UniqueConstraint('org_id', 'assignment_id', 'group_id', name='uq_org_enrollment_assignment_group'),
+    )
+    
     # Relationships
     organization = relationship("Organization", back_populates="enrollments")
     assignment = relationship("CourseAssignment", back_populates="enrollments")
@@ -19,6 +19,9 @@ class Room(Base):
     building = Column(String(100), nullable=True)
     is_active = Column(Boolean, nullable=False, default=True)
     
+    # Unique constraint: number unique within organization
+    __table_args__ = (UniqueConstraint('org_id', 'number', name='uq_org_room_number'),)
+    
     # Relationships
     organization = relationship("Organization", back_populates="rooms")
     lesson_instances = relationship("LessonInstance", back_populates="room")
@@ -2,8 +2,8 @@
 
 import enum
 from datetime import datetime, date
-from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Enum, Text, Float, JSON, func, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Date, ForeignKey, Enum, Text, Float, JSON, func, UniqueConstraint, Index, text, event, inspect, select
+from sqlalchemy.orm import relationship, Session
 from ..core.database import Base
 
 
@@ -33,7 +33,12 @@ class GenerationScope(enum.Enum):
 
 
 class LessonInstance(Base):
-    """Lesson instance model - represents a specific lesson occurrence."""
+    """Lesson instance model - represents a specific lesson occurrence.
+    
+    The table is range-partitioned by month on date (migration 008), which
+    makes the database primary key (lesson_id, date); lesson_id alone is
+    still unique as it comes from a single sequence.
+    """
     
     __tablename__ = "lesson_instances"
     
@@ -44,6 +49,10 @@ class LessonInstance(Base):
     slot_id = Column(Integer, ForeignKey("time_slots.slot_id"), nullable=False, index=True)
     room_id = Column(Integer, ForeignKey("rooms.room_id"), nullable=True, index=True)  # can be null initially
     enrollment_id = Column(Integer, ForeignKey("enrollments.enrollment_id"), nullable=False, index=True)
+    # Denormalized from enrollment on flush (and by a database trigger for
+    # writes outside the ORM), backs the clash indexes below
+    teacher_id = Column(Integer, ForeignKey("teachers.teacher_id"), nullable=True)
+    group_id = Column(Integer, ForeignKey("groups.group_id"), nullable=True)
     status = Column(Enum(LessonStatus, values_callable=lambda obj: [e.value for e in obj]), nullable=False, default=LessonStatus.PLANNED, index=True)
     reason = Column(Text, nullable=True)  # reason for cancellation, move, etc.
     created_by = Column(Integer, ForeignKey("users.user_id"), nullable=False)
@@ -51,12 +60,30 @@ class LessonInstance(Base):
     updated_by = Column(Integer, ForeignKey("users.user_id"), nullable=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
     version = Column(Integer, nullable=False, default=1)  # for optimistic locking
+    # Change number from lesson_change_seq and id of the writing transaction,
+    # both stamped by a database trigger on every write (migration 011)
+    change_seq = Column(BigInteger, nullable=True)
+    change_xid = Column(BigInteger, nullable=False, default=0)
     
     # Unique constraints to prevent conflicts
     __table_args__ = (
         # Room can only have one lesson per date/slot
         UniqueConstraint('org_id', 'date', 'slot_id', 'room_id', name='uq_org_date_slot_room'),
-        # Index for common queries
+        # Teacher and group can only have one active lesson per date/slot
+        Index(
+            'uq_lesson_teacher_date_slot', 'org_id', 'date', 'slot_id', 'teacher_id',
+            unique=True,
+            postgresql_where=text("status IN ('PLANNED', 'CONFIRMED')"),
+            sqlite_where=text("status IN ('PLANNED', 'CONFIRMED')")
+        ),
+        Index(
+            'uq_lesson_group_date_slot', 'org_id', 'date', 'slot_id', 'group_id',
+            unique=True,
+            postgresql_where=text("status IN ('PLANNED', 'CONFIRMED')"),
+            sqlite_where=text("status IN ('PLANNED', 'CONFIRMED')")
+        ),
+        Index('ix_lesson_instances_org_change_seq', 'org_id', 'change_seq'),
+        Index('ix_lesson_instances_org_change_xid', 'org_id', 'change_xid'),
     )
     
     # Relationships
@@ -67,20 +94,61 @@ class LessonInstance(Base):
     enrollment = relationship("Enrollment", back_populates="lesson_instances")
     creator = relationship("User", foreign_keys=[created_by], back_populates="created_lessons")
     updater = relationship("User", foreign_keys=[updated_by], back_populates="updated_lessons")
-    change_logs = relationship("ChangeLog", back_populates="lesson", cascade="all, delete-orphan")
+    # Audit records outlive the lesson, so deleting a lesson leaves them in place
+    change_logs = relationship(
+        "ChangeLog",
+        primaryjoin="LessonInstance.lesson_id == foreign(ChangeLog.lesson_id)",
+        viewonly=True
+    )
     
     def __repr__(self):
         return f"<LessonInstance(id={self.lesson_id}, date={self.date}, status='{self.status}')>"
 
 
+@event.listens_for(Session, "before_flush")
+def _fill_lesson_teacher_and_group(session, flush_context, instances):
+    """Copy teacher_id and group_id from the enrollment of new or re-enrolled lessons.
+    
+    One query per flush covers every such lesson. The teacher and group
+    clash indexes then also work on schemas built with create_all, where
+    the trigger of migration 002 does not exist.
+    """
+    lessons = [
+        obj for obj in (*session.new, *session.dirty)
+        if isinstance(obj, LessonInstance) and obj.enrollment_id is not None and (
+            obj.teacher_id is None or obj.group_id is None
+            or inspect(obj).attrs.enrollment_id.history.has_changes()
+        )
+    ]
+    if not lessons:
+        return
+    
+    from .educational import Enrollment, CourseAssignment
+    with session.no_autoflush:
+        rows = session.execute(
+            select(Enrollment.enrollment_id, Enrollment.group_id, CourseAssignment.teacher_id)
+            .join(CourseAssignment, CourseAssignment.assignment_id == Enrollment.assignment_id)
+            .where(Enrollment.enrollment_id.in_({lesson.enrollment_id for lesson in lessons}))
+        )
+        enrollments = {row.enrollment_id: row for row in rows}
+    for lesson in lessons:
+        enrollment = enrollments.get(lesson.enrollment_id)
+        if enrollment is not None:
+            lesson.teacher_id = enrollment.teacher_id
+            lesson.group_id = enrollment.group_id
+
+
 class ChangeLog(Base):
-    """Change log model for audit trail."""
+    """Change log model for audit trail.
+    
+    Range-partitioned by month on created_at, see app/services/partitions.py.
+    """
     
     __tablename__ = "change_logs"
     
     id = Column(Integer, primary_key=True, index=True)
     org_id = Column(Integer, ForeignKey("organizations.org_id"), nullable=False, index=True)
-    lesson_id = Column(Integer, ForeignKey("lesson_instances.lesson_id"), nullable=False, index=True)
+    lesson_id = Column(Integer, nullable=False, index=True)  # no foreign key, deleted lessons keep their history
     user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False, index=True)
     action = Column(Text, nullable=False)  # description of what changed
     payload_json = Column(JSON, nullable=True)  # before/after data
@@ -88,13 +156,99 @@ class ChangeLog(Base):
     
     # Relationships
     organization = relationship("Organization", back_populates="change_logs")
-    lesson = relationship("LessonInstance", back_populates="change_logs")
+    lesson = relationship(
+        "LessonInstance",
+        primaryjoin="foreign(ChangeLog.lesson_id) == LessonInstance.lesson_id",
+        viewonly=True
+    )
     user = relationship("User", back_populates="change_logs")
     
     def __repr__(self):
         return f"<ChangeLog(id={self.id}, lesson_id={self.lesson_id}, action='{self.action}')>"
 
 
+class WorkloadRollup(Base):
+    """Weekly lesson counts and minutes per teacher or group and status.
+    
+    Maintained by statement-level triggers on lesson_instances and
+    periodically reconciled against it.
+    """
+    
+    __tablename__ = "workload_rollups"
+    
+    org_id = Column(Integer, ForeignKey("organizations.org_id"), primary_key=True)
+    kind = Column(String(10), primary_key=True)  # teacher or group
+    resource_id = Column(Integer, primary_key=True)
+    week_start = Column(Date, primary_key=True)
+    status = Column(Enum(LessonStatus, values_callable=lambda obj: [e.value for e in obj]), primary_key=True)
+    lesson_count = Column(Integer, nullable=False, default=0)
+    minutes = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<WorkloadRollup({self.kind}={self.resource_id}, week={self.week_start}, status='{self.status}', lessons={self.lesson_count})>"
+
+
+class ScheduleVersion(Base):
+    """Per-organization schedule version.
+    
+    Bumped by statement-level triggers on every write to lesson_instances,
+    time_slots and the catalog tables whose names feeds show (migration
+    010); used as a cheap cache validator for schedule feeds.
+    pruned_change_seq is the highest lesson tombstone number removed by
+    retention; delta sync cursors below it have to start over.
+    """
+    
+    __tablename__ = "schedule_versions"
+    
+    org_id = Column(Integer, ForeignKey("organizations.org_id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    pruned_change_seq = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<ScheduleVersion(org_id={self.org_id}, version={self.version})>"
+
+
+class LessonTombstone(Base):
+    """Record of a deleted lesson, written by a database trigger.
+    
+    Lets delta sync clients learn about deletions by change sequence.
+    Pruned after LESSON_TOMBSTONE_RETENTION_DAYS.
+    """
+    
+    __tablename__ = "lesson_tombstones"
+    
+    org_id = Column(Integer, ForeignKey("organizations.org_id"), primary_key=True)
+    change_seq = Column(BigInteger, primary_key=True)
+    change_xid = Column(BigInteger, nullable=False, default=0)
+    lesson_id = Column(Integer, nullable=False)
+    date = Column(Date, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<LessonTombstone(lesson_id={self.lesson_id}, change_seq={self.change_seq})>"
+
+
+class CalendarFeed(Base):
+    """A calendar subscription link handed out for a teacher, group or room.
+    
+    Feed tokens carry the feed_id; a revoked feed stops serving its link.
+    """
+    
+    __tablename__ = "calendar_feeds"
+    
+    feed_id = Column(Integer, primary_key=True, index=True)
+    org_id = Column(Integer, ForeignKey("organizations.org_id"), nullable=False, index=True)
+    kind = Column(String(10), nullable=False)  # teacher, group or room
+    resource_id = Column(Integer, nullable=False)
+    created_by = Column(Integer, ForeignKey("users.user_id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self):
+        return f"<CalendarFeed(id={self.feed_id}, {self.kind}={self.resource_id})>"
+
+
 class GenerationJob(Base):
     """Generation job model for schedule generation tasks."""
     
@@ -1,14 +1,115 @@
 """Lesson repository."""
 
-from typing import Optional, List
-from datetime import date
+from typing import Optional, List, Dict, Any
+from datetime import date, datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
-from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy import (
+    select, insert, update, delete, and_, or_, func, case, cast, literal, union_all, values, column,
+    text, Integer, Date, String
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload, joinedload, aliased
 from .base import BaseRepository
-from ..models.scheduling import LessonInstance, LessonStatus
+from ..models.scheduling import LessonInstance, LessonStatus, WorkloadRollup, ScheduleVersion, LessonTombstone
 from ..models.educational import Enrollment, CourseAssignment, Group, Teacher, Course
 from ..models.facilities import Room, TimeTableSlot
+from ..models.academic import Term
+
+# Statuses that occupy a room, teacher and group for their (date, slot)
+ACTIVE_LESSON_STATUSES = [LessonStatus.PLANNED, LessonStatus.CONFIRMED]
+
+# Statuses that count towards teacher and group workload
+WORKLOAD_LESSON_STATUSES = [LessonStatus.PLANNED, LessonStatus.CONFIRMED, LessonStatus.COMPLETED]
+
+ROOM_CONFLICT = "Room is already booked for this time slot"
+TEACHER_CONFLICT = "Teacher has another lesson at this time"
+GROUP_CONFLICT = "Group has another lesson at this time"
+
+# Unique constraints on lesson_instances that guard against double-booking
+CONFLICT_CONSTRAINTS = {
+    "uq_org_date_slot_room": ROOM_CONFLICT,
+    "uq_lesson_teacher_date_slot": TEACHER_CONFLICT,
+    "uq_lesson_group_date_slot": GROUP_CONFLICT,
+}
+
+
+# SQLite reports the columns of a violated unique index instead of its name
+CONFLICT_COLUMNS = {
+    "lesson_instances.room_id": ROOM_CONFLICT,
+    "lesson_instances.teacher_id": TEACHER_CONFLICT,
+    "lesson_instances.group_id": GROUP_CONFLICT,
+}
+
+
+def conflicts_from_integrity_error(error: IntegrityError) -> List[str]:
+    """Map a unique violation on lesson_instances to conflict messages.
+    
+    Returns an empty list when the error is not a scheduling clash.
+    """
+    message = str(error.orig)
+    if message.startswith("UNIQUE constraint failed"):
+        return [
+            conflict for column, conflict in CONFLICT_COLUMNS.items()
+            if column in message
+        ]
+    return [
+        conflict for constraint, conflict in CONFLICT_CONSTRAINTS.items()
+        if constraint in message
+    ]
+
+
+def schedule_query(
+    org_id: int,
+    start_date: date,
+    end_date: date,
+    kind: Optional[str] = None,
+    resource_id: Optional[int] = None
+):
+    """Select lessons with slot times, course, teacher, group and room details.
+
+    Optionally limited to one teacher, group or room. Used by feeds and
+    exports, which stream the result.
+    """
+    query = (
+        select(
+            LessonInstance.lesson_id,
+            LessonInstance.date,
+            LessonInstance.status,
+            LessonInstance.version,
+            LessonInstance.created_at,
+            LessonInstance.updated_at,
+            TimeTableSlot.start_time,
+            TimeTableSlot.end_time,
+            Course.name.label("course_name"),
+            Course.type.label("course_type"),
+            Teacher.first_name.label("teacher_first_name"),
+            Teacher.last_name.label("teacher_last_name"),
+            Group.name.label("group_name"),
+            Room.number.label("room_number"),
+            Room.building.label("room_building")
+        )
+        .join(TimeTableSlot, TimeTableSlot.slot_id == LessonInstance.slot_id)
+        .join(Enrollment, Enrollment.enrollment_id == LessonInstance.enrollment_id)
+        .join(CourseAssignment, CourseAssignment.assignment_id == Enrollment.assignment_id)
+        .join(Course, Course.course_id == CourseAssignment.course_id)
+        .join(Teacher, Teacher.teacher_id == CourseAssignment.teacher_id)
+        .join(Group, Group.group_id == Enrollment.group_id)
+        .outerjoin(Room, Room.room_id == LessonInstance.room_id)
+        .where(
+            LessonInstance.org_id == org_id,
+            LessonInstance.date >= start_date,
+            LessonInstance.date <= end_date
+        )
+        .order_by(LessonInstance.date, TimeTableSlot.start_time)
+    )
+    if kind is not None:
+        resource_column = {
+            "teacher": CourseAssignment.teacher_id,
+            "group": Enrollment.group_id,
+            "room": LessonInstance.room_id
+        }[kind]
+        query = query.where(resource_column == resource_id)
+    return query
 
 
 class LessonRepository(BaseRepository[LessonInstance]):
@@ -17,9 +118,9 @@ class LessonRepository(BaseRepository[LessonInstance]):
     def __init__(self, db: AsyncSession):
         super().__init__(db, LessonInstance)
     
-    async def get_by_id(self, lesson_id: int) -> Optional[LessonInstance]:
-        """Get lesson by ID with all related data."""
-        result = await self.db.execute(
+    async def get_by_id(self, lesson_id: int, org_id: Optional[int] = None) -> Optional[LessonInstance]:
+        """Get lesson by ID with all related data, optionally only within an organization."""
+        query = (
             select(LessonInstance)
             .options(
                 joinedload(LessonInstance.enrollment)
@@ -36,6 +137,9 @@ class LessonRepository(BaseRepository[LessonInstance]):
             )
             .where(LessonInstance.lesson_id == lesson_id)
         )
+        if org_id is not None:
+            query = query.where(LessonInstance.org_id == org_id)
+        result = await self.db.execute(query)
         return result.scalar_one_or_none()
     
     async def get_by_date_range(
@@ -114,62 +218,460 @@ class LessonRepository(BaseRepository[LessonInstance]):
         exclude_lesson_id: Optional[int] = None
     ) -> List[str]:
         """Check for scheduling conflicts."""
-        conflicts = []
+        results = await self.check_conflicts_batch(org_id, [{
+            "date": date,
+            "slot_id": slot_id,
+            "enrollment_id": enrollment_id,
+            "room_id": room_id,
+            "exclude_lesson_id": exclude_lesson_id
+        }])
+        return results[0]
+    
+    async def check_conflicts_batch(
+        self,
+        org_id: int,
+        candidates: List[Dict[str, Any]]
+    ) -> List[List[str]]:
+        """Check many candidate placements for conflicts in a single query.
         
-        # Base query
-        base_query = select(LessonInstance).where(
-            and_(
-                LessonInstance.org_id == org_id,
-                LessonInstance.date == date,
-                LessonInstance.slot_id == slot_id,
-                LessonInstance.status.in_([
-                    LessonStatus.PLANNED,
-                    LessonStatus.CONFIRMED
-                ])
+        Each candidate is a dict with ``date``, ``slot_id``, ``enrollment_id`` and
+        optional ``room_id`` / ``exclude_lesson_id``. Candidates are sent as a
+        VALUES list and joined against active lessons on (date, slot); the
+        result holds one conflict list per candidate, in input order.
+        """
+        if not candidates:
+            return []
+        
+        columns = (
+            column("idx", Integer),
+            column("date", Date),
+            column("slot_id", Integer),
+            column("enrollment_id", Integer),
+            column("room_id", Integer),
+            column("exclude_lesson_id", Integer)
+        )
+        rows = [
+            (
+                idx,
+                candidate["date"],
+                candidate["slot_id"],
+                candidate["enrollment_id"],
+                candidate.get("room_id"),
+                candidate.get("exclude_lesson_id")
             )
+            for idx, candidate in enumerate(candidates)
+        ]
+        if self.db.bind.dialect.name == "sqlite":
+            # SQLite cannot name the columns of a VALUES alias
+            candidate_rows = union_all(*(
+                select(*(literal(value, col.type).label(col.name) for col, value in zip(columns, row)))
+                for row in rows
+            )).subquery("candidates")
+        else:
+            candidate_rows = values(*columns, name="candidates").data(rows)
+        
+        candidate_enrollment = aliased(Enrollment)
+        candidate_assignment = aliased(CourseAssignment)
+        lesson_enrollment = aliased(Enrollment)
+        lesson_assignment = aliased(CourseAssignment)
+        
+        room_clash = and_(
+            candidate_rows.c.room_id.is_not(None),
+            LessonInstance.room_id == candidate_rows.c.room_id
         )
+        teacher_clash = lesson_assignment.teacher_id == candidate_assignment.teacher_id
+        group_clash = lesson_enrollment.group_id == candidate_enrollment.group_id
         
-        if exclude_lesson_id:
-            base_query = base_query.where(
-                LessonInstance.lesson_id != exclude_lesson_id
+        query = (
+            select(
+                candidate_rows.c.idx,
+                func.max(case((room_clash, 1), else_=0)).label("room_clash"),
+                func.max(case((teacher_clash, 1), else_=0)).label("teacher_clash"),
+                func.max(case((group_clash, 1), else_=0)).label("group_clash")
+            )
+            .select_from(candidate_rows)
+            .outerjoin(
+                candidate_enrollment,
+                candidate_enrollment.enrollment_id == candidate_rows.c.enrollment_id
             )
+            .outerjoin(
+                candidate_assignment,
+                candidate_assignment.assignment_id == candidate_enrollment.assignment_id
+            )
+            .join(
+                LessonInstance,
+                and_(
+                    LessonInstance.org_id == org_id,
+                    LessonInstance.date == candidate_rows.c.date,
+                    LessonInstance.slot_id == candidate_rows.c.slot_id,
+                    LessonInstance.status.in_(ACTIVE_LESSON_STATUSES),
+                    or_(
+                        candidate_rows.c.exclude_lesson_id.is_(None),
+                        LessonInstance.lesson_id != candidate_rows.c.exclude_lesson_id
+                    )
+                )
+            )
+            .join(lesson_enrollment, lesson_enrollment.enrollment_id == LessonInstance.enrollment_id)
+            .join(lesson_assignment, lesson_assignment.assignment_id == lesson_enrollment.assignment_id)
+            .where(or_(room_clash, teacher_clash, group_clash))
+            .group_by(candidate_rows.c.idx)
+        )
         
-        # Check room conflict
-        if room_id:
-            room_conflict = await self.db.execute(
-                base_query.where(LessonInstance.room_id == room_id)
+        result = await self.db.execute(query)
+        
+        conflicts: List[List[str]] = [[] for _ in candidates]
+        for row in result:
+            if row.room_clash:
+                conflicts[row.idx].append(ROOM_CONFLICT)
+            if row.teacher_clash:
+                conflicts[row.idx].append(TEACHER_CONFLICT)
+            if row.group_clash:
+                conflicts[row.idx].append(GROUP_CONFLICT)
+        
+        return conflicts
+    
+    async def get_schedule_version(self, org_id: int) -> int:
+        """Current schedule version of an organization, 0 if never written."""
+        result = await self.db.execute(
+            select(ScheduleVersion.version).where(ScheduleVersion.org_id == org_id)
+        )
+        return result.scalar() or 0
+
+    async def get_term_for_date(self, org_id: int, lesson_date: date) -> Optional[int]:
+        """ID of the organization's term covering a date, None if no term does."""
+        result = await self.db.execute(
+            select(Term.term_id)
+            .where(Term.org_id == org_id, Term.start_date <= lesson_date, Term.end_date >= lesson_date)
+            .order_by(Term.start_date)
+            .limit(1)
+        )
+        return result.scalar()
+
+    async def cancel(self, lesson: LessonInstance, updated_by: int) -> LessonInstance:
+        """Soft-delete a lesson: mark it cancelled and keep the row."""
+        lesson.status = LessonStatus.CANCELLED
+        lesson.version = lesson.version + 1
+        lesson.updated_by = updated_by
+        await self.db.commit()
+        await self.db.refresh(lesson)
+        return lesson
+
+    async def get_change_horizon(self) -> Optional[int]:
+        """Lowest transaction id that may still be running, None off PostgreSQL.
+        
+        Every lesson change stamped with a lower transaction id is committed
+        or rolled back; changes at or above it may still appear.
+        """
+        if self.db.bind.dialect.name != "postgresql":
+            return None
+        result = await self.db.execute(
+            text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        )
+        return result.scalar()
+    
+    async def get_pruned_change_seq(self, org_id: int) -> int:
+        """Highest change number whose tombstone was pruned, 0 if none."""
+        result = await self.db.execute(
+            select(ScheduleVersion.pruned_change_seq).where(ScheduleVersion.org_id == org_id)
+        )
+        return result.scalar() or 0
+    
+    async def prune_tombstones(self, before: datetime, dry_run: bool = False) -> int:
+        """Delete tombstones of lessons deleted before a cutoff; returns how many.
+        
+        The highest pruned number is kept per organization, so /changes can
+        send clients with an older cursor back to a full sync.
+        """
+        pruned = (await self.db.execute(
+            select(
+                LessonTombstone.org_id,
+                func.max(LessonTombstone.change_seq).label("change_seq"),
+                func.count().label("count")
             )
-            if room_conflict.scalar_one_or_none():
-                conflicts.append("Room is already booked for this time slot")
+            .where(LessonTombstone.deleted_at < before)
+            .group_by(LessonTombstone.org_id)
+        )).all()
+        if dry_run or not pruned:
+            return sum(row.count for row in pruned)
         
-        # Check teacher conflict
-        enrollment_result = await self.db.execute(
-            select(Enrollment)
-            .join(CourseAssignment)
-            .where(Enrollment.enrollment_id == enrollment_id)
+        for row in pruned:
+            updated = await self.db.execute(
+                update(ScheduleVersion)
+                .where(ScheduleVersion.org_id == row.org_id, ScheduleVersion.pruned_change_seq < row.change_seq)
+                .values(pruned_change_seq=row.change_seq)
+            )
+            if updated.rowcount == 0 and await self.db.get(ScheduleVersion, row.org_id) is None:
+                self.db.add(ScheduleVersion(org_id=row.org_id, version=0, pruned_change_seq=row.change_seq))
+        await self.db.execute(delete(LessonTombstone).where(LessonTombstone.deleted_at < before))
+        return sum(row.count for row in pruned)
+    
+    async def get_resource_name(self, org_id: int, kind: str, resource_id: int) -> Optional[str]:
+        """Display name of a teacher, group or room in the organization."""
+        if kind == "teacher":
+            query = select(func.concat(Teacher.first_name, ' ', Teacher.last_name)).where(
+                Teacher.org_id == org_id, Teacher.teacher_id == resource_id
+            )
+        elif kind == "group":
+            query = select(Group.name).where(Group.org_id == org_id, Group.group_id == resource_id)
+        else:
+            query = select(Room.number).where(Room.org_id == org_id, Room.room_id == resource_id)
+        return (await self.db.execute(query)).scalar()
+    
+    async def _occupancy_snapshot(self, org_id: int, start_date: date, end_date: date) -> Dict[str, set]:
+        """Occupied (date, slot_id, resource_id) keys per resource for a date range.
+        
+        Rooms count for every status because ``uq_org_date_slot_room`` is not
+        partial; teachers and groups only for active lessons.
+        """
+        query = (
+            select(
+                LessonInstance.date,
+                LessonInstance.slot_id,
+                LessonInstance.room_id,
+                LessonInstance.status,
+                CourseAssignment.teacher_id,
+                Enrollment.group_id
+            )
+            .join(Enrollment, Enrollment.enrollment_id == LessonInstance.enrollment_id)
+            .join(CourseAssignment, CourseAssignment.assignment_id == Enrollment.assignment_id)
+            .where(
+                LessonInstance.org_id == org_id,
+                LessonInstance.date >= start_date,
+                LessonInstance.date <= end_date
+            )
         )
-        enrollment = enrollment_result.scalar_one_or_none()
         
-        if enrollment:
-            teacher_conflict = await self.db.execute(
-                base_query
-                .join(Enrollment)
-                .join(CourseAssignment)
-                .where(CourseAssignment.teacher_id == enrollment.assignment.teacher_id)
+        occupancy = {"room": set(), "teacher": set(), "group": set()}
+        for row in await self.db.execute(query):
+            if row.room_id is not None:
+                occupancy["room"].add((row.date, row.slot_id, row.room_id))
+            if row.status in ACTIVE_LESSON_STATUSES:
+                occupancy["teacher"].add((row.date, row.slot_id, row.teacher_id))
+                occupancy["group"].add((row.date, row.slot_id, row.group_id))
+        return occupancy
+    
+    async def bulk_create(
+        self,
+        org_id: int,
+        created_by: int,
+        lessons: List[Dict[str, Any]],
+        atomic: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Validate and insert many lessons with a handful of queries.
+        
+        Each lesson is a dict with ``date``, ``slot_id``, ``room_id``,
+        ``enrollment_id`` and ``status``. Rows are checked in order against a
+        snapshot of existing occupancy and against earlier rows of the batch;
+        clean rows are written with batched multi-row INSERT ... RETURNING.
+        With ``atomic`` nothing is written if any row is rejected.
+        
+        Returns one ``{"index", "lesson_id", "errors"}`` dict per input row.
+        The caller commits; a concurrent write can still surface as an
+        IntegrityError on commit.
+        """
+        results = [{"index": idx, "lesson_id": None, "errors": []} for idx in range(len(lessons))]
+        if not lessons:
+            return results
+        
+        enrollment_ids = {lesson["enrollment_id"] for lesson in lessons}
+        enrollment_rows = await self.db.execute(
+            select(Enrollment.enrollment_id, Enrollment.group_id, CourseAssignment.teacher_id)
+            .join(CourseAssignment, CourseAssignment.assignment_id == Enrollment.assignment_id)
+            .where(Enrollment.org_id == org_id, Enrollment.enrollment_id.in_(enrollment_ids))
+        )
+        enrollments = {row.enrollment_id: row for row in enrollment_rows}
+        
+        slot_ids = {lesson["slot_id"] for lesson in lessons}
+        known_slots = set((await self.db.execute(
+            select(TimeTableSlot.slot_id)
+            .where(TimeTableSlot.org_id == org_id, TimeTableSlot.slot_id.in_(slot_ids))
+        )).scalars())
+        
+        room_ids = {lesson["room_id"] for lesson in lessons if lesson.get("room_id") is not None}
+        known_rooms = set((await self.db.execute(
+            select(Room.room_id).where(Room.org_id == org_id, Room.room_id.in_(room_ids))
+        )).scalars()) if room_ids else set()
+        
+        terms = (await self.db.execute(
+            select(Term.term_id, Term.start_date, Term.end_date).where(Term.org_id == org_id)
+        )).all()
+        
+        dates = [lesson["date"] for lesson in lessons]
+        occupancy = await self._occupancy_snapshot(org_id, min(dates), max(dates))
+        
+        accepted = []
+        for idx, lesson in enumerate(lessons):
+            errors = results[idx]["errors"]
+            lesson_date, slot_id, room_id = lesson["date"], lesson["slot_id"], lesson.get("room_id")
+            
+            if lesson.get("org_id", org_id) != org_id:
+                errors.append("Lesson belongs to another organization")
+            if not isinstance(lesson["status"], LessonStatus):
+                errors.append("Unknown lesson status")
+            enrollment = enrollments.get(lesson["enrollment_id"])
+            if enrollment is None:
+                errors.append("Enrollment not found")
+            if slot_id not in known_slots:
+                errors.append("Time slot not found")
+            if room_id is not None and room_id not in known_rooms:
+                errors.append("Room not found")
+            term_id = next(
+                (term.term_id for term in terms if term.start_date <= lesson_date <= term.end_date),
+                None
             )
-            if teacher_conflict.scalar_one_or_none():
-                conflicts.append("Teacher has another lesson at this time")
+            if term_id is None:
+                errors.append("No term covers this date")
+            if errors:
+                continue
+            
+            status = lesson["status"]
+            active = status in ACTIVE_LESSON_STATUSES
+            room_key = (lesson_date, slot_id, room_id)
+            teacher_key = (lesson_date, slot_id, enrollment.teacher_id)
+            group_key = (lesson_date, slot_id, enrollment.group_id)
+            
+            if room_id is not None and room_key in occupancy["room"]:
+                errors.append(ROOM_CONFLICT)
+            if active and teacher_key in occupancy["teacher"]:
+                errors.append(TEACHER_CONFLICT)
+            if active and group_key in occupancy["group"]:
+                errors.append(GROUP_CONFLICT)
+            if errors:
+                continue
             
-            # Check group conflict
-            group_conflict = await self.db.execute(
-                base_query
-                .join(Enrollment)
-                .where(Enrollment.group_id == enrollment.group_id)
+            # Later rows of the batch see this one as occupied
+            if room_id is not None:
+                occupancy["room"].add(room_key)
+            if active:
+                occupancy["teacher"].add(teacher_key)
+                occupancy["group"].add(group_key)
+            
+            accepted.append((idx, {
+                "org_id": org_id,
+                "term_id": term_id,
+                "date": lesson_date,
+                "slot_id": slot_id,
+                "room_id": room_id,
+                "enrollment_id": lesson["enrollment_id"],
+                "teacher_id": enrollment.teacher_id,
+                "group_id": enrollment.group_id,
+                "status": status,
+                "created_by": created_by,
+                "version": 1
+            }))
+        
+        if not accepted or (atomic and len(accepted) < len(lessons)):
+            return results
+        
+        # executemany with RETURNING is sent as paged multi-row INSERTs
+        result = await self.db.execute(
+            insert(LessonInstance).returning(LessonInstance.lesson_id, sort_by_parameter_order=True),
+            [row for _, row in accepted]
+        )
+        for (idx, _), lesson_id in zip(accepted, result.scalars().all()):
+            results[idx]["lesson_id"] = lesson_id
+        
+        return results
+    
+    def _clash_groups(self, kind: str, resource_column, org_id: int, start_date: date, end_date: date):
+        """Select (date, slot, resource) groups holding more than one active lesson."""
+        lesson_count = func.count(LessonInstance.lesson_id)
+        query = (
+            select(
+                literal(kind).label("kind"),
+                resource_column.label("resource_id"),
+                LessonInstance.date.label("date"),
+                LessonInstance.slot_id.label("slot_id"),
+                lesson_count.label("lesson_count"),
+                func.aggregate_strings(cast(LessonInstance.lesson_id, String), ",").label("lesson_ids")
+            )
+            .select_from(LessonInstance)
+            .join(Enrollment, Enrollment.enrollment_id == LessonInstance.enrollment_id)
+            .join(CourseAssignment, CourseAssignment.assignment_id == Enrollment.assignment_id)
+            .where(
+                and_(
+                    LessonInstance.org_id == org_id,
+                    LessonInstance.date >= start_date,
+                    LessonInstance.date <= end_date,
+                    LessonInstance.status.in_(ACTIVE_LESSON_STATUSES),
+                    resource_column.is_not(None)
+                )
             )
-            if group_conflict.scalar_one_or_none():
-                conflicts.append("Group has another lesson at this time")
+            .group_by(LessonInstance.date, LessonInstance.slot_id, resource_column)
+            .having(lesson_count > 1)
+        )
+        return query
+    
+    async def get_conflicts_report(
+        self,
+        org_id: int,
+        start_date: date,
+        end_date: date,
+        skip: int = 0,
+        limit: int = 100
+    ) -> dict:
+        """Find room, teacher and group double-bookings in a date range.
         
-        return conflicts
+        The clash indexes reject new double-bookings on a lesson's own
+        room_id, teacher_id and group_id, so this is a consistency check.
+        Teachers and groups are resolved through the current enrollment,
+        which finds the lessons the indexes cannot see: those whose stamped
+        teacher_id/group_id is NULL or stale because an enrollment or
+        assignment changed without the migration 002 triggers. The room
+        constraint covers every status, so room clashes only show up on
+        databases that skipped it.
+        
+        Clashes are grouped in the database; one query returns the
+        requested page and one returns the org-wide summary per kind.
+        """
+        clashes = union_all(
+            self._clash_groups("room", LessonInstance.room_id, org_id, start_date, end_date),
+            self._clash_groups("teacher", CourseAssignment.teacher_id, org_id, start_date, end_date),
+            self._clash_groups("group", Enrollment.group_id, org_id, start_date, end_date)
+        ).subquery("clashes")
+        
+        page_result = await self.db.execute(
+            select(clashes)
+            .order_by(clashes.c.date, clashes.c.slot_id, clashes.c.kind, clashes.c.resource_id)
+            .offset(skip)
+            .limit(limit)
+        )
+        items = [
+            {
+                "kind": row.kind,
+                "resource_id": row.resource_id,
+                "date": row.date,
+                "slot_id": row.slot_id,
+                "lesson_count": row.lesson_count,
+                "lesson_ids": sorted(int(lesson_id) for lesson_id in row.lesson_ids.split(","))
+            }
+            for row in page_result
+        ]
+        
+        summary_result = await self.db.execute(
+            select(
+                clashes.c.kind,
+                func.count().label("conflicts"),
+                func.sum(clashes.c.lesson_count).label("lessons")
+            ).group_by(clashes.c.kind)
+        )
+        summary = {"total": 0}
+        for row in summary_result:
+            summary[row.kind] = {"conflicts": row.conflicts, "lessons": row.lessons or 0}
+            summary["total"] += row.conflicts
+        
+        return {"items": items, "summary": summary}
+    
+    async def _count_by_status(self, query) -> dict:
+        """Run a status-grouped count and return it in the workload shape."""
+        result = await self.db.execute(query.group_by(LessonInstance.status))
+        by_status = {status.value: 0 for status in LessonStatus}
+        for lesson_status, lesson_count in result:
+            by_status[lesson_status.value] = lesson_count
+        return {
+            "total_lessons": sum(by_status.values()),
+            "by_status": by_status
+        }
     
     async def get_teacher_workload(
         self,
@@ -179,8 +681,8 @@ class LessonRepository(BaseRepository[LessonInstance]):
         end_date: date
     ) -> dict:
         """Get teacher workload statistics."""
-        result = await self.db.execute(
-            select(LessonInstance)
+        workload = await self._count_by_status(
+            select(LessonInstance.status, func.count(LessonInstance.lesson_id))
             .join(Enrollment)
             .join(CourseAssignment)
             .where(
@@ -189,24 +691,12 @@ class LessonRepository(BaseRepository[LessonInstance]):
                     CourseAssignment.teacher_id == teacher_id,
                     LessonInstance.date >= start_date,
                     LessonInstance.date <= end_date,
-                    LessonInstance.status.in_([
-                        LessonStatus.PLANNED,
-                        LessonStatus.CONFIRMED,
-                        LessonStatus.COMPLETED
-                    ])
+                    LessonInstance.status.in_(WORKLOAD_LESSON_STATUSES)
                 )
             )
         )
-        lessons = result.scalars().all()
-        
-        return {
-            "total_lessons": len(lessons),
-            "by_status": {
-                status.value: len([l for l in lessons if l.status == status])
-                for status in LessonStatus
-            },
-            "by_date": {}  # Can be extended with daily breakdown
-        }
+        workload["by_date"] = {}  # Use get_workload_report for date breakdowns
+        return workload
     
     async def get_group_workload(
         self,
@@ -216,8 +706,8 @@ class LessonRepository(BaseRepository[LessonInstance]):
         end_date: date
     ) -> dict:
         """Get group workload statistics."""
-        result = await self.db.execute(
-            select(LessonInstance)
+        return await self._count_by_status(
+            select(LessonInstance.status, func.count(LessonInstance.lesson_id))
             .join(Enrollment)
             .where(
                 and_(
@@ -225,20 +715,174 @@ class LessonRepository(BaseRepository[LessonInstance]):
                     Enrollment.group_id == group_id,
                     LessonInstance.date >= start_date,
                     LessonInstance.date <= end_date,
-                    LessonInstance.status.in_([
-                        LessonStatus.PLANNED,
-                        LessonStatus.CONFIRMED,
-                        LessonStatus.COMPLETED
-                    ])
+                    LessonInstance.status.in_(WORKLOAD_LESSON_STATUSES)
                 )
             )
         )
-        lessons = result.scalars().all()
+    
+    async def get_workload_report(
+        self,
+        org_id: int,
+        kind: str,
+        start_date: date,
+        end_date: date,
+        bucket: str = "week",
+        resource_id: Optional[int] = None,
+        use_rollups: bool = False
+    ) -> List[dict]:
+        """Workload for every teacher or group of an org in two queries.
         
-        return {
-            "total_lessons": len(lessons),
-            "by_status": {
-                status.value: len([l for l in lessons if l.status == status])
-                for status in LessonStatus
+        ``kind`` is ``"teacher"`` or ``"group"`` and ``bucket`` is ``"day"``,
+        ``"week"`` or ``"month"``. Lessons are counted per (resource, bucket,
+        status) with scheduled minutes taken from slot durations; planned
+        hours come from ``Enrollment.planned_hours``, with ``per_week``
+        enrollments scaled by the number of weeks in the range.
+        
+        With ``use_rollups``, weekly reports over whole weeks (Monday to
+        Sunday) read ``workload_rollups`` instead of raw lessons.
+        """
+        if kind == "teacher":
+            resource_column = CourseAssignment.teacher_id
+            resources_query = (
+                select(
+                    Teacher.teacher_id.label("resource_id"),
+                    func.concat(Teacher.first_name, ' ', Teacher.last_name).label("name"),
+                    self._planned_hours_column(start_date, end_date)
+                )
+                .select_from(Teacher)
+                .outerjoin(CourseAssignment, CourseAssignment.teacher_id == Teacher.teacher_id)
+                .outerjoin(Enrollment, Enrollment.assignment_id == CourseAssignment.assignment_id)
+                .where(Teacher.org_id == org_id)
+                .group_by(Teacher.teacher_id, Teacher.first_name, Teacher.last_name)
+                .order_by(Teacher.last_name, Teacher.first_name)
+            )
+            if resource_id:
+                resources_query = resources_query.where(Teacher.teacher_id == resource_id)
+        elif kind == "group":
+            resource_column = Enrollment.group_id
+            resources_query = (
+                select(
+                    Group.group_id.label("resource_id"),
+                    Group.name.label("name"),
+                    self._planned_hours_column(start_date, end_date)
+                )
+                .select_from(Group)
+                .outerjoin(Enrollment, Enrollment.group_id == Group.group_id)
+                .where(Group.org_id == org_id)
+                .group_by(Group.group_id, Group.name)
+                .order_by(Group.name)
+            )
+            if resource_id:
+                resources_query = resources_query.where(Group.group_id == resource_id)
+        else:
+            raise ValueError(f"Unknown workload kind: {kind}")
+        
+        period = _date_bucket(LessonInstance.date, bucket)
+        slot_minutes = func.extract(
+            "epoch", TimeTableSlot.end_time - TimeTableSlot.start_time
+        ) / 60
+        lessons_query = (
+            select(
+                resource_column.label("resource_id"),
+                period.label("period"),
+                LessonInstance.status,
+                func.count(LessonInstance.lesson_id).label("lessons"),
+                func.coalesce(func.sum(slot_minutes), 0).label("minutes")
+            )
+            .select_from(LessonInstance)
+            .join(Enrollment, Enrollment.enrollment_id == LessonInstance.enrollment_id)
+            .join(CourseAssignment, CourseAssignment.assignment_id == Enrollment.assignment_id)
+            .join(TimeTableSlot, TimeTableSlot.slot_id == LessonInstance.slot_id)
+            .where(
+                and_(
+                    LessonInstance.org_id == org_id,
+                    LessonInstance.date >= start_date,
+                    LessonInstance.date <= end_date,
+                    LessonInstance.status.in_(WORKLOAD_LESSON_STATUSES)
+                )
+            )
+            .group_by(resource_column, period, LessonInstance.status)
+        )
+        if resource_id:
+            lessons_query = lessons_query.where(resource_column == resource_id)
+        
+        if use_rollups and bucket == "week" and start_date.weekday() == 0 and end_date.weekday() == 6:
+            lessons_query = (
+                select(
+                    WorkloadRollup.resource_id,
+                    WorkloadRollup.week_start.label("period"),
+                    WorkloadRollup.status,
+                    func.sum(WorkloadRollup.lesson_count).label("lessons"),
+                    func.sum(WorkloadRollup.minutes).label("minutes")
+                )
+                .where(
+                    and_(
+                        WorkloadRollup.org_id == org_id,
+                        WorkloadRollup.kind == kind,
+                        WorkloadRollup.week_start >= start_date,
+                        WorkloadRollup.week_start <= end_date,
+                        WorkloadRollup.status.in_(WORKLOAD_LESSON_STATUSES)
+                    )
+                )
+                .group_by(WorkloadRollup.resource_id, WorkloadRollup.week_start, WorkloadRollup.status)
+                .having(func.sum(WorkloadRollup.lesson_count) > 0)
+            )
+            if resource_id:
+                lessons_query = lessons_query.where(WorkloadRollup.resource_id == resource_id)
+        
+        resources_result = await self.db.execute(resources_query)
+        items = {}
+        for row in resources_result:
+            items[row.resource_id] = {
+                "resource_id": row.resource_id,
+                "name": row.name,
+                "total_lessons": 0,
+                "by_status": {status.value: 0 for status in LessonStatus},
+                "planned_hours": float(row.planned_hours or 0),
+                "scheduled_hours": 0.0,
+                "buckets": {}
             }
-        }
+        
+        lessons_result = await self.db.execute(lessons_query)
+        for row in lessons_result:
+            item = items.get(row.resource_id)
+            if item is None:
+                continue
+            minutes = float(row.minutes)
+            item["total_lessons"] += row.lessons
+            item["by_status"][row.status.value] += row.lessons
+            item["scheduled_hours"] += minutes / 60
+            period_item = item["buckets"].setdefault(
+                row.period, {"period": row.period, "lessons": 0, "minutes": 0}
+            )
+            period_item["lessons"] += row.lessons
+            period_item["minutes"] += int(minutes)
+        
+        for item in items.values():
+            item["scheduled_hours"] = round(item["scheduled_hours"], 2)
+            item["buckets"] = [item["buckets"][key] for key in sorted(item["buckets"])]
+        
+        return list(items.values())
+    
+    @staticmethod
+    def _planned_hours_column(start_date: date, end_date: date):
+        """Planned hours for the range summed over the joined enrollments."""
+        weeks = max(1, -(-((end_date - start_date).days + 1) // 7))
+        return func.coalesce(
+            func.sum(
+                case(
+                    (Enrollment.unit == "per_week", Enrollment.planned_hours * weeks),
+                    else_=Enrollment.planned_hours
+                )
+            ),
+            0
+        ).label("planned_hours")
+
+
+def _date_bucket(column, bucket: str):
+    """Truncate a date column to the start of its day, week or month."""
+    if bucket == "day":
+        return column
+    if bucket in ("week", "month"):
+        return cast(func.date_trunc(bucket, column), Date)
+    raise ValueError(f"Unknown bucket: {bucket}")
@@ -1,10 +1,11 @@
 """User repository."""
 
-from typing import Optional
+from typing import Optional, Any, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete
 from .base import BaseRepository
 from ..models.user import User
+from ..services.schedule_events import schedule_events
 
 
 class UserRepository(BaseRepository[User]):
@@ -37,3 +38,19 @@ class UserRepository(BaseRepository[User]):
             .order_by(User.created_at.desc())
         )
         return result.scalars().all()
+    
+    async def update(self, db_obj: User, obj_in: Dict[str, Any]) -> User:
+        """Update user, invalidating cached auth state on access changes."""
+        user = await super().update(db_obj, obj_in)
+        if {"role", "is_active", "org_id", "email"} & obj_in.keys():
+            await schedule_events.invalidate_user(user.user_id)
+        return user
+    
+    async def delete(self, user_id: int) -> bool:
+        """Delete user by ID and invalidate cached auth state."""
+        result = await self.db.execute(
+            delete(User).where(User.user_id == user_id)
+        )
+        await self.db.commit()
+        await schedule_events.invalidate_user(user_id)
+        return result.rowcount > 0
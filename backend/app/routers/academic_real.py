@@ -7,7 +7,7 @@ from sqlalchemy import select, insert, update, delete
 from pydantic import BaseModel
 from datetime import date
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.auth import get_current_active_user_or_demo
 from app.models.academic import AcademicYear, Term
 from app.models.user import User
@@ -38,7 +38,7 @@ class AcademicYearUpdate(BaseModel):
 async def get_academic_years(
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get academic years with pagination."""
@@ -183,7 +183,7 @@ async def get_terms(
     limit: int = 100,
     academic_year_id: Optional[int] = None,
     is_active: Optional[bool] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get terms with pagination."""
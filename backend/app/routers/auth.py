@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.database import get_db
 from ..core.auth import (
-    verify_password, get_password_hash, create_access_token,
+    verify_password_async, get_password_hash_async, create_user_access_token,
     get_current_active_user
 )
 from ..core.config import settings
@@ -36,6 +36,9 @@ async def register(
             detail="Email already registered"
         )
     
+    # Hash outside the transaction so a saturated pool surfaces as 503
+    password_hash = await get_password_hash_async(request.password)
+    
     try:
         # Create organization
         org_repo = OrganizationRepository(db)
@@ -49,7 +52,7 @@ async def register(
         # Create admin user
         user_data = {
             "email": request.email,
-            "password_hash": get_password_hash(request.password),
+            "password_hash": password_hash,
             "role": UserRole.ADMIN,
             "org_id": organization.org_id,
             "is_active": True
@@ -57,8 +60,8 @@ async def register(
         user = await user_repo.create(user_data)
         
         # Create access token
-        access_token = create_access_token(
-            data={"sub": str(user.user_id)},
+        access_token = create_user_access_token(
+            user,
             expires_delta=timedelta(seconds=settings.JWT_EXPIRES)
         )
         
@@ -92,7 +95,7 @@ async def login(
     user_repo = UserRepository(db)
     user = await user_repo.get_by_email(request.email)
     
-    if not user or not verify_password(request.password, user.password_hash):
+    if not user or not await verify_password_async(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -105,8 +108,8 @@ async def login(
         )
     
     # Create access token
-    access_token = create_access_token(
-        data={"sub": str(user.user_id)},
+    access_token = create_user_access_token(
+        user,
         expires_delta=timedelta(seconds=settings.JWT_EXPIRES)
     )
     
@@ -150,9 +153,7 @@ async def demo_login(db: AsyncSession = Depends(get_db)):
         )
     
     # Create demo access token
-    access_token = create_access_token(
-        data={"sub": str(user.user_id), "org_id": user.org_id}
-    )
+    access_token = create_user_access_token(user)
     
     return LoginResponse(
         access_token=access_token,
@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, insert, update, delete
 from pydantic import BaseModel
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.auth import get_current_active_user_or_demo
 from app.models.educational import Group, Teacher, Course, CourseAssignment, Enrollment
 from app.models.user import User
@@ -43,7 +43,7 @@ async def get_groups(
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get groups with pagination and search."""
@@ -206,7 +206,7 @@ async def get_teachers(
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get teachers with pagination and search."""
@@ -363,7 +363,7 @@ async def get_courses(
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get courses with pagination and search."""
@@ -502,7 +502,7 @@ async def get_course_assignments(
     teacher_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get course assignments with pagination."""
@@ -616,7 +616,7 @@ async def get_enrollments(
     assignment_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get enrollments with pagination."""
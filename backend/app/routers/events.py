@@ -0,0 +1,105 @@
+"""Schedule change events router (SSE and WebSocket)."""
+
+import asyncio
+from datetime import date
+
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+
+from ..core.auth import user_from_token_or_demo
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.user import User
+from ..services.schedule_events import schedule_events
+
+router = APIRouter()
+
+
+async def _authenticate(access_token: str, start_date: date, end_date: date) -> User:
+    """Resolve the subscriber from a query-string token.
+    
+    A session is opened only for the lookup so long-lived streams do not
+    hold a pooled connection.
+    """
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    async with AsyncSessionLocal() as db:
+        user = await user_from_token_or_demo(access_token, db)
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    return user
+
+
+@router.get("/schedule")
+async def stream_schedule_events(
+    request: Request,
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    access_token: str = Query(..., description="Access token, EventSource cannot send headers")
+):
+    """Server-sent events for lesson changes in the user's organization and date range."""
+    user = await _authenticate(access_token, start_date, end_date)
+    
+    async def event_stream():
+        # Subscribe only once the response is iterated, so a response that is
+        # never sent cannot leave a subscription behind
+        subscription = schedule_events.subscribe(user.org_id, start_date, end_date)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(),
+                        timeout=settings.SCHEDULE_EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event['kind']}\ndata: {orjson.dumps(event).decode()}\n\n"
+        finally:
+            schedule_events.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/schedule/ws")
+async def schedule_events_socket(
+    websocket: WebSocket,
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    access_token: str = Query(...)
+):
+    """WebSocket variant of the schedule change stream."""
+    try:
+        user = await _authenticate(access_token, start_date, end_date)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    subscription = schedule_events.subscribe(user.org_id, start_date, end_date)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    timeout=settings.SCHEDULE_EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                event = {"kind": "ping"}
+            await websocket.send_text(orjson.dumps(event).decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        schedule_events.unsubscribe(subscription)
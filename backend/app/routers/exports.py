@@ -0,0 +1,323 @@
+"""Schedule export router."""
+
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.auth import get_current_active_user_or_demo, create_feed_token, decode_feed_token
+from ..core.config import settings
+from ..core.metrics import feed_requests
+from ..core.database import get_db, get_read_db, read_session
+from ..models.organization import Organization
+from ..models.scheduling import CalendarFeed
+from ..models.user import User
+from ..repositories.lesson import LessonRepository, schedule_query
+from ..services.ical import CALENDAR_FOOTER, calendar_header, lesson_event
+from ..services.spreadsheet import CsvStreamWriter, XlsxStreamWriter
+
+router = APIRouter()
+
+FEED_KIND_PATTERN = "^(teacher|group|room)$"
+
+# Rows fetched per round trip from the server-side cursor
+FEED_FETCH_SIZE = 500
+
+# Calendar clients revalidate with If-None-Match after this
+FEED_CACHE_SECONDS = 300
+
+# Rows per batch for schedule exports; memory stays bounded by this
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = (
+    "date", "start_time", "end_time", "course", "course_type", "teacher",
+    "group", "room", "building", "status"
+)
+
+# Starlette appends "; charset=utf-8" to text/* types itself
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+
+# Default feed window around today
+FEED_PAST_DAYS = 30
+FEED_FUTURE_DAYS = 180
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match lists the ETag, ignoring weak prefixes."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in header.split(","))
+
+
+async def _stream_calendar(query, name: str, tz_name: str):
+    """Yield the calendar in chunks straight from a server-side cursor."""
+    tz = ZoneInfo(tz_name)
+    yield calendar_header(name, tz_name)
+    async with read_session() as db:
+        result = await db.stream(query.execution_options(yield_per=FEED_FETCH_SIZE))
+        async for rows in result.partitions():
+            yield "".join(lesson_event(row, tz) for row in rows)
+    yield CALENDAR_FOOTER
+
+
+async def _stream_schedule(query, export_format: str):
+    """Yield an encoded CSV or XLSX export batch by batch from a server-side cursor."""
+    if export_format == "xlsx":
+        writer = XlsxStreamWriter(EXPORT_COLUMNS, sheet_name="Schedule")
+    else:
+        writer = CsvStreamWriter(EXPORT_COLUMNS)
+
+    async with read_session() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield writer.write_rows(
+                (
+                    row.date.isoformat(),
+                    row.start_time.strftime("%H:%M"),
+                    row.end_time.strftime("%H:%M"),
+                    row.course_name,
+                    row.course_type,
+                    f"{row.teacher_first_name} {row.teacher_last_name}",
+                    row.group_name,
+                    row.room_number,
+                    row.room_building,
+                    row.status.value
+                )
+                for row in rows
+            )
+    yield writer.close()
+
+
+async def _calendar_response(
+    request: Request,
+    db: AsyncSession,
+    org_id: int,
+    kind: str,
+    resource_id: int,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    filename: Optional[str] = None
+) -> Response:
+    """Answer a feed request with 304 when unchanged, otherwise stream the calendar.
+
+    The ETag is derived from the organization's schedule version, so an
+    unchanged schedule costs two primary-key lookups instead of the
+    lesson join.
+    """
+    today = date.today()
+    start_date = start_date or today - timedelta(days=FEED_PAST_DAYS)
+    end_date = end_date or today + timedelta(days=FEED_FUTURE_DAYS)
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+
+    lesson_repo = LessonRepository(db)
+    name = await lesson_repo.get_resource_name(org_id, kind, resource_id)
+    if name is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{kind.capitalize()} not found"
+        )
+
+    tz_name = (await db.execute(
+        select(Organization.tz).where(Organization.org_id == org_id)
+    )).scalar() or settings.TZ
+    try:
+        ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        tz_name = settings.TZ
+
+    version = await lesson_repo.get_schedule_version(org_id)
+    # Catalog renames bump the schedule version; time zone changes do not
+    fingerprint = zlib.crc32(tz_name.encode())
+    etag = f'W/"{org_id}-{kind}{resource_id}-{start_date:%Y%m%d}-{end_date:%Y%m%d}-v{version}-{fingerprint:x}"'
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={FEED_CACHE_SECONDS}"
+    }
+    if _etag_matches(request, etag):
+        feed_requests.inc(result="not_modified")
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    feed_requests.inc(result="full")
+    query = schedule_query(org_id, start_date, end_date, kind, resource_id)
+    return StreamingResponse(
+        _stream_calendar(query, name, tz_name),
+        media_type="text/calendar",
+        headers=headers
+    )
+
+
+@router.get("/ical")
+async def export_ical(
+    request: Request,
+    teacher_id: Optional[int] = Query(None),
+    group_id: Optional[int] = Query(None),
+    room_id: Optional[int] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user_or_demo)
+):
+    """Download the schedule of one teacher, group or room as an .ics file."""
+    selected = [
+        (kind, resource_id)
+        for kind, resource_id in (("teacher", teacher_id), ("group", group_id), ("room", room_id))
+        if resource_id is not None
+    ]
+    if len(selected) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Specify exactly one of teacher_id, group_id or room_id"
+        )
+
+    kind, resource_id = selected[0]
+    return await _calendar_response(
+        request, db, current_user.org_id, kind, resource_id, start_date, end_date,
+        filename=f"{kind}-{resource_id}.ics"
+    )
+
+
+@router.get("/ical/{kind}/{resource_id}/feed-url")
+async def get_ical_feed_url(
+    request: Request,
+    kind: str = Path(..., pattern=FEED_KIND_PATTERN),
+    resource_id: int = Path(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_demo)
+):
+    """Hand out a subscription URL for a teacher, group or room calendar.
+
+    Every call creates a new link that can be revoked on its own.
+    """
+    lesson_repo = LessonRepository(db)
+    if await lesson_repo.get_resource_name(current_user.org_id, kind, resource_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{kind.capitalize()} not found"
+        )
+
+    feed = CalendarFeed(
+        org_id=current_user.org_id,
+        kind=kind,
+        resource_id=resource_id,
+        created_by=current_user.user_id
+    )
+    db.add(feed)
+    await db.commit()
+
+    token = create_feed_token(feed)
+    return {"feed_id": feed.feed_id, "url": str(request.url_for("get_ical_feed", token=token))}
+
+
+@router.get("/ical/feeds")
+async def list_ical_feeds(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user_or_demo)
+):
+    """List the organization's calendar feed links that are not revoked."""
+    result = await db.execute(
+        select(CalendarFeed)
+        .where(CalendarFeed.org_id == current_user.org_id, CalendarFeed.revoked_at.is_(None))
+        .order_by(CalendarFeed.feed_id)
+    )
+    return [
+        {
+            "feed_id": feed.feed_id,
+            "kind": feed.kind,
+            "resource_id": feed.resource_id,
+            "created_by": feed.created_by,
+            "created_at": feed.created_at
+        }
+        for feed in result.scalars()
+    ]
+
+
+@router.delete("/ical/feeds/{feed_id}")
+async def revoke_ical_feed(
+    feed_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_demo)
+):
+    """Revoke a calendar feed link; subscribers get 404 from then on."""
+    feed = await db.get(CalendarFeed, feed_id)
+    if feed is None or feed.org_id != current_user.org_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Calendar feed not found"
+        )
+
+    if feed.revoked_at is None:
+        feed.revoked_at = datetime.now(timezone.utc)
+        await db.commit()
+    return {"message": "Calendar feed revoked"}
+
+
+@router.get("/ical/feed/{token}.ics")
+async def get_ical_feed(
+    request: Request,
+    token: str,
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Calendar subscription feed, authorized by the token in the URL."""
+    feed = await decode_feed_token(token, db)
+    return await _calendar_response(
+        request, db, feed.org_id, feed.kind, feed.resource_id, start_date, end_date
+    )
+
+
+@router.get("/schedule")
+async def export_schedule(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    teacher_id: Optional[int] = Query(None),
+    group_id: Optional[int] = Query(None),
+    room_id: Optional[int] = Query(None),
+    current_user: User = Depends(get_current_active_user_or_demo)
+):
+    """Export lessons for a date range as CSV or XLSX, optionally for one resource."""
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    selected = [
+        (kind, resource_id)
+        for kind, resource_id in (("teacher", teacher_id), ("group", group_id), ("room", room_id))
+        if resource_id is not None
+    ]
+    if len(selected) > 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Specify at most one of teacher_id, group_id or room_id"
+        )
+    kind, resource_id = selected[0] if selected else (None, None)
+
+    query = schedule_query(current_user.org_id, start_date, end_date, kind, resource_id)
+    filename = f"schedule-{start_date:%Y%m%d}-{end_date:%Y%m%d}.{format}"
+    return StreamingResponse(
+        _stream_schedule(query, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -7,7 +7,7 @@ from sqlalchemy import select, insert, update, delete
 from pydantic import BaseModel
 from datetime import date, time
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.auth import get_current_active_user_or_demo
 from app.models.facilities import Room, TimeTableSlot, TeacherAvailability, Holiday
 from app.models.user import User
@@ -44,7 +44,7 @@ async def get_rooms(
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get rooms with pagination and search."""
@@ -202,7 +202,7 @@ class TimeSlotUpdate(BaseModel):
 async def get_time_slots(
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get time slots with pagination."""
@@ -332,7 +332,7 @@ async def get_holidays(
     skip: int = 0,
     limit: int = 100,
     year: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get holidays with pagination."""
@@ -433,7 +433,7 @@ async def get_teacher_availability(
     teacher_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get teacher availability with pagination."""
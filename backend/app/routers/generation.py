@@ -1,19 +1,26 @@
 """Schedule generation router."""
 
+import logging
+import time
 from typing import List, Dict, Any
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from datetime import date
+from datetime import date, datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.auth import get_current_active_user_or_demo
-from app.models.scheduling import LessonInstance, LessonStatus
+from app.core.metrics import generation_runs, generation_duration, generation_lessons
+from app.models.scheduling import LessonInstance, LessonStatus, GenerationJob, GenerationStatus, GenerationScope
 from app.models.educational import Enrollment, Group, Teacher, Course, CourseAssignment
 from app.models.facilities import Room, TimeTableSlot
 from app.models.user import User
+from app.services.schedule_events import schedule_events, range_event
+from app.services.audit import audit_log, lesson_snapshot, AUDITED_LESSON_FIELDS
+from app.services.generation_profile import GenerationProfile
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Simple request/response models for demo
 class GenerationRuleset(BaseModel):
@@ -72,46 +79,53 @@ class GenerationResult(BaseModel):
 async def _preview_generation_internal(
     request: GenerationRequest,
     db: AsyncSession,
-    current_user: User
+    current_user: User,
+    profile: GenerationProfile = None
 ):
-    """Generate schedule preview using real data with block scheduling (internal function)."""
+    """Generate schedule preview using real data with block scheduling (internal function).
+    
+    Phases are recorded on ``profile`` when one is passed, so callers that
+    go on to persist the result can add their own phases to the same run.
+    """
     
     from sqlalchemy import select
     
-    # Load real data from database
-    groups_result = await db.execute(select(Group).where(Group.org_id == current_user.org_id))
-    groups = groups_result.scalars().all()
+    owns_profile = profile is None
+    if owns_profile:
+        profile = GenerationProfile()
     
-    teachers_result = await db.execute(select(Teacher).where(Teacher.org_id == current_user.org_id))
-    teachers = teachers_result.scalars().all()
+    async def load(name, query):
+        with profile.phase(f"load.{name}") as objects:
+            rows = (await db.execute(query)).scalars().all()
+            objects["rows"] = len(rows)
+        return rows
     
-    rooms_result = await db.execute(select(Room).where(Room.org_id == current_user.org_id))
-    rooms = rooms_result.scalars().all()
+    # Load real data from database
+    groups = await load("groups", select(Group).where(Group.org_id == current_user.org_id))
+    teachers = await load("teachers", select(Teacher).where(Teacher.org_id == current_user.org_id))
+    rooms = await load("rooms", select(Room).where(Room.org_id == current_user.org_id))
+    slots = await load("time_slots", select(TimeTableSlot).where(TimeTableSlot.org_id == current_user.org_id))
+    enrollments = await load("enrollments", select(Enrollment).where(Enrollment.org_id == current_user.org_id))
     
-    slots_result = await db.execute(select(TimeTableSlot).where(TimeTableSlot.org_id == current_user.org_id))
-    slots = slots_result.scalars().all()
+    # Load course assignments for enrollments
+    assignment_ids = [e.assignment_id for e in enrollments]
+    assignments = await load(
+        "course_assignments",
+        select(CourseAssignment).where(CourseAssignment.assignment_id.in_(assignment_ids))
+    )
     
-    enrollments_result = await db.execute(select(Enrollment).where(Enrollment.org_id == current_user.org_id))
-    enrollments = enrollments_result.scalars().all()
+    # Load courses
+    course_ids = [a.course_id for a in assignments]
+    courses = await load("courses", select(Course).where(Course.course_id.in_(course_ids)))
+    
+    build = profile.begin("build")
     
     # Create lookup dictionaries
     groups_dict = {g.group_id: g for g in groups}
     teachers_dict = {t.teacher_id: t for t in teachers}
     rooms_dict = {r.room_id: r for r in rooms}
     slots_dict = {s.slot_id: s for s in slots}
-    
-    # Load course assignments for enrollments
-    assignment_ids = [e.assignment_id for e in enrollments]
-    assignments_result = await db.execute(
-        select(CourseAssignment).where(CourseAssignment.assignment_id.in_(assignment_ids))
-    )
-    assignments = assignments_result.scalars().all()
     assignments_dict = {a.assignment_id: a for a in assignments}
-    
-    # Load courses
-    course_ids = [a.course_id for a in assignments]
-    courses_result = await db.execute(select(Course).where(Course.course_id.in_(course_ids)))
-    courses = courses_result.scalars().all()
     courses_dict = {c.course_id: c for c in courses}
     
     # Generate lessons and blocks
@@ -135,7 +149,10 @@ async def _preview_generation_internal(
             group_enrollments[enrollment.group_id] = []
         group_enrollments[enrollment.group_id].append(enrollment)
     
+    build.end(groups=len(group_enrollments))
+    
     # Generate lessons for each day
+    search = profile.begin("search")
     current_date = request.from_date
     while current_date <= request.to_date:
         if current_date.weekday() < 5:  # Monday=0, Sunday=6
@@ -257,7 +274,8 @@ async def _preview_generation_internal(
                     else:
                         break  # No available slots, stop trying
         
-        current_date = date(current_date.year, current_date.month, current_date.day + 1)
+        current_date += timedelta(days=1)
+    search.end(proposals=len(proposals), blocks=len(blocks))
     
     # Calculate stats
     stats = {
@@ -269,9 +287,13 @@ async def _preview_generation_internal(
         "time_slots_count": len(slots),
         "enrollments_count": len(enrollments),
         "date_range": f"{request.from_date} - {request.to_date}",
-        "generation_time": "0.5s",
         "block_scheduling_enabled": request.ruleset.enable_block_scheduling
     }
+    profile_data = profile.as_dict()
+    stats["generation_time"] = f"{profile_data['wall_seconds']:.2f}s"
+    stats["profile"] = profile_data
+    if owns_profile:
+        profile.close()
     
     return GenerationResult(
         proposals=proposals,
@@ -508,14 +530,30 @@ def _find_available_room(rooms, start_slot, end_slot, current_date, proposals, b
     
     return None
 
+def _record_generation(kind: str, outcome: str, started: float, lessons: int = 0) -> None:
+    generation_runs.inc(kind=kind, outcome=outcome)
+    generation_duration.observe(time.perf_counter() - started, kind=kind)
+    generation_lessons.inc(lessons, kind=kind)
+
+
 @router.post("/preview", response_model=GenerationResult)
 async def preview_generation(
     request: GenerationRequest,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Generate schedule preview using real data."""
-    return await _preview_generation_internal(request, db, current_user)
+    started = time.perf_counter()
+    profile = GenerationProfile()
+    try:
+        result = await _preview_generation_internal(request, db, current_user, profile)
+    except Exception:
+        _record_generation("preview", "error", started)
+        raise
+    finally:
+        profile.close()
+    _record_generation("preview", "success" if result.success else "failed", started, len(result.proposals))
+    return result
 
 @router.post("/run", response_model=Dict[str, Any])
 async def run_generation(
@@ -524,82 +562,144 @@ async def run_generation(
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Run schedule generation and save to database."""
-    
+    started = time.perf_counter()
+    profile = GenerationProfile()
     try:
         # Generate preview first
-        preview_result = await _preview_generation_internal(request, db, current_user)
+        preview_result = await _preview_generation_internal(request, db, current_user, profile)
         
         if not preview_result.success:
+            _record_generation("run", "failed", started)
+            await _save_generation_job(
+                db, request, current_user, GenerationStatus.FAILED,
+                {**preview_result.stats, "profile": profile.as_dict()},
+                error="; ".join(preview_result.conflicts) or "Generation failed"
+            )
             return {
                 "message": "Generation failed",
                 "result": preview_result
             }
         
-        # Clear existing lessons for the date range (if any exist)
-        from sqlalchemy import delete, select
-        existing_lessons = await db.execute(
-            select(LessonInstance).where(
-                LessonInstance.org_id == current_user.org_id,
-                LessonInstance.date >= request.from_date,
-                LessonInstance.date <= request.to_date
-            )
-        )
-        if existing_lessons.scalars().first():
-            await db.execute(
+        # Clear existing lessons for the date range, keeping what was removed for the audit log
+        from sqlalchemy import delete
+        with profile.phase("persist.delete") as objects:
+            replaced_lessons = (await db.execute(
                 delete(LessonInstance).where(
                     LessonInstance.org_id == current_user.org_id,
                     LessonInstance.date >= request.from_date,
                     LessonInstance.date <= request.to_date
+                ).returning(
+                    LessonInstance.lesson_id,
+                    *(getattr(LessonInstance, field) for field in AUDITED_LESSON_FIELDS)
                 )
-            )
+            )).mappings().all()
+            objects["rows"] = len(replaced_lessons)
         
         # Create lessons from proposals and save to database
-        created_lessons = []
-        for proposal in preview_result.proposals:
-            lesson = LessonInstance(
-                org_id=current_user.org_id,
-                term_id=request.term_id,
-                date=proposal.date,
-                slot_id=proposal.slot_id,
-                room_id=proposal.room_id,
-                enrollment_id=proposal.enrollment_id,
-                status=LessonStatus.CONFIRMED,
-                created_by=current_user.user_id
-            )
-            db.add(lesson)
-            created_lessons.append(lesson)
+        with profile.phase("persist.insert") as objects:
+            created_lessons = []
+            for proposal in preview_result.proposals:
+                lesson = LessonInstance(
+                    org_id=current_user.org_id,
+                    term_id=request.term_id,
+                    date=proposal.date,
+                    slot_id=proposal.slot_id,
+                    room_id=proposal.room_id,
+                    enrollment_id=proposal.enrollment_id,
+                    status=LessonStatus.CONFIRMED,
+                    created_by=current_user.user_id
+                )
+                db.add(lesson)
+                created_lessons.append(lesson)
+            await db.flush()
+            objects["rows"] = len(created_lessons)
         
-        # Commit all lessons to database
-        await db.commit()
+        # Commit all lessons to database; ids are assigned on flush and the
+        # session does not expire them, so no per-lesson refresh is needed
+        with profile.phase("persist.commit"):
+            await db.commit()
         
-        # Refresh lessons to get their IDs
+        for replaced in replaced_lessons:
+            audit_log.record(
+                current_user.org_id, replaced["lesson_id"], current_user.user_id, "generation_replaced",
+                before=lesson_snapshot(dict(replaced))
+            )
         for lesson in created_lessons:
-            await db.refresh(lesson)
+            audit_log.record(
+                current_user.org_id, lesson.lesson_id, current_user.user_id, "generated",
+                after=lesson_snapshot(lesson)
+            )
         
         created_count = len(created_lessons)
+        _record_generation("run", "success", started, created_count)
+        stats = {**preview_result.stats, "profile": profile.as_dict()}
+        stats["generation_time"] = f"{stats['profile']['wall_seconds']:.2f}s"
+        await _save_generation_job(db, request, current_user, GenerationStatus.COMPLETED, stats)
+        await schedule_events.publish(current_user.org_id, [
+            range_event(request.from_date, request.to_date, created_count, "generation")
+        ])
         
         return {
             "message": f"Generation completed successfully! Created {created_count} lessons in {len(preview_result.blocks)} blocks.",
             "created_lessons": created_count,
             "total_blocks": len(preview_result.blocks),
             "total_proposals": len(preview_result.proposals),
-            "stats": preview_result.stats,
+            "stats": stats,
             "preview": preview_result.proposals[:10],  # Show first 10 lessons as preview
             "blocks_preview": preview_result.blocks[:5]  # Show first 5 blocks as preview
         }
         
     except Exception as e:
         await db.rollback()
+        _record_generation("run", "error", started)
         print(f"Generation error: {str(e)}")
+        await _save_generation_job(
+            db, request, current_user, GenerationStatus.FAILED, {"profile": profile.as_dict()}, error=str(e)
+        )
         return {
             "message": f"Generation failed: {str(e)}",
             "error": str(e),
             "success": False
         }
+    finally:
+        profile.close()
+
+
+async def _save_generation_job(
+    db: AsyncSession,
+    request: GenerationRequest,
+    current_user: User,
+    job_status: GenerationStatus,
+    stats: Dict[str, Any],
+    error: str = None
+) -> None:
+    """Keep a finished run with its stats and phase profile as a generation job.
+    
+    Failing to record the job never fails the generation itself.
+    """
+    try:
+        db.add(GenerationJob(
+            org_id=current_user.org_id,
+            term_id=request.term_id,
+            scope=GenerationScope.PARTIAL,
+            from_date=request.from_date,
+            to_date=request.to_date,
+            ruleset_json=request.ruleset.model_dump(),
+            status=job_status,
+            progress=1.0,
+            created_by=current_user.user_id,
+            finished_at=datetime.now(timezone.utc),
+            error=error,
+            result_json={"stats": stats}
+        ))
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.warning(f"Could not record generation job for org {current_user.org_id}: {e}")
 
 @router.get("/stats")
 async def get_generation_stats(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get generation statistics."""
@@ -0,0 +1,66 @@
+"""Catalog import router."""
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.auth import require_role
+from ..core.database import get_db
+from ..models.user import User, UserRole
+from ..schemas.imports import CatalogImportResult
+from ..services.catalog_import import (
+    IMPORT_ENTITIES, CatalogImporter, iter_csv_rows, iter_xlsx_rows
+)
+
+router = APIRouter()
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+@router.post("/{entity}", response_model=CatalogImportResult)
+async def import_catalog(
+    entity: str,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.METHODIST]))
+):
+    """Import groups, teachers, courses, rooms or enrollments from a CSV or XLSX file.
+    
+    Existing records are matched by natural key and updated. Invalid rows are
+    skipped and reported; the valid rows are committed together.
+    """
+    if entity not in IMPORT_ENTITIES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown import entity '{entity}', expected one of: {', '.join(IMPORT_ENTITIES)}"
+        )
+    
+    filename = (file.filename or "").lower()
+    if filename.endswith(".xlsx") or file.content_type == XLSX_CONTENT_TYPE:
+        rows = iter_xlsx_rows(file.file)
+    elif filename.endswith(".csv") or file.content_type in ("text/csv", "application/csv"):
+        rows = iter_csv_rows(file.file)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only .csv and .xlsx files are supported"
+        )
+    
+    importer = CatalogImporter(db, current_user.org_id, entity)
+    try:
+        result = await importer.run(rows)
+        await db.commit()
+    except (UnicodeDecodeError, ValueError) as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not read {entity} file: {e}"
+        )
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Import conflicts with existing data: {e.orig}"
+        )
+    
+    return result
@@ -1,30 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, and_, or_
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from datetime import date, time
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.auth import get_current_active_user_or_demo
-from app.models.scheduling import LessonInstance, LessonStatus
+from app.models.scheduling import LessonInstance, LessonStatus, LessonTombstone
 from app.models.facilities import TimeTableSlot, Room
 from app.models.educational import Enrollment, Group, Teacher, Course, CourseAssignment
-from app.schemas.lessons import LessonCreate, LessonUpdate, LessonResponse
+from app.repositories.lesson import LessonRepository, conflicts_from_integrity_error
+from app.schemas.lessons import LessonCreate, LessonUpdate, LessonResponse, LessonBulkResult, LessonChanges
 from app.models.user import User
+from app.services.schedule_events import schedule_events, lesson_event, range_event
+from app.services.audit import audit_log, lesson_snapshot
 
 router = APIRouter()
 
-@router.get("/term", response_model=List[LessonResponse])
-async def get_lessons_by_term(
-    start_date: date = Query(...),
-    end_date: date = Query(...),
-    group_id: Optional[int] = Query(None),
-    teacher_id: Optional[int] = Query(None),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user_or_demo)
-):
-    """Get lessons for a specific term/date range."""
-    # Query lessons with joins to get related data
+# Upper bound on changes returned per /changes page
+MAX_CHANGES_PAGE = 5000
+
+def _lesson_listing_query(include_without_room: bool = False):
+    """Base select for lesson listings with group, teacher, course, room and slot data."""
     query = select(
         LessonInstance.lesson_id,
         LessonInstance.org_id,
@@ -46,9 +45,79 @@ async def get_lessons_by_term(
     ).join(Group, Enrollment.group_id == Group.group_id
     ).join(Teacher, CourseAssignment.teacher_id == Teacher.teacher_id
     ).join(Course, CourseAssignment.course_id == Course.course_id
-    ).join(Room, LessonInstance.room_id == Room.room_id
-    ).join(TimeTableSlot, LessonInstance.slot_id == TimeTableSlot.slot_id
-    ).where(
+    )
+    if include_without_room:
+        query = query.outerjoin(Room, LessonInstance.room_id == Room.room_id)
+    else:
+        query = query.join(Room, LessonInstance.room_id == Room.room_id)
+    return query.join(TimeTableSlot, LessonInstance.slot_id == TimeTableSlot.slot_id)
+
+
+def _lesson_row_to_dict(lesson) -> dict:
+    """Convert a listing row into the LessonResponse payload shape."""
+    return {
+        "lesson_id": lesson.lesson_id,
+        "org_id": lesson.org_id,
+        "date": str(lesson.date),
+        "slot_id": lesson.slot_id,
+        "room_id": lesson.room_id,
+        "enrollment_id": lesson.enrollment_id,
+        "group_name": lesson.group_name,
+        "teacher_name": lesson.teacher_name,
+        "course_name": lesson.course_name,
+        "room_number": lesson.room_number,
+        "start_time": str(lesson.start_time),
+        "end_time": str(lesson.end_time),
+        "status": lesson.status
+    }
+
+
+def _lesson_list_response(lessons) -> ORJSONResponse:
+    """Serialize listing rows straight to JSON.
+
+    Rows come from our own query and already match LessonResponse, so the
+    response is returned directly to skip response_model re-validation.
+    """
+    return ORJSONResponse(content=[_lesson_row_to_dict(lesson) for lesson in lessons])
+
+
+async def _commit_or_conflict(db: AsyncSession):
+    """Commit a lesson write, turning clash constraint violations into 409."""
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        conflicts = conflicts_from_integrity_error(e)
+        if conflicts:
+            raise HTTPException(status_code=409, detail={"conflicts": conflicts})
+        raise
+
+
+def _parse_lesson_status(value: Optional[str]) -> Optional[LessonStatus]:
+    """Map a client status string to LessonStatus, None if unknown."""
+    if not value:
+        return LessonStatus.PLANNED
+    value = value.upper()
+    # Older clients send "scheduled" for planned lessons
+    if value == "SCHEDULED":
+        return LessonStatus.PLANNED
+    try:
+        return LessonStatus(value)
+    except ValueError:
+        return None
+
+
+@router.get("/term", response_model=List[LessonResponse])
+async def get_lessons_by_term(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    group_id: Optional[int] = Query(None),
+    teacher_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user_or_demo)
+):
+    """Get lessons for a specific term/date range."""
+    query = _lesson_listing_query().where(
         LessonInstance.org_id == current_user.org_id,
         LessonInstance.date >= start_date,
         LessonInstance.date <= end_date,
@@ -64,85 +133,23 @@ async def get_lessons_by_term(
     query = query.order_by(LessonInstance.date, TimeTableSlot.start_time)
     
     result = await db.execute(query)
-    lessons = result.all()
-    
-    return [
-        {
-            "lesson_id": lesson.lesson_id,
-            "org_id": lesson.org_id,
-            "date": str(lesson.date),
-            "slot_id": lesson.slot_id,
-            "room_id": lesson.room_id,
-            "enrollment_id": lesson.enrollment_id,
-            "group_name": lesson.group_name,
-            "teacher_name": lesson.teacher_name,
-            "course_name": lesson.course_name,
-            "room_number": lesson.room_number,
-            "start_time": str(lesson.start_time),
-            "end_time": str(lesson.end_time),
-            "status": lesson.status
-        }
-        for lesson in lessons
-    ]
+    return _lesson_list_response(result.all())
 
 @router.get("/by-date/{lesson_date}", response_model=List[LessonResponse])
 async def get_lessons_by_day(
     lesson_date: date,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get lessons for a specific day."""
-    # Query lessons with joins to get related data
-    query = select(
-        LessonInstance.lesson_id,
-        LessonInstance.org_id,
-        LessonInstance.date,
-        LessonInstance.slot_id,
-        LessonInstance.room_id,
-        LessonInstance.enrollment_id,
-        LessonInstance.status,
-        Group.name.label('group_name'),
-        func.concat(Teacher.first_name, ' ', Teacher.last_name).label('teacher_name'),
-        Course.name.label('course_name'),
-        Room.number.label('room_number'),
-        TimeTableSlot.start_time,
-        TimeTableSlot.end_time
-    ).select_from(
-        LessonInstance
-    ).join(Enrollment, LessonInstance.enrollment_id == Enrollment.enrollment_id
-    ).join(CourseAssignment, Enrollment.assignment_id == CourseAssignment.assignment_id
-    ).join(Group, Enrollment.group_id == Group.group_id
-    ).join(Teacher, CourseAssignment.teacher_id == Teacher.teacher_id
-    ).join(Course, CourseAssignment.course_id == Course.course_id
-    ).join(Room, LessonInstance.room_id == Room.room_id
-    ).join(TimeTableSlot, LessonInstance.slot_id == TimeTableSlot.slot_id
-    ).where(
+    query = _lesson_listing_query().where(
         LessonInstance.org_id == current_user.org_id,
         LessonInstance.date == lesson_date,
         LessonInstance.status != LessonStatus.CANCELLED
     ).order_by(TimeTableSlot.start_time)
     
     result = await db.execute(query)
-    lessons = result.all()
-    
-    return [
-        {
-            "lesson_id": lesson.lesson_id,
-            "org_id": lesson.org_id,
-            "date": str(lesson.date),
-            "slot_id": lesson.slot_id,
-            "room_id": lesson.room_id,
-            "enrollment_id": lesson.enrollment_id,
-            "group_name": lesson.group_name,
-            "teacher_name": lesson.teacher_name,
-            "course_name": lesson.course_name,
-            "room_number": lesson.room_number,
-            "start_time": str(lesson.start_time),
-            "end_time": str(lesson.end_time),
-            "status": lesson.status
-        }
-        for lesson in lessons
-    ]
+    return _lesson_list_response(result.all())
 
 @router.get("/", response_model=List[LessonResponse])
 async def get_lessons(
@@ -150,35 +157,11 @@ async def get_lessons(
     group_id: Optional[int] = None,
     teacher_id: Optional[int] = None,
     room_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get lessons with optional filters."""
-    # Query lessons with joins to get related data
-    query = select(
-        LessonInstance.lesson_id,
-        LessonInstance.org_id,
-        LessonInstance.date,
-        LessonInstance.slot_id,
-        LessonInstance.room_id,
-        LessonInstance.enrollment_id,
-        LessonInstance.status,
-        Group.name.label('group_name'),
-        func.concat(Teacher.first_name, ' ', Teacher.last_name).label('teacher_name'),
-        Course.name.label('course_name'),
-        Room.number.label('room_number'),
-        TimeTableSlot.start_time,
-        TimeTableSlot.end_time
-    ).select_from(
-        LessonInstance
-    ).join(Enrollment, LessonInstance.enrollment_id == Enrollment.enrollment_id
-    ).join(CourseAssignment, Enrollment.assignment_id == CourseAssignment.assignment_id
-    ).join(Group, Enrollment.group_id == Group.group_id
-    ).join(Teacher, CourseAssignment.teacher_id == Teacher.teacher_id
-    ).join(Course, CourseAssignment.course_id == Course.course_id
-    ).join(Room, LessonInstance.room_id == Room.room_id
-    ).join(TimeTableSlot, LessonInstance.slot_id == TimeTableSlot.slot_id
-    ).where(
+    query = _lesson_listing_query().where(
         LessonInstance.org_id == current_user.org_id,
         LessonInstance.status != LessonStatus.CANCELLED
     )
@@ -196,26 +179,87 @@ async def get_lessons(
     query = query.order_by(LessonInstance.date, TimeTableSlot.start_time)
     
     result = await db.execute(query)
-    lessons = result.all()
+    return _lesson_list_response(result.all())
+
+@router.get("/changes", response_model=LessonChanges)
+async def get_lesson_changes(
+    since: int = Query(0, ge=0),
+    horizon: Optional[int] = Query(None, ge=0),
+    limit: int = Query(1000, ge=1, le=MAX_CHANGES_PAGE),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user_or_demo)
+):
+    """Get lessons inserted, updated or deleted after a change sequence number.
     
-    return [
-        {
-            "lesson_id": lesson.lesson_id,
-            "org_id": lesson.org_id,
-            "date": str(lesson.date),
-            "slot_id": lesson.slot_id,
-            "room_id": lesson.room_id,
-            "enrollment_id": lesson.enrollment_id,
-            "group_name": lesson.group_name,
-            "teacher_name": lesson.teacher_name,
-            "course_name": lesson.course_name,
-            "room_number": lesson.room_number,
-            "start_time": str(lesson.start_time),
-            "end_time": str(lesson.end_time),
-            "status": lesson.status
-        }
-        for lesson in lessons
-    ]
+    Numbers are handed out in write order, not commit order, so only
+    changes of transactions older than every running one are returned;
+    a long write transaction holds later changes back until it ends.
+    Pass next_since back as since and next_horizon as horizon to continue:
+    horizon also picks up lower numbers that committed in the meantime, so
+    a change may come twice but is never skipped. has_more means the page
+    was cut at limit.
+    
+    Cancelled lessons are included with their status so clients can hide
+    them. A since older than the retained deletions gets 410, and the
+    client syncs again from 0.
+    """
+    org_id = current_user.org_id
+    lesson_repo = LessonRepository(db)
+    if 0 < since < await lesson_repo.get_pruned_change_seq(org_id):
+        raise HTTPException(status_code=410, detail="Deletions since this point were pruned, sync again from 0")
+    next_horizon = await lesson_repo.get_change_horizon()
+    
+    def pending(model):
+        condition = model.change_seq > since
+        if next_horizon is None:
+            return condition
+        if horizon is not None:
+            condition = or_(condition, model.change_xid >= horizon)
+        return and_(condition, model.change_xid < next_horizon)
+    
+    changed = (await db.execute(
+        _lesson_listing_query(include_without_room=True).add_columns(
+            LessonInstance.version,
+            LessonInstance.change_seq
+        ).where(
+            LessonInstance.org_id == org_id,
+            pending(LessonInstance)
+        ).order_by(LessonInstance.change_seq).limit(limit + 1)
+    )).all()
+    deleted = (await db.execute(
+        select(LessonTombstone.lesson_id, LessonTombstone.date, LessonTombstone.change_seq).where(
+            LessonTombstone.org_id == org_id,
+            pending(LessonTombstone)
+        ).order_by(LessonTombstone.change_seq).limit(limit + 1)
+    )).all()
+    
+    # Merge both streams by sequence and cut at limit, so a page never skips a change
+    entries = sorted(
+        [(row.change_seq, False, row) for row in changed] + [(row.change_seq, True, row) for row in deleted],
+        key=lambda entry: entry[0]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    
+    changes = []
+    deletions = []
+    for change_seq, is_deletion, row in entries:
+        if is_deletion:
+            deletions.append({"lesson_id": row.lesson_id, "date": str(row.date), "change_seq": change_seq})
+        else:
+            changes.append({
+                **_lesson_row_to_dict(row),
+                "version": row.version,
+                "change_seq": change_seq
+            })
+    
+    return ORJSONResponse(content={
+        "changes": changes,
+        "deleted": deletions,
+        "next_since": entries[-1][0] if entries else since,
+        "next_horizon": next_horizon,
+        "has_more": has_more
+    })
 
 @router.post("/", response_model=LessonResponse)
 async def create_lesson(
@@ -224,19 +268,37 @@ async def create_lesson(
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Create a new lesson."""
+    if lesson.org_id != current_user.org_id:
+        raise HTTPException(status_code=403, detail="Lesson belongs to another organization")
+    
+    lesson_status = _parse_lesson_status(lesson.status)
+    if lesson_status is None:
+        raise HTTPException(status_code=400, detail=f"Unknown lesson status '{lesson.status}'")
+    
+    term_id = await LessonRepository(db).get_term_for_date(current_user.org_id, lesson.date)
+    if term_id is None:
+        raise HTTPException(status_code=400, detail="No term covers this date")
+    
     # Create new lesson
     new_lesson = LessonInstance(
-        org_id=lesson.org_id,
+        org_id=current_user.org_id,
+        term_id=term_id,
         date=lesson.date,
         slot_id=lesson.slot_id,
         room_id=lesson.room_id,
         enrollment_id=lesson.enrollment_id,
-        status=lesson.status or "scheduled"
+        status=lesson_status,
+        created_by=current_user.user_id
     )
     
     db.add(new_lesson)
-    await db.commit()
+    await _commit_or_conflict(db)
     await db.refresh(new_lesson)
+    audit_log.record(
+        new_lesson.org_id, new_lesson.lesson_id, current_user.user_id, "created",
+        after=lesson_snapshot(new_lesson)
+    )
+    await schedule_events.publish(new_lesson.org_id, [lesson_event("created", new_lesson)])
     
     # Get related data for response
     query = select(
@@ -276,65 +338,65 @@ async def create_lesson(
         "status": new_lesson.status
     }
 
-@router.post("/bulk", response_model=dict)
+@router.post("/bulk", response_model=LessonBulkResult)
 async def create_lessons_bulk(
     lessons: List[LessonCreate],
+    atomic: bool = Query(False, description="Write nothing if any row is rejected"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
-    """Create multiple lessons at once."""
-    created_lessons = []
-    
-    for lesson_data in lessons:
-        new_lesson = LessonInstance(
-            org_id=lesson_data.org_id,
-            date=lesson_data.date,
-            slot_id=lesson_data.slot_id,
-            room_id=lesson_data.room_id,
-            enrollment_id=lesson_data.enrollment_id,
-            status=lesson_data.status or "scheduled"
-        )
-        db.add(new_lesson)
-        created_lessons.append(new_lesson)
+    """Create multiple lessons at once, validating clashes in memory."""
+    lesson_repo = LessonRepository(db)
+    rows = [
+        {
+            "org_id": lesson.org_id,
+            "date": lesson.date,
+            "slot_id": lesson.slot_id,
+            "room_id": lesson.room_id,
+            "enrollment_id": lesson.enrollment_id,
+            "status": _parse_lesson_status(lesson.status)
+        }
+        for lesson in lessons
+    ]
+    results = await lesson_repo.bulk_create(
+        org_id=current_user.org_id,
+        created_by=current_user.user_id,
+        lessons=rows,
+        atomic=atomic
+    )
+    await _commit_or_conflict(db)
     
-    await db.commit()
+    for row in results:
+        if row["lesson_id"] is not None:
+            audit_log.record(
+                current_user.org_id, row["lesson_id"], current_user.user_id, "bulk_created",
+                after=lesson_snapshot(rows[row["index"]], ("date", "slot_id", "room_id", "enrollment_id", "status"))
+            )
     
-    return {
-        "message": f"Created {len(lessons)} lessons",
-        "created_count": len(lessons)
-    }
+    created_dates = [lessons[row["index"]].date for row in results if row["lesson_id"] is not None]
+    created_count = len(created_dates)
+    rejected_count = sum(1 for row in results if row["errors"])
+    if created_dates:
+        await schedule_events.publish(current_user.org_id, [
+            range_event(min(created_dates), max(created_dates), created_count, "bulk_create")
+        ])
+    
+    # Rows are built here and already match LessonBulkResult
+    return ORJSONResponse(content={
+        "message": f"Created {created_count} lessons, rejected {rejected_count}",
+        "created_count": created_count,
+        "rejected_count": rejected_count,
+        "results": results
+    })
 
 @router.get("/{lesson_id}", response_model=LessonResponse)
 async def get_lesson(
     lesson_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user_or_demo)
 ):
     """Get a specific lesson."""
-    query = select(
-        LessonInstance.lesson_id,
-        LessonInstance.org_id,
-        LessonInstance.date,
-        LessonInstance.slot_id,
-        LessonInstance.room_id,
-        LessonInstance.enrollment_id,
-        LessonInstance.status,
-        Group.name.label('group_name'),
-        func.concat(Teacher.first_name, ' ', Teacher.last_name).label('teacher_name'),
-        Course.name.label('course_name'),
-        Room.number.label('room_number'),
-        TimeTableSlot.start_time,
-        TimeTableSlot.end_time
-    ).select_from(
-        LessonInstance
-    ).join(Enrollment, LessonInstance.enrollment_id == Enrollment.enrollment_id
-    ).join(CourseAssignment, Enrollment.assignment_id == CourseAssignment.assignment_id
-    ).join(Group, Enrollment.group_id == Group.group_id
-    ).join(Teacher, CourseAssignment.teacher_id == Teacher.teacher_id
-    ).join(Course, CourseAssignment.course_id == Course.course_id
-    ).join(Room, LessonInstance.room_id == Room.room_id
-    ).join(TimeTableSlot, LessonInstance.slot_id == TimeTableSlot.slot_id
-    ).where(
+    query = _lesson_listing_query().where(
         LessonInstance.lesson_id == lesson_id,
         LessonInstance.org_id == current_user.org_id
     )
@@ -345,21 +407,7 @@ async def get_lesson(
     if not lesson:
         raise HTTPException(status_code=404, detail="LessonInstance not found")
     
-    return {
-        "lesson_id": lesson.lesson_id,
-        "org_id": lesson.org_id,
-        "date": str(lesson.date),
-        "slot_id": lesson.slot_id,
-        "room_id": lesson.room_id,
-        "enrollment_id": lesson.enrollment_id,
-        "group_name": lesson.group_name,
-        "teacher_name": lesson.teacher_name,
-        "course_name": lesson.course_name,
-        "room_number": lesson.room_number,
-        "start_time": str(lesson.start_time),
-        "end_time": str(lesson.end_time),
-        "status": lesson.status
-    }
+    return _lesson_row_to_dict(lesson)
 
 @router.patch("/{lesson_id}", response_model=LessonResponse)
 async def update_lesson(
@@ -381,66 +429,49 @@ async def update_lesson(
         raise HTTPException(status_code=404, detail="LessonInstance not found")
     
     # Update fields - only update non-None values
-    update_data = lesson.model_dump(exclude_unset=True, exclude_none=True)
+    update_data = lesson.model_dump(exclude_unset=True, exclude_none=True, exclude={"version"})
+    
+    # Optimistic locking when the client sends the version it read
+    if lesson.version is not None and lesson.version != existing_lesson.version:
+        raise HTTPException(status_code=409, detail="Lesson has been modified by another user")
     
     # Debug logging
     print(f"Update data: {update_data}")
     
+    previous_date = existing_lesson.date
+    before = lesson_snapshot(existing_lesson)
+    changed = []
     for field, value in update_data.items():
         if hasattr(existing_lesson, field):
             # Convert string dates to date objects
             if field == 'date' and isinstance(value, str):
                 from datetime import datetime
                 value = datetime.strptime(value, '%Y-%m-%d').date()
+            if getattr(existing_lesson, field) != value:
+                changed.append(field)
             setattr(existing_lesson, field, value)
+    if changed:
+        existing_lesson.version = existing_lesson.version + 1
+        existing_lesson.updated_by = current_user.user_id
     
-    await db.commit()
+    await _commit_or_conflict(db)
     await db.refresh(existing_lesson)
+    if changed:
+        audit_log.record(
+            existing_lesson.org_id, existing_lesson.lesson_id, current_user.user_id, "updated",
+            before=before, after=lesson_snapshot(existing_lesson)
+        )
+        await schedule_events.publish(existing_lesson.org_id, [
+            lesson_event("updated", existing_lesson, changed, previous_date)
+        ])
     
     # Get updated lesson with related data
-    query = select(
-        LessonInstance.lesson_id,
-        LessonInstance.org_id,
-        LessonInstance.date,
-        LessonInstance.slot_id,
-        LessonInstance.room_id,
-        LessonInstance.enrollment_id,
-        LessonInstance.status,
-        Group.name.label('group_name'),
-        func.concat(Teacher.first_name, ' ', Teacher.last_name).label('teacher_name'),
-        Course.name.label('course_name'),
-        Room.number.label('room_number'),
-        TimeTableSlot.start_time,
-        TimeTableSlot.end_time
-    ).select_from(
-        LessonInstance
-    ).join(Enrollment, LessonInstance.enrollment_id == Enrollment.enrollment_id
-    ).join(CourseAssignment, Enrollment.assignment_id == CourseAssignment.assignment_id
-    ).join(Group, Enrollment.group_id == Group.group_id
-    ).join(Teacher, CourseAssignment.teacher_id == Teacher.teacher_id
-    ).join(Course, CourseAssignment.course_id == Course.course_id
-    ).join(Room, LessonInstance.room_id == Room.room_id
-    ).join(TimeTableSlot, LessonInstance.slot_id == TimeTableSlot.slot_id
-    ).where(LessonInstance.lesson_id == lesson_id)
+    query = _lesson_listing_query().where(LessonInstance.lesson_id == lesson_id)
     
     result = await db.execute(query)
     lesson_data = result.first()
     
-    return {
-        "lesson_id": lesson_data.lesson_id,
-        "org_id": lesson_data.org_id,
-        "date": str(lesson_data.date),
-        "slot_id": lesson_data.slot_id,
-        "room_id": lesson_data.room_id,
-        "enrollment_id": lesson_data.enrollment_id,
-        "group_name": lesson_data.group_name,
-        "teacher_name": lesson_data.teacher_name,
-        "course_name": lesson_data.course_name,
-        "room_number": lesson_data.room_number,
-        "start_time": str(lesson_data.start_time),
-        "end_time": str(lesson_data.end_time),
-        "status": lesson_data.status
-    }
+    return _lesson_row_to_dict(lesson_data)
 
 @router.delete("/{lesson_id}")
 async def delete_lesson(
@@ -460,8 +491,15 @@ async def delete_lesson(
     if not existing_lesson:
         raise HTTPException(status_code=404, detail="LessonInstance not found")
     
-    # Soft delete - set is_active to False
-    existing_lesson.is_active = False
-    await db.commit()
+    # Soft delete - cancel the lesson and keep the row
+    before = lesson_snapshot(existing_lesson)
+    await LessonRepository(db).cancel(existing_lesson, current_user.user_id)
+    audit_log.record(
+        existing_lesson.org_id, lesson_id, current_user.user_id, "updated",
+        before=before, after=lesson_snapshot(existing_lesson)
+    )
+    await schedule_events.publish(existing_lesson.org_id, [
+        lesson_event("updated", existing_lesson, ["status"])
+    ])
     
     return {"message": "LessonInstance deleted successfully"}
@@ -1,18 +1,116 @@
 """Reports router."""
 
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from ..core.auth import get_current_active_user
+from ..core.config import settings
+from ..core.database import get_read_db
+from ..models.user import User
+from ..repositories.lesson import LessonRepository
+from ..schemas.reports import ConflictsReport, WorkloadReport
 
 router = APIRouter()
 
-@router.get("/workload/teacher")
-async def get_teacher_workload(current_user = Depends(get_current_active_user)):
-    return {"message": "Teacher workload report - TODO"}
+async def _workload_report(
+    kind: str,
+    start_date: date,
+    end_date: date,
+    bucket: str,
+    resource_id: Optional[int],
+    db: AsyncSession,
+    current_user: User
+) -> WorkloadReport:
+    """Build a workload report for all teachers or groups of the user's org."""
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    
+    lesson_repo = LessonRepository(db)
+    items = await lesson_repo.get_workload_report(
+        org_id=current_user.org_id,
+        kind=kind,
+        start_date=start_date,
+        end_date=end_date,
+        bucket=bucket,
+        resource_id=resource_id,
+        use_rollups=settings.WORKLOAD_ROLLUPS_ENABLED
+    )
+    
+    return WorkloadReport(
+        kind=kind,
+        start_date=start_date,
+        end_date=end_date,
+        bucket=bucket,
+        items=items
+    )
+
+@router.get("/workload/teacher", response_model=WorkloadReport)
+async def get_teacher_workload(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    bucket: str = Query("week", pattern="^(day|week|month)$"),
+    teacher_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Teacher workload with planned vs scheduled hours and date buckets."""
+    return await _workload_report(
+        "teacher", start_date, end_date, bucket, teacher_id, db, current_user
+    )
 
-@router.get("/workload/group")
-async def get_group_workload(current_user = Depends(get_current_active_user)):
-    return {"message": "Group workload report - TODO"}
+@router.get("/workload/group", response_model=WorkloadReport)
+async def get_group_workload(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    bucket: str = Query("week", pattern="^(day|week|month)$"),
+    group_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Group workload with planned vs scheduled hours and date buckets."""
+    return await _workload_report(
+        "group", start_date, end_date, bucket, group_id, db, current_user
+    )
 
-@router.get("/conflicts")
-async def get_conflicts(current_user = Depends(get_current_active_user)):
-    return {"message": "Conflicts report - TODO"}
+@router.get("/conflicts", response_model=ConflictsReport)
+async def get_conflicts(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Room, teacher and group double-bookings in a date range.
+    
+    New double-bookings are rejected on write; this reports lessons whose
+    teacher or group drifted from their enrollment and now clash.
+    """
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    
+    lesson_repo = LessonRepository(db)
+    report = await lesson_repo.get_conflicts_report(
+        org_id=current_user.org_id,
+        start_date=start_date,
+        end_date=end_date,
+        skip=skip,
+        limit=limit
+    )
+    
+    return ConflictsReport(
+        start_date=start_date,
+        end_date=end_date,
+        summary=report["summary"],
+        items=report["items"],
+        skip=skip,
+        limit=limit
+    )
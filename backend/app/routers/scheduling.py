@@ -3,15 +3,18 @@
 from datetime import date
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.database import get_db
 from ..core.auth import get_current_active_user, require_role
-from ..repositories.lesson import LessonRepository
+from ..repositories.lesson import LessonRepository, conflicts_from_integrity_error
 from ..models.user import User, UserRole
+from ..services.schedule_events import schedule_events, lesson_event
+from ..services.audit import audit_log, lesson_snapshot
 from ..schemas.scheduling import (
     LessonInstanceCreate, LessonInstanceUpdate, LessonInstanceResponse,
-    LessonConflictResponse
+    LessonConflictResponse, LessonConflictCandidate
 )
 
 router = APIRouter()
@@ -64,35 +67,50 @@ async def create_lesson(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.METHODIST]))
 ):
-    """Create a new lesson."""
-    # Check for conflicts
-    lesson_repo = LessonRepository(db)
-    conflicts = await lesson_repo.check_conflicts(
-        org_id=current_user.org_id,
-        date=lesson.date,
-        slot_id=lesson.slot_id,
-        enrollment_id=lesson.enrollment_id,
-        room_id=lesson.room_id
-    )
+    """Create a new lesson.
     
-    if conflicts:
+    Room, teacher and group clashes are rejected by unique indexes on
+    lesson_instances, so no pre-check queries are issued.
+    """
+    if lesson.org_id != current_user.org_id:
         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail={"conflicts": conflicts}
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Lesson belongs to another organization"
         )
     
+    lesson_repo = LessonRepository(db)
+    
     # Create lesson
     lesson_data = lesson.dict()
     lesson_data["created_by"] = current_user.user_id
     
     try:
         new_lesson = await lesson_repo.create(lesson_data)
-        return await lesson_repo.get_by_id(new_lesson.lesson_id)
+    except IntegrityError as e:
+        await db.rollback()
+        conflicts = conflicts_from_integrity_error(e)
+        if conflicts:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={"conflicts": conflicts}
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create lesson"
+        )
     except Exception as e:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create lesson"
         )
+    
+    audit_log.record(
+        new_lesson.org_id, new_lesson.lesson_id, current_user.user_id, "created",
+        after=lesson_snapshot(new_lesson)
+    )
+    await schedule_events.publish(new_lesson.org_id, [lesson_event("created", new_lesson)])
+    return await lesson_repo.get_by_id(new_lesson.lesson_id)
 
 
 @router.patch("/{lesson_id}", response_model=LessonInstanceResponse)
@@ -106,7 +124,7 @@ async def update_lesson(
     lesson_repo = LessonRepository(db)
     
     # Get existing lesson
-    existing_lesson = await lesson_repo.get_by_id(lesson_id)
+    existing_lesson = await lesson_repo.get_by_id(lesson_id, org_id=current_user.org_id)
     if not existing_lesson:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -120,40 +138,44 @@ async def update_lesson(
             detail="Lesson has been modified by another user"
         )
     
-    # Check for conflicts if position is changing
-    if (lesson_update.date or lesson_update.slot_id or lesson_update.room_id):
-        new_date = lesson_update.date or existing_lesson.date
-        new_slot_id = lesson_update.slot_id or existing_lesson.slot_id
-        new_room_id = lesson_update.room_id or existing_lesson.room_id
-        
-        conflicts = await lesson_repo.check_conflicts(
-            org_id=current_user.org_id,
-            date=new_date,
-            slot_id=new_slot_id,
-            enrollment_id=existing_lesson.enrollment_id,
-            room_id=new_room_id,
-            exclude_lesson_id=lesson_id
-        )
-        
-        if conflicts:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail={"conflicts": conflicts}
-            )
-    
     # Update lesson
+    previous_date = existing_lesson.date
+    before = lesson_snapshot(existing_lesson)
     update_data = lesson_update.dict(exclude_unset=True, exclude={"version"})
+    changed = [field for field, value in update_data.items() if getattr(existing_lesson, field) != value]
     update_data["updated_by"] = current_user.user_id
     update_data["version"] = existing_lesson.version + 1
     
+    # Room, teacher and group clashes surface as unique violations
     try:
         updated_lesson = await lesson_repo.update(existing_lesson, update_data)
-        return await lesson_repo.get_by_id(updated_lesson.lesson_id)
+    except IntegrityError as e:
+        await db.rollback()
+        conflicts = conflicts_from_integrity_error(e)
+        if conflicts:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={"conflicts": conflicts}
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update lesson"
+        )
     except Exception as e:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update lesson"
         )
+    
+    audit_log.record(
+        updated_lesson.org_id, updated_lesson.lesson_id, current_user.user_id, "updated",
+        before=before, after=lesson_snapshot(updated_lesson)
+    )
+    await schedule_events.publish(updated_lesson.org_id, [
+        lesson_event("updated", updated_lesson, changed, previous_date)
+    ])
+    return await lesson_repo.get_by_id(updated_lesson.lesson_id)
 
 
 @router.delete("/{lesson_id}")
@@ -162,16 +184,30 @@ async def delete_lesson(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.METHODIST]))
 ):
-    """Delete a lesson."""
+    """Delete a lesson.
+    
+    Like DELETE /api/v1/lessons/{id} this cancels the lesson and keeps the
+    row, so both APIs emit the same audit entry and event.
+    """
     lesson_repo = LessonRepository(db)
     
-    success = await lesson_repo.delete(lesson_id)
-    if not success:
+    existing_lesson = await lesson_repo.get_by_id(lesson_id, org_id=current_user.org_id)
+    if not existing_lesson:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Lesson not found"
         )
     
+    before = lesson_snapshot(existing_lesson)
+    await lesson_repo.cancel(existing_lesson, current_user.user_id)
+    
+    audit_log.record(
+        existing_lesson.org_id, lesson_id, current_user.user_id, "updated",
+        before=before, after=lesson_snapshot(existing_lesson)
+    )
+    await schedule_events.publish(existing_lesson.org_id, [
+        lesson_event("updated", existing_lesson, ["status"])
+    ])
     return {"message": "Lesson deleted successfully"}
 
 
@@ -198,3 +234,26 @@ async def check_lesson_conflicts(
         conflicts=conflicts,
         can_proceed=len(conflicts) == 0
     )
+
+
+@router.post("/check-conflicts/batch", response_model=List[LessonConflictResponse])
+async def check_lesson_conflicts_batch(
+    candidates: List[LessonConflictCandidate],
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Check many candidate placements for conflicts with a single query."""
+    lesson_repo = LessonRepository(db)
+    
+    results = await lesson_repo.check_conflicts_batch(
+        org_id=current_user.org_id,
+        candidates=[candidate.model_dump() for candidate in candidates]
+    )
+    
+    return [
+        LessonConflictResponse(
+            conflicts=conflicts,
+            can_proceed=len(conflicts) == 0
+        )
+        for conflicts in results
+    ]
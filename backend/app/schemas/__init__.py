@@ -20,9 +20,14 @@ from .facilities import (
 from .scheduling import (
     LessonInstanceCreate, LessonInstanceUpdate, LessonInstanceResponse,
     LessonStatus, GenerationJobCreate, GenerationJobResponse,
-    GenerationScope, GenerationStatus, LessonConflictResponse
+    GenerationScope, GenerationStatus, LessonConflictResponse, LessonConflictCandidate
 )
 from .generation import GenerationRuleSet, GenerationPreviewRequest, GenerationRunRequest
+from .reports import (
+    ConflictItem, ConflictKindSummary, ConflictsSummary, ConflictsReport,
+    WorkloadBucket, WorkloadItem, WorkloadReport
+)
+from .imports import ImportRowError, CatalogImportResult
 
 __all__ = [
     # Auth
@@ -47,7 +52,12 @@ __all__ = [
     # Scheduling
     "LessonInstanceCreate", "LessonInstanceUpdate", "LessonInstanceResponse",
     "LessonStatus", "GenerationJobCreate", "GenerationJobResponse",
-    "GenerationScope", "GenerationStatus", "LessonConflictResponse",
+    "GenerationScope", "GenerationStatus", "LessonConflictResponse", "LessonConflictCandidate",
     # Generation
-    "GenerationRuleSet", "GenerationPreviewRequest", "GenerationRunRequest"
+    "GenerationRuleSet", "GenerationPreviewRequest", "GenerationRunRequest",
+    # Reports
+    "ConflictItem", "ConflictKindSummary", "ConflictsSummary", "ConflictsReport",
+    "WorkloadBucket", "WorkloadItem", "WorkloadReport",
+    # Imports
+    "ImportRowError", "CatalogImportResult"
 ]
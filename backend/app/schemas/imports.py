@@ -0,0 +1,19 @@
+"""Catalog import schemas."""
+
+from typing import List
+from pydantic import BaseModel
+
+
+class ImportRowError(BaseModel):
+    """Errors for a single file row (1-based, header is row 1)."""
+    row: int
+    errors: List[str]
+
+
+class CatalogImportResult(BaseModel):
+    """Outcome of a catalog import."""
+    entity: str
+    processed: int
+    upserted: int
+    error_count: int
+    errors: List[ImportRowError]
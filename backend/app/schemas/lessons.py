@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Union
+from typing import List, Optional, Union
 from datetime import date, time
 
 class LessonBase(BaseModel):
@@ -35,3 +35,31 @@ class LessonResponse(LessonBase):
 
     class Config:
         from_attributes = True
+
+class LessonBulkRowResult(BaseModel):
+    index: int
+    lesson_id: Optional[int] = None
+    errors: List[str] = []
+
+class LessonBulkResult(BaseModel):
+    message: str
+    created_count: int
+    rejected_count: int
+    results: List[LessonBulkRowResult]
+
+class LessonChange(LessonResponse):
+    room_number: Optional[str] = None
+    version: int
+    change_seq: int
+
+class LessonDeletion(BaseModel):
+    lesson_id: int
+    date: date
+    change_seq: int
+
+class LessonChanges(BaseModel):
+    changes: List[LessonChange]
+    deleted: List[LessonDeletion]
+    next_since: int
+    next_horizon: Optional[int] = None
+    has_more: bool
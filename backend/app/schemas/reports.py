@@ -0,0 +1,66 @@
+"""Report schemas."""
+
+from datetime import date
+from typing import Dict, List
+from pydantic import BaseModel
+
+
+class ConflictItem(BaseModel):
+    """A single double-booking of a room, teacher or group."""
+    kind: str  # room, teacher or group
+    resource_id: int
+    date: date
+    slot_id: int
+    lesson_count: int
+    lesson_ids: List[int]
+
+
+class ConflictKindSummary(BaseModel):
+    """Org-wide conflict totals for one resource kind."""
+    conflicts: int = 0
+    lessons: int = 0
+
+
+class ConflictsSummary(BaseModel):
+    """Org-wide conflict totals for the requested range."""
+    room: ConflictKindSummary = ConflictKindSummary()
+    teacher: ConflictKindSummary = ConflictKindSummary()
+    group: ConflictKindSummary = ConflictKindSummary()
+    total: int = 0
+
+
+class ConflictsReport(BaseModel):
+    """Paginated conflicts report."""
+    start_date: date
+    end_date: date
+    summary: ConflictsSummary
+    items: List[ConflictItem]
+    skip: int
+    limit: int
+
+
+class WorkloadBucket(BaseModel):
+    """Lessons and minutes in one day, week or month."""
+    period: date
+    lessons: int
+    minutes: int
+
+
+class WorkloadItem(BaseModel):
+    """Workload of one teacher or group."""
+    resource_id: int
+    name: str
+    total_lessons: int
+    by_status: Dict[str, int]
+    planned_hours: float
+    scheduled_hours: float
+    buckets: List[WorkloadBucket]
+
+
+class WorkloadReport(BaseModel):
+    """Workload report for all teachers or groups of an organization."""
+    kind: str  # teacher or group
+    start_date: date
+    end_date: date
+    bucket: str  # day, week or month
+    items: List[WorkloadItem]
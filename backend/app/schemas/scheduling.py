@@ -91,3 +91,12 @@ class LessonConflictResponse(BaseModel):
     """Lesson conflict response schema."""
     conflicts: List[str]
     can_proceed: bool
+
+
+class LessonConflictCandidate(BaseModel):
+    """Candidate placement for batch conflict checking."""
+    date: date
+    slot_id: int
+    enrollment_id: int
+    room_id: Optional[int] = None
+    exclude_lesson_id: Optional[int] = None
@@ -0,0 +1,159 @@
+"""Buffered audit trail of lesson changes.
+
+Request handlers only enqueue change records; a background task writes
+them to change_logs with multi-row inserts, flushing when a batch fills
+up or the flush interval passes, whichever comes first. Records still
+buffered when the process dies are lost, which is the price of keeping
+audit writes off the request path.
+"""
+
+import asyncio
+import logging
+from datetime import date, datetime, time, timezone
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.scheduling import ChangeLog
+
+logger = logging.getLogger(__name__)
+
+AUDITED_LESSON_FIELDS = (
+    "term_id", "date", "slot_id", "room_id", "enrollment_id", "status", "reason", "version"
+)
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return value
+
+
+def lesson_snapshot(lesson, fields=AUDITED_LESSON_FIELDS) -> Dict[str, Any]:
+    """JSON-ready copy of a lesson's audited fields, from a model or a row mapping."""
+    get = lesson.get if isinstance(lesson, dict) else lambda name: getattr(lesson, name, None)
+    return {field: _json_value(get(field)) for field in fields}
+
+
+class AuditWriter:
+    """Queues change records and writes them to change_logs in batches."""
+
+    def __init__(self, batch_size: int, flush_interval: float, queue_size: int, session_factory=AsyncSessionLocal):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.session_factory = session_factory
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: List[Dict[str, Any]] = []
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def record(
+        self,
+        org_id: int,
+        lesson_id: int,
+        user_id: int,
+        action: str,
+        before: Optional[Dict[str, Any]] = None,
+        after: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Enqueue one change; never blocks and never raises into the caller."""
+        entry = {
+            "org_id": org_id,
+            "lesson_id": lesson_id,
+            "user_id": user_id,
+            "action": action,
+            "payload_json": {"before": before, "after": after},
+            # Stamped now, the row may be written up to a flush interval later
+            "created_at": datetime.now(timezone.utc)
+        }
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"Audit queue full, {self.dropped} change records dropped so far")
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # A batch interrupted before its commit was not written
+        await self._flush(self._in_flight)
+        self._in_flight = []
+        while not self._queue.empty():
+            await self._flush(self._take(self.batch_size))
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.queue_depth,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
+
+    def _take(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                batch.extend(self._take(self.batch_size - len(batch)))
+                remaining = deadline - loop.time()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            self._in_flight = batch
+            await self._flush(batch)
+            self._in_flight = []
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        """Write one batch with a single executemany INSERT; a failed batch is logged and dropped."""
+        if not batch:
+            return
+        try:
+            async with self.session_factory() as db:
+                await db.execute(insert(ChangeLog), batch)
+                await db.commit()
+                # Written: stop() must not write it again if cancelled from here on
+                self.written += len(batch)
+                if batch is self._in_flight:
+                    self._in_flight = []
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Failed to write {len(batch)} audit records: {e}")
+
+
+audit_log = AuditWriter(
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    queue_size=settings.AUDIT_QUEUE_SIZE
+)
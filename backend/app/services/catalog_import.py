@@ -0,0 +1,367 @@
+"""Streaming CSV/XLSX import of catalog entities.
+
+Rows are parsed lazily, references are resolved by natural key (group
+name, course name, teacher email) against lookup maps loaded once per
+import, and clean rows are upserted in batches with INSERT ... ON CONFLICT.
+Reading and parsing block, so they run in a worker thread one batch of
+rows at a time while the event loop keeps serving other requests.
+"""
+
+import asyncio
+import codecs
+import csv
+import itertools
+import logging
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.educational import Group, Teacher, Course, CourseAssignment, Enrollment
+from ..models.facilities import Room
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 1000
+
+# Row errors kept in the response; the total is always counted
+MAX_REPORTED_ERRORS = 1000
+
+ENROLLMENT_UNITS = ("per_week", "per_term")
+
+
+def _parse_str(value: Any) -> str:
+    return str(value).strip()
+
+
+def _parse_int(value: Any) -> int:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return int(str(value).strip())
+
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("1", "true", "yes", "y", "да"):
+        return True
+    if text in ("0", "false", "no", "n", "нет"):
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+# Per entity: model, natural key columns and fields as name -> (parser, required, default).
+# Optional columns missing from the file are left to model defaults on insert and
+# untouched on update.
+IMPORT_ENTITIES: Dict[str, Dict[str, Any]] = {
+    "groups": {
+        "model": Group,
+        "key": ("name",),
+        "fields": {
+            "name": (_parse_str, True, None),
+            "size": (_parse_int, False, 25),
+            "year_level": (_parse_int, False, None),
+            "generation_type": (_parse_int, False, 2),
+            "is_active": (_parse_bool, False, True),
+        },
+    },
+    "teachers": {
+        "model": Teacher,
+        "key": ("email",),
+        "fields": {
+            "email": (_parse_str, True, None),
+            "first_name": (_parse_str, True, None),
+            "last_name": (_parse_str, True, None),
+            "phone": (_parse_str, False, None),
+            "is_active": (_parse_bool, False, True),
+        },
+    },
+    "courses": {
+        "model": Course,
+        "key": ("name",),
+        "fields": {
+            "name": (_parse_str, True, None),
+            "type": (_parse_str, False, None),
+            "is_active": (_parse_bool, False, True),
+        },
+    },
+    "rooms": {
+        "model": Room,
+        "key": ("number",),
+        "fields": {
+            "number": (_parse_str, True, None),
+            "capacity": (_parse_int, False, 30),
+            "kind": (_parse_str, False, None),
+            "building": (_parse_str, False, None),
+            "is_active": (_parse_bool, False, True),
+        },
+    },
+    "enrollments": {
+        "model": Enrollment,
+        "key": ("assignment_id", "group_id"),
+        "fields": {
+            "group": (_parse_str, True, None),
+            "course": (_parse_str, True, None),
+            "teacher_email": (_parse_str, True, None),
+            "planned_hours": (_parse_int, True, None),
+            "unit": (_parse_str, False, "per_week"),
+        },
+    },
+}
+
+
+def iter_csv_rows(file: BinaryIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (line number, row) from a UTF-8 CSV file without loading it whole.
+
+    The delimiter is sniffed from the header line so ``;`` exports from
+    spreadsheet software work too.
+    """
+    text = codecs.iterdecode(file, "utf-8-sig")
+    header_line = next(text, "")
+    try:
+        dialect = csv.Sniffer().sniff(header_line, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(itertools.chain([header_line], text), dialect)
+    yield from _rows_with_header(reader)
+
+
+def iter_xlsx_rows(file: BinaryIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (row number, row) from the first sheet of an XLSX workbook."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from _rows_with_header(workbook.worksheets[0].iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+def _rows_with_header(rows) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Map raw rows onto normalized header names, skipping blank rows."""
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [str(name or "").strip().lower() for name in header]
+    for line, row in enumerate(rows, start=2):
+        if not any(cell not in (None, "") for cell in row):
+            continue
+        yield line, dict(zip(columns, row))
+
+
+def _dialect_insert(db: AsyncSession) -> Callable:
+    """INSERT construct with ON CONFLICT support for the session's dialect."""
+    if db.bind.dialect.name == "sqlite":
+        return sqlite.insert
+    return postgresql.insert
+
+
+class CatalogImporter:
+    """Upserts one catalog entity for an organization from parsed rows."""
+
+    def __init__(self, db: AsyncSession, org_id: int, entity: str):
+        self.db = db
+        self.org_id = org_id
+        self.entity = entity
+        self.spec = IMPORT_ENTITIES[entity]
+        self.insert = _dialect_insert(db)
+        self.processed = 0
+        self.upserted = 0
+        self.error_count = 0
+        self.errors: List[Dict[str, Any]] = []
+        self._columns: Optional[List[str]] = None
+
+    async def run(self, rows: Iterator[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Import all rows and return counts with row-level errors.
+
+        The caller commits, so database errors leave nothing half-imported.
+        """
+        if self.entity == "enrollments":
+            await self._load_lookups()
+
+        rows = iter(rows)
+        batch: Dict[Tuple, Dict[str, Any]] = {}
+        while True:
+            parsed = await asyncio.to_thread(self._parse_chunk, rows)
+            if parsed is None:
+                break
+            for values in parsed:
+                # Later rows win, a statement may not touch the same key twice
+                batch[tuple(values[key] for key in self._key_columns())] = values
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    await self._flush(list(batch.values()))
+                    batch = {}
+
+        if batch:
+            await self._flush(list(batch.values()))
+
+        return {
+            "entity": self.entity,
+            "processed": self.processed,
+            "upserted": self.upserted,
+            "error_count": self.error_count,
+            "errors": self.errors
+        }
+
+    def _parse_chunk(self, rows: Iterator[Tuple[int, Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+        """Read and validate the next IMPORT_BATCH_SIZE rows; None once the file is done.
+
+        Runs in a worker thread and never touches the session.
+        """
+        chunk = list(itertools.islice(rows, IMPORT_BATCH_SIZE))
+        if not chunk:
+            return None
+        if self._columns is None:
+            self._columns = self._present_columns(chunk[0][1])
+            if self._columns is None:
+                return None
+
+        parsed = []
+        for line, raw in chunk:
+            self.processed += 1
+            values, errors = self._parse(raw)
+            if not errors and self.entity == "enrollments":
+                values, errors = self._resolve_enrollment(values)
+            if errors:
+                self._add_error(line, errors)
+            else:
+                parsed.append(values)
+        return parsed
+
+    def _key_columns(self) -> Tuple[str, ...]:
+        if self.entity == "enrollments":
+            return ("course_id", "teacher_id", "group_id")
+        return self.spec["key"]
+
+    def _present_columns(self, raw: Dict[str, Any]) -> Optional[List[str]]:
+        """Spec fields present in the file header; records an error if required ones are missing."""
+        fields = self.spec["fields"]
+        missing = [name for name, (_, required, _) in fields.items() if required and name not in raw]
+        if missing:
+            self._add_error(1, [f"Missing required columns: {', '.join(missing)}"])
+            return None
+        return [name for name in fields if name in raw]
+
+    def _parse(self, raw: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        values: Dict[str, Any] = {}
+        errors: List[str] = []
+        for name in self._columns:
+            parser, required, default = self.spec["fields"][name]
+            cell = raw.get(name)
+            if cell is None or (isinstance(cell, str) and not cell.strip()):
+                if required:
+                    errors.append(f"{name} is required")
+                values[name] = default
+                continue
+            try:
+                values[name] = parser(cell)
+            except ValueError:
+                errors.append(f"{name}: invalid value {cell!r}")
+        return values, errors
+
+    async def _load_lookups(self) -> None:
+        """Load natural key -> id maps needed to resolve enrollment rows."""
+        org_id = self.org_id
+        self.group_ids = dict((await self.db.execute(
+            select(Group.name, Group.group_id).where(Group.org_id == org_id)
+        )).all())
+        self.course_ids = dict((await self.db.execute(
+            select(Course.name, Course.course_id).where(Course.org_id == org_id)
+        )).all())
+        self.teacher_ids = dict((await self.db.execute(
+            select(Teacher.email, Teacher.teacher_id)
+            .where(Teacher.org_id == org_id, Teacher.email.is_not(None))
+        )).all())
+        self.assignment_ids = {
+            (row.course_id, row.teacher_id): row.assignment_id
+            for row in await self.db.execute(
+                select(CourseAssignment.course_id, CourseAssignment.teacher_id, CourseAssignment.assignment_id)
+                .where(CourseAssignment.org_id == org_id)
+            )
+        }
+
+    def _resolve_enrollment(self, values: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        errors = []
+        group_id = self.group_ids.get(values["group"])
+        course_id = self.course_ids.get(values["course"])
+        teacher_id = self.teacher_ids.get(values["teacher_email"])
+        if group_id is None:
+            errors.append(f"Unknown group {values['group']!r}")
+        if course_id is None:
+            errors.append(f"Unknown course {values['course']!r}")
+        if teacher_id is None:
+            errors.append(f"Unknown teacher {values['teacher_email']!r}")
+        if values.get("unit") is not None and values["unit"] not in ENROLLMENT_UNITS:
+            errors.append(f"unit must be one of {', '.join(ENROLLMENT_UNITS)}")
+
+        resolved = {
+            "group_id": group_id,
+            "course_id": course_id,
+            "teacher_id": teacher_id,
+            "planned_hours": values["planned_hours"]
+        }
+        if "unit" in values:
+            resolved["unit"] = values["unit"] or "per_week"
+        return resolved, errors
+
+    async def _ensure_assignments(self, rows: List[Dict[str, Any]]) -> None:
+        """Create course assignments missing for a batch and record their ids."""
+        missing = {
+            (row["course_id"], row["teacher_id"]) for row in rows
+        } - self.assignment_ids.keys()
+        if not missing:
+            return
+
+        await self.db.execute(
+            self.insert(CourseAssignment)
+            .values([
+                {"org_id": self.org_id, "course_id": course_id, "teacher_id": teacher_id}
+                for course_id, teacher_id in missing
+            ])
+            .on_conflict_do_nothing(index_elements=["org_id", "course_id", "teacher_id"])
+        )
+        result = await self.db.execute(
+            select(CourseAssignment.course_id, CourseAssignment.teacher_id, CourseAssignment.assignment_id)
+            .where(
+                CourseAssignment.org_id == self.org_id,
+                tuple_(CourseAssignment.course_id, CourseAssignment.teacher_id).in_(list(missing))
+            )
+        )
+        for row in result:
+            self.assignment_ids[(row.course_id, row.teacher_id)] = row.assignment_id
+
+    async def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        """Upsert one batch with a single multi-row INSERT ... ON CONFLICT."""
+        if self.entity == "enrollments":
+            await self._ensure_assignments(rows)
+            rows = [
+                {
+                    "assignment_id": self.assignment_ids[(row.pop("course_id"), row.pop("teacher_id"))],
+                    **row
+                }
+                for row in rows
+            ]
+
+        rows = [{"org_id": self.org_id, **row} for row in rows]
+        key = ["org_id", *self.spec["key"]]
+        statement = self.insert(self.spec["model"]).values(rows)
+        update_columns = [column for column in rows[0] if column not in key]
+        if update_columns:
+            statement = statement.on_conflict_do_update(
+                index_elements=key,
+                set_={column: statement.excluded[column] for column in update_columns}
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=key)
+
+        await self.db.execute(statement)
+        self.upserted += len(rows)
+        logger.debug(f"Imported {self.upserted} {self.entity} rows for org {self.org_id}")
+
+    def _add_error(self, line: int, errors: List[str]) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": line, "errors": errors})
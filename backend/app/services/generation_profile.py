@@ -0,0 +1,134 @@
+"""Phase-by-phase profile of a schedule generation run.
+
+Every phase records wall time, CPU time, the process peak RSS after it
+and counts of the objects it produced (rows loaded, model variables,
+proposals). With GENERATION_TRACE_MEMORY the Python heap peak of each
+phase is traced as well, at the cost of slower allocation while the
+run lasts.
+
+CPU time is process-wide: it includes CP-SAT worker threads, and any
+other requests the worker served while the phase was awaiting I/O.
+"""
+
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..core.config import settings
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class GenerationProfile:
+    """Collects the phases of one generation run in the order they ran."""
+
+    def __init__(self, trace_memory: Optional[bool] = None):
+        if trace_memory is None:
+            trace_memory = settings.GENERATION_TRACE_MEMORY
+        self._owns_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start()
+        self.phases: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+
+    def begin(self, name: str) -> "ProfilePhase":
+        """Start a phase that spans more than one block; finish it with ``end``."""
+        return ProfilePhase(self, name)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[Dict[str, int]]:
+        """Time a phase; the yielded dict takes its object counts."""
+        phase = self.begin(name)
+        try:
+            yield phase.objects
+        finally:
+            phase.end()
+
+    def add(self, name: str, wall_seconds: float, **objects: int) -> None:
+        """Record a phase measured elsewhere, such as CP-SAT presolve inside a solve."""
+        self.phases.append({
+            "name": name,
+            "wall_seconds": round(wall_seconds, 4),
+            "objects": objects
+        })
+
+    def close(self) -> None:
+        """Stop memory tracing if this profile started it."""
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON-ready breakdown with totals since the profile was created."""
+        return {
+            "wall_seconds": round(time.perf_counter() - self._started, 4),
+            "cpu_seconds": round(time.process_time() - self._cpu_started, 4),
+            "peak_rss_mb": _peak_rss_mb(),
+            "phases": self.phases
+        }
+
+
+class ProfilePhase:
+    """One running phase of a GenerationProfile."""
+
+    def __init__(self, profile: GenerationProfile, name: str):
+        self.profile = profile
+        self.name = name
+        self.objects: Dict[str, int] = {}
+        self._tracing = tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.reset_peak()
+        self._rss_before = _peak_rss_mb()
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+
+    def end(self, **objects: int) -> None:
+        self.objects.update(objects)
+        rss_after = _peak_rss_mb()
+        entry = {
+            "name": self.name,
+            "wall_seconds": round(time.perf_counter() - self._started, 4),
+            "cpu_seconds": round(time.process_time() - self._cpu_started, 4),
+            "peak_rss_mb": rss_after,
+            "rss_growth_mb": round(rss_after - self._rss_before, 1),
+            "objects": self.objects
+        }
+        if self._tracing:
+            entry["py_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        self.profile.phases.append(entry)
+
+
+class SolverPhaseTimer:
+    """Splits a CP-SAT solve into presolve and search from its log.
+
+    The solver logs "Preloading model." once presolve is done and search
+    workers start; lines starting with "#" are search progress.
+    """
+
+    def __init__(self):
+        self.started: Optional[float] = None
+        self.search_started: Optional[float] = None
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self.search_started = None
+
+    def __call__(self, line: str) -> None:
+        if self.search_started is None and (line.startswith("Preloading model") or line.startswith("#")):
+            self.search_started = time.perf_counter()
+
+    def split(self, finished: float) -> Dict[str, float]:
+        """Presolve and search seconds of a solve that ended at ``finished``."""
+        search_started = self.search_started or finished
+        return {
+            "presolve": search_started - self.started,
+            "search": finished - search_started
+        }
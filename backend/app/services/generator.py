@@ -1,6 +1,7 @@
 """Schedule generation service using OR-Tools CP-SAT."""
 
 import logging
+import time
 from datetime import date, datetime, timedelta
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
@@ -8,7 +9,10 @@ from dataclasses import dataclass
 from ortools.sat.python import cp_model
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
+from sqlalchemy.orm import selectinload
 
+from ..core.metrics import record_cp_sat_solve
+from .generation_profile import GenerationProfile, SolverPhaseTimer
 from ..models.educational import Enrollment, CourseAssignment, Group, Teacher
 from ..models.facilities import TimeTableSlot, Room, TeacherAvailability, Holiday
 from ..models.scheduling import LessonInstance, LessonStatus
@@ -37,6 +41,12 @@ class ScheduleGenerator:
         self.org_id = org_id
         self.model = cp_model.CpModel()
         self.solver = cp_model.CpSolver()
+        self.profile = GenerationProfile()
+        # The solver log marks where presolve ends and search begins
+        self.phase_timer = SolverPhaseTimer()
+        self.solver.parameters.log_search_progress = True
+        self.solver.parameters.log_to_stdout = False
+        self.solver.log_callback = self.phase_timer
     
     async def generate_preview(
         self,
@@ -52,13 +62,18 @@ class ScheduleGenerator:
             data = await self._load_scheduling_data(term_id, start_date, end_date)
             
             # Build CP-SAT model
-            variables = self._build_model(data, ruleset)
+            with self.profile.phase("build") as objects:
+                variables = self._build_model(data, ruleset)
+                proto = self.model.Proto()
+                objects.update(variables=len(proto.variables), constraints=len(proto.constraints))
             
             # Solve
-            status = self.solver.Solve(self.model)
+            status = self._solve()
             
             if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-                proposals = self._extract_solution(variables, data)
+                with self.profile.phase("extract") as objects:
+                    proposals = self._extract_solution(variables, data)
+                    objects["proposals"] = len(proposals)
                 stats = self._calculate_stats(proposals, data)
                 
                 return GenerationResult(
@@ -69,7 +84,7 @@ class ScheduleGenerator:
             else:
                 return GenerationResult(
                     proposals=[],
-                    stats={"solver_status": "infeasible"},
+                    stats={"solver_status": "infeasible", "profile": self.profile.as_dict()},
                     conflicts=["No feasible solution found with current constraints"],
                     success=False
                 )
@@ -78,10 +93,24 @@ class ScheduleGenerator:
             logger.error(f"Schedule generation failed: {e}")
             return GenerationResult(
                 proposals=[],
-                stats={"error": str(e)},
+                stats={"error": str(e), "profile": self.profile.as_dict()},
                 conflicts=[f"Generation error: {str(e)}"],
                 success=False
             )
+        finally:
+            self.profile.close()
+    
+    def _solve(self) -> int:
+        """Solve the model, recording presolve and search as separate phases."""
+        with self.profile.phase("solve") as objects:
+            self.phase_timer.start()
+            status = self.solver.Solve(self.model)
+            split = self.phase_timer.split(time.perf_counter())
+            objects.update(conflicts=self.solver.NumConflicts(), branches=self.solver.NumBranches())
+        self.profile.add("presolve", split["presolve"])
+        self.profile.add("search", split["search"])
+        record_cp_sat_solve(self.model, self.solver, status)
+        return status
     
     async def _load_scheduling_data(
         self,
@@ -92,30 +121,38 @@ class ScheduleGenerator:
         """Load all data needed for scheduling."""
         
         # Get enrollments for the term
-        enrollments_result = await self.db.execute(
-            select(Enrollment)
-            .join(CourseAssignment)
-            .join(Group)
-            .join(Teacher)
-            .where(Enrollment.org_id == self.org_id)
-        )
-        enrollments = enrollments_result.scalars().all()
+        with self.profile.phase("load.enrollments") as objects:
+            enrollments_result = await self.db.execute(
+                select(Enrollment)
+                .join(CourseAssignment)
+                .join(Group)
+                .join(Teacher)
+                .where(Enrollment.org_id == self.org_id)
+                # The model is built synchronously, relationships must not lazy-load there
+                .options(selectinload(Enrollment.group), selectinload(Enrollment.assignment))
+            )
+            enrollments = enrollments_result.scalars().all()
+            objects["rows"] = len(enrollments)
         
         # Get time slots
-        slots_result = await self.db.execute(
-            select(TimeTableSlot)
-            .where(TimeTableSlot.org_id == self.org_id)
-            .order_by(TimeTableSlot.start_time)
-        )
-        time_slots = slots_result.scalars().all()
+        with self.profile.phase("load.time_slots") as objects:
+            slots_result = await self.db.execute(
+                select(TimeTableSlot)
+                .where(TimeTableSlot.org_id == self.org_id)
+                .order_by(TimeTableSlot.start_time)
+            )
+            time_slots = slots_result.scalars().all()
+            objects["rows"] = len(time_slots)
         
         # Get rooms
-        rooms_result = await self.db.execute(
-            select(Room)
-            .where(and_(Room.org_id == self.org_id, Room.is_active == True))
-            .order_by(Room.capacity.desc())
-        )
-        rooms = rooms_result.scalars().all()
+        with self.profile.phase("load.rooms") as objects:
+            rooms_result = await self.db.execute(
+                select(Room)
+                .where(and_(Room.org_id == self.org_id, Room.is_active == True))
+                .order_by(Room.capacity.desc())
+            )
+            rooms = rooms_result.scalars().all()
+            objects["rows"] = len(rooms)
         
         # Generate date range (weekdays only)
         dates = []
@@ -126,11 +163,13 @@ class ScheduleGenerator:
             current_date += timedelta(days=1)
         
         # Get teacher availabilities
-        availabilities_result = await self.db.execute(
-            select(TeacherAvailability)
-            .where(TeacherAvailability.org_id == self.org_id)
-        )
-        availabilities = availabilities_result.scalars().all()
+        with self.profile.phase("load.teacher_availabilities") as objects:
+            availabilities_result = await self.db.execute(
+                select(TeacherAvailability)
+                .where(TeacherAvailability.org_id == self.org_id)
+            )
+            availabilities = availabilities_result.scalars().all()
+            objects["rows"] = len(availabilities)
         
         teacher_availabilities = {}
         for avail in availabilities:
@@ -139,34 +178,38 @@ class ScheduleGenerator:
             teacher_availabilities[avail.teacher_id].append(avail)
         
         # Get holidays
-        holidays_result = await self.db.execute(
-            select(Holiday)
-            .where(
-                and_(
-                    Holiday.org_id == self.org_id,
-                    Holiday.date >= start_date,
-                    Holiday.date <= end_date
+        with self.profile.phase("load.holidays") as objects:
+            holidays_result = await self.db.execute(
+                select(Holiday)
+                .where(
+                    and_(
+                        Holiday.org_id == self.org_id,
+                        Holiday.date >= start_date,
+                        Holiday.date <= end_date
+                    )
                 )
             )
-        )
-        holidays = [h.date for h in holidays_result.scalars().all()]
+            holidays = [h.date for h in holidays_result.scalars().all()]
+            objects["rows"] = len(holidays)
         
         # Get existing lessons
-        existing_result = await self.db.execute(
-            select(LessonInstance)
-            .where(
-                and_(
-                    LessonInstance.org_id == self.org_id,
-                    LessonInstance.date >= start_date,
-                    LessonInstance.date <= end_date,
-                    LessonInstance.status.in_([
-                        LessonStatus.PLANNED,
-                        LessonStatus.CONFIRMED
-                    ])
+        with self.profile.phase("load.existing_lessons") as objects:
+            existing_result = await self.db.execute(
+                select(LessonInstance)
+                .where(
+                    and_(
+                        LessonInstance.org_id == self.org_id,
+                        LessonInstance.date >= start_date,
+                        LessonInstance.date <= end_date,
+                        LessonInstance.status.in_([
+                            LessonStatus.PLANNED,
+                            LessonStatus.CONFIRMED
+                        ])
+                    )
                 )
             )
-        )
-        existing_lessons = existing_result.scalars().all()
+            existing_lessons = existing_result.scalars().all()
+            objects["rows"] = len(existing_lessons)
         
         return SchedulingData(
             enrollments=enrollments,
@@ -358,6 +401,7 @@ class ScheduleGenerator:
         """Extract solution from solved model."""
         
         proposals = []
+        group_ids = {enrollment.enrollment_id: enrollment.group_id for enrollment in data.enrollments}
         
         for var_name, var in variables.items():
             if self.solver.Value(var) == 1:
@@ -373,6 +417,7 @@ class ScheduleGenerator:
                     slot_id=data.time_slots[slot_idx].slot_id,
                     room_id=data.rooms[room_idx].room_id,
                     enrollment_id=enrollment_id,
+                    group_id=group_ids[enrollment_id],
                     score=1.0  # Could be calculated based on soft constraints
                 ))
         
@@ -388,8 +433,11 @@ class ScheduleGenerator:
         return {
             "total_proposals": len(proposals),
             "solver_time": self.solver.WallTime(),
+            "solver_conflicts": self.solver.NumConflicts(),
+            "solver_branches": self.solver.NumBranches(),
             "enrollments_count": len(data.enrollments),
             "dates_count": len(data.dates),
             "time_slots_count": len(data.time_slots),
-            "rooms_count": len(data.rooms)
+            "rooms_count": len(data.rooms),
+            "profile": self.profile.as_dict()
         }
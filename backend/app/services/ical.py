@@ -0,0 +1,100 @@
+"""iCalendar (RFC 5545) rendering of lesson schedules."""
+
+from datetime import date, datetime, time, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from ..models.scheduling import LessonStatus
+
+PRODID = "-//Schedule SaaS//Timetable//RU"
+UID_DOMAIN = "schedule-saas"
+
+# Lessons that no longer take place stay in the feed so clients remove them
+CANCELLED_STATUSES = (LessonStatus.CANCELLED, LessonStatus.SKIPPED, LessonStatus.MOVED)
+
+
+def escape_text(value: Optional[str]) -> str:
+    """Escape a TEXT property value."""
+    if not value:
+        return ""
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line to 75 octets and terminate it with CRLF."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte UTF-8 sequence
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_utc(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def local_to_utc(day: date, at: time, tz: ZoneInfo) -> str:
+    """Format an org-local date and time as a UTC DATE-TIME value."""
+    return format_utc(datetime.combine(day, at, tzinfo=tz))
+
+
+def calendar_header(name: str, tz_name: str) -> str:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+        f"X-WR-TIMEZONE:{tz_name}",
+    ]
+    return "".join(fold_line(line) for line in lines)
+
+
+CALENDAR_FOOTER = "END:VCALENDAR\r\n"
+
+
+def lesson_event(row, tz: ZoneInfo) -> str:
+    """Render one lesson row as a VEVENT.
+
+    Times are emitted in UTC, converted from the organization time zone, so
+    no VTIMEZONE component is needed. DTSTAMP and SEQUENCE come from the
+    lesson itself, keeping output stable for an unchanged schedule.
+    """
+    teacher = f"{row.teacher_first_name} {row.teacher_last_name}"
+    summary = row.course_name if not row.course_type else f"{row.course_name} ({row.course_type})"
+    location = row.room_number if not row.room_building else f"{row.room_number}, {row.room_building}"
+    cancelled = row.status in CANCELLED_STATUSES
+
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:lesson-{row.lesson_id}@{UID_DOMAIN}",
+        f"DTSTAMP:{format_utc(row.updated_at or row.created_at)}",
+        f"DTSTART:{local_to_utc(row.date, row.start_time, tz)}",
+        f"DTEND:{local_to_utc(row.date, row.end_time, tz)}",
+        f"SEQUENCE:{row.version or 0}",
+        f"SUMMARY:{escape_text(summary)}",
+        f"DESCRIPTION:{escape_text(f'{teacher}, {row.group_name}')}",
+        f"STATUS:{'CANCELLED' if cancelled else 'CONFIRMED'}",
+    ]
+    if row.room_number:
+        lines.append(f"LOCATION:{escape_text(location)}")
+    lines.append("END:VEVENT")
+    return "".join(fold_line(line) for line in lines)
@@ -0,0 +1,170 @@
+"""Maintenance of the monthly partitions of lesson_instances and change_logs.
+
+Partitions are named ``<table>_pYYYY_MM`` and cover one calendar month.
+The job creates months ahead of time so rows never land in the DEFAULT
+partition, and archives months past their retention period: a partition
+is detached and moved to the archive schema (or dropped), which is
+instant and leaves no dead tuples behind, unlike a bulk DELETE.
+
+Detaching lesson partitions bypasses row triggers, so workload rollups
+keep counting archived weeks until the next reconciliation and no
+tombstones are written for delta sync clients.
+"""
+
+import logging
+import re
+from datetime import date, datetime, time, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> whether its partition key is a timestamp (bounds in UTC) or a date
+PARTITIONED_TABLES = {
+    "lesson_instances": False,
+    "change_logs": True,
+}
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def _bounds(table: str, month: date) -> Tuple[str, str]:
+    """FROM/TO literals of a month partition."""
+    next_month = add_months(month, 1)
+    if PARTITIONED_TABLES[table]:
+        return f"{month.isoformat()} 00:00:00+00", f"{next_month.isoformat()} 00:00:00+00"
+    return month.isoformat(), next_month.isoformat()
+
+
+async def list_partitions(db: AsyncSession, table: str) -> Dict[date, str]:
+    """Month -> partition name of the month partitions currently attached to a table."""
+    result = await db.execute(
+        text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :table
+        """),
+        {"table": table}
+    )
+    pattern = re.compile(rf"^{table}_p(\d{{4}})_(\d{{2}})$")
+    partitions = {}
+    for (name,) in result:
+        match = pattern.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+async def _default_has_rows(db: AsyncSession, table: str, month: date) -> bool:
+    """Whether the DEFAULT partition holds rows of a month, which blocks creating its partition."""
+    start, end = month, add_months(month, 1)
+    column = "date"
+    if PARTITIONED_TABLES[table]:
+        column = "created_at"
+        start, end = (datetime.combine(day, time(), tzinfo=timezone.utc) for day in (start, end))
+    result = await db.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {column} >= :start AND {column} < :end)"),
+        {"start": start, "end": end}
+    )
+    return bool(result.scalar())
+
+
+async def create_partitions(
+    db: AsyncSession,
+    table: str,
+    through: date,
+    dry_run: bool = False
+) -> List[str]:
+    """Create missing month partitions from the current month through ``through``."""
+    existing = await list_partitions(db, table)
+    created = []
+    month = month_start(date.today())
+    while month <= through:
+        if month not in existing:
+            name = partition_name(table, month)
+            if await _default_has_rows(db, table, month):
+                logger.warning(
+                    f"Not creating {name}: {table}_default already holds rows of that month, "
+                    f"move them out first"
+                )
+            else:
+                if not dry_run:
+                    start, end = _bounds(table, month)
+                    await db.execute(text(
+                        f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{start}') TO ('{end}')"
+                    ))
+                created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+async def archive_partitions(
+    db: AsyncSession,
+    table: str,
+    before: date,
+    archive_schema: str,
+    drop: bool = False,
+    dry_run: bool = False
+) -> List[str]:
+    """Detach month partitions ending on or before ``before``; move them to the archive schema or drop them.
+
+    The current month and the DEFAULT partition are never detached, whatever
+    ``before`` is.
+    """
+    before = min(before, month_start(date.today()))
+    archived = []
+    for month, name in sorted((await list_partitions(db, table)).items()):
+        if add_months(month, 1) > before:
+            continue
+        if not dry_run:
+            await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            if drop:
+                await db.execute(text(f"DROP TABLE {name}"))
+            else:
+                await db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+                await db.execute(text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}"))
+        archived.append(name)
+    return archived
+
+
+async def maintain_partitions(
+    db: AsyncSession,
+    premake_months: int,
+    retention_months: Dict[str, Optional[int]],
+    archive_schema: str,
+    drop: bool = False,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """Create upcoming partitions and archive expired ones for every partitioned table.
+
+    ``retention_months`` maps a table to the number of whole months kept
+    before the current one; None keeps everything. The caller commits.
+    """
+    this_month = month_start(date.today())
+    summary: Dict[str, Any] = {}
+    for table in PARTITIONED_TABLES:
+        created = await create_partitions(db, table, add_months(this_month, premake_months), dry_run)
+        archived = []
+        retention = retention_months.get(table)
+        if retention is not None:
+            archived = await archive_partitions(
+                db, table, add_months(this_month, -retention), archive_schema, drop, dry_run
+            )
+        summary[table] = {"created": created, "archived": archived}
+        logger.info(f"{table}: created {len(created)} partitions, archived {len(archived)}")
+    return summary
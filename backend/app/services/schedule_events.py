@@ -0,0 +1,309 @@
+"""Per-organization publish/subscribe of schedule change events.
+
+Lesson writes publish compact events after they commit; clients listen
+over SSE or WebSocket for the date range they display. The in-process
+broker serves a single worker. With SCHEDULE_EVENTS_BACKEND=postgres,
+events travel through LISTEN/NOTIFY so every worker sees every change.
+
+The same channel carries user cache invalidations, so a role change or
+deactivation stops claims-trusted tokens on every worker.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.engine import make_url
+
+from ..core.config import settings
+from ..core.user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "schedule_changes"
+
+# NOTIFY payloads must stay under 8000 bytes
+NOTIFY_MAX_PAYLOAD = 7500
+
+# A dropped LISTEN connection is retried with exponential backoff
+LISTEN_RECONNECT_MIN_SECONDS = 1
+LISTEN_RECONNECT_MAX_SECONDS = 30
+
+# A silently dead LISTEN connection is noticed by a periodic ping
+LISTEN_HEALTHCHECK_SECONDS = 30
+
+
+def lesson_event(
+    kind: str,
+    lesson,
+    changed: Optional[Iterable[str]] = None,
+    previous_date: Optional[date] = None
+) -> Dict[str, Any]:
+    """Build a change event for one lesson; kind is created, updated or deleted."""
+    event = {
+        "kind": kind,
+        "lesson_id": lesson.lesson_id,
+        "date": lesson.date.isoformat(),
+        "version": None if kind == "deleted" else lesson.version
+    }
+    if changed is not None:
+        event["changed"] = sorted(changed)
+    if previous_date is not None and previous_date != lesson.date:
+        event["previous_date"] = previous_date.isoformat()
+    return event
+
+
+def range_event(start_date: date, end_date: date, count: int, reason: str) -> Dict[str, Any]:
+    """Build an event telling clients to refetch a date range after a bulk write."""
+    return {
+        "kind": "bulk",
+        "reason": reason,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "count": count
+    }
+
+
+class Subscription:
+    """One client's interest in an organization's changes within a date range."""
+
+    def __init__(self, org_id: int, start_date: date, end_date: date, queue_size: int):
+        self.org_id = org_id
+        self.start_date = start_date.isoformat()
+        self.end_date = end_date.isoformat()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        """Whether an event touches the subscribed date range (ISO dates compare as strings)."""
+        if event["kind"] == "bulk":
+            return event["start_date"] <= self.end_date and event["end_date"] >= self.start_date
+        return any(
+            day is not None and self.start_date <= day <= self.end_date
+            for day in (event.get("date"), event.get("previous_date"))
+        )
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """Queue an event; a client too slow to keep up is told to resync instead."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.resync()
+
+    def resync(self) -> None:
+        """Drop queued events and tell the client to refetch its range."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait({"kind": "resync"})
+
+
+class ScheduleEventBroker:
+    """In-process broker delivering events to subscribers of this worker."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscriptions: Dict[int, Set[Subscription]] = {}
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def subscribe(self, org_id: int, start_date: date, end_date: date) -> Subscription:
+        subscription = Subscription(org_id, start_date, end_date, self.queue_size)
+        self._subscriptions.setdefault(org_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.org_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.org_id]
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    async def publish(self, org_id: int, events: List[Dict[str, Any]]) -> None:
+        """Publish committed changes; never raises into the request that made them."""
+        if not events:
+            return
+        try:
+            await self._publish(org_id, events)
+        except Exception as e:
+            logger.warning(f"Failed to publish {len(events)} schedule events for org {org_id}: {e}")
+
+    async def _publish(self, org_id: int, events: List[Dict[str, Any]]) -> None:
+        self._deliver(org_id, events)
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """Forget a user's cached auth state here and on every other worker."""
+        user_cache.invalidate(user_id)
+        try:
+            await self._broadcast_invalidation(user_id)
+        except Exception as e:
+            logger.warning(f"Failed to broadcast invalidation of user {user_id}: {e}")
+
+    async def _broadcast_invalidation(self, user_id: int) -> None:
+        pass
+
+    def _deliver(self, org_id: int, events: List[Dict[str, Any]]) -> None:
+        for subscription in self._subscriptions.get(org_id, ()):
+            for event in events:
+                if subscription.matches(event):
+                    subscription.offer(event)
+
+    def _resync_all(self) -> None:
+        """Tell every subscriber to refetch, e.g. after events may have been lost."""
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.resync()
+
+
+class PostgresScheduleEventBroker(ScheduleEventBroker):
+    """Broker fanning events out to all workers through LISTEN/NOTIFY.
+
+    Publishing only sends NOTIFY; delivery to local subscribers happens when
+    the notification comes back on the listening connection, like on any
+    other worker. A background task keeps the listening connection alive and
+    reconnects with backoff; notifications sent while it was down are lost,
+    so local subscribers are told to resync and the user cache is
+    invalidated once it is back.
+    """
+
+    def __init__(self, queue_size: int, database_url: str):
+        super().__init__(queue_size)
+        # asyncpg wants a plain postgresql:// DSN
+        self._dsn = make_url(database_url).set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        self._listen_connection = None
+        self._listen_lost: Optional[asyncio.Event] = None
+        self._listen_task: Optional[asyncio.Task] = None
+        self._notify_connection = None
+        self._notify_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        # Fail startup loudly if the database is unreachable; later drops are retried
+        await self._connect_listener()
+        self._listen_task = asyncio.create_task(self._keep_listening())
+
+    async def stop(self) -> None:
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            try:
+                await self._listen_task
+            except asyncio.CancelledError:
+                pass
+            self._listen_task = None
+        for connection in (self._listen_connection, self._notify_connection):
+            if connection is not None:
+                await connection.close()
+        self._listen_connection = self._notify_connection = None
+
+    async def _connect(self):
+        import asyncpg
+
+        return await asyncpg.connect(self._dsn)
+
+    async def _connect_listener(self) -> None:
+        connection = await self._connect()
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _connection: lost.set())
+        await connection.add_listener(NOTIFY_CHANNEL, self._on_notify)
+        self._listen_connection, self._listen_lost = connection, lost
+
+    async def _keep_listening(self) -> None:
+        """Watch the listening connection and reconnect whenever it drops."""
+        while True:
+            await self._wait_until_lost()
+            logger.warning("Schedule event listener lost its connection, reconnecting")
+            self._listen_connection.terminate()
+            self._listen_connection = None
+            
+            delay = LISTEN_RECONNECT_MIN_SECONDS
+            while self._listen_connection is None:
+                await asyncio.sleep(delay)
+                try:
+                    await self._connect_listener()
+                except Exception as e:
+                    logger.warning(f"Schedule event listener failed to reconnect: {e}")
+                    delay = min(delay * 2, LISTEN_RECONNECT_MAX_SECONDS)
+            # Invalidations may have been missed too; distrust everything cached
+            user_cache.invalidate_all()
+            self._resync_all()
+
+    async def _wait_until_lost(self) -> None:
+        """Return once the listening connection is closed or stops answering pings."""
+        while True:
+            try:
+                await asyncio.wait_for(self._listen_lost.wait(), timeout=LISTEN_HEALTHCHECK_SECONDS)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await asyncio.wait_for(
+                    self._listen_connection.fetchval("SELECT 1"), timeout=LISTEN_HEALTHCHECK_SECONDS
+                )
+            except Exception:
+                return
+
+    async def _publish(self, org_id: int, events: List[Dict[str, Any]]) -> None:
+        await self._notify(self._payloads(org_id, events))
+
+    async def _broadcast_invalidation(self, user_id: int) -> None:
+        await self._notify([json.dumps({"invalidate_user": user_id})])
+
+    async def _notify(self, payloads: Iterable[str]) -> None:
+        async with self._notify_lock:
+            if self._notify_connection is None or self._notify_connection.is_closed():
+                self._notify_connection = await self._connect()
+            try:
+                for payload in payloads:
+                    await self._notify_connection.execute(
+                        "SELECT pg_notify($1, $2)", NOTIFY_CHANNEL, payload
+                    )
+            except Exception:
+                # Reconnect on the next publish rather than reuse a broken connection
+                self._notify_connection.terminate()
+                self._notify_connection = None
+                raise
+
+    def _payloads(self, org_id: int, events: List[Dict[str, Any]]) -> Iterable[str]:
+        """Split events into NOTIFY payloads under the size limit."""
+        chunk: List[Dict[str, Any]] = []
+        size = 0
+        for event in events:
+            event_size = len(json.dumps(event, separators=(",", ":")))
+            if chunk and size + event_size > NOTIFY_MAX_PAYLOAD:
+                yield json.dumps({"org_id": org_id, "events": chunk}, separators=(",", ":"))
+                chunk, size = [], 0
+            chunk.append(event)
+            size += event_size + 1
+        if chunk:
+            yield json.dumps({"org_id": org_id, "events": chunk}, separators=(",", ":"))
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            message = json.loads(payload)
+            if "invalidate_user" in message:
+                user_cache.invalidate(message["invalidate_user"])
+                return
+            self._deliver(message["org_id"], message["events"])
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ignoring malformed schedule notification: {e}")
+
+
+def _create_broker() -> ScheduleEventBroker:
+    if settings.SCHEDULE_EVENTS_BACKEND == "postgres":
+        return PostgresScheduleEventBroker(
+            queue_size=settings.SCHEDULE_EVENTS_QUEUE_SIZE,
+            database_url=settings.DATABASE_URL
+        )
+    return ScheduleEventBroker(queue_size=settings.SCHEDULE_EVENTS_QUEUE_SIZE)
+
+
+schedule_events = _create_broker()
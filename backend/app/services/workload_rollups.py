@@ -0,0 +1,121 @@
+"""Reconciliation of workload rollups against raw lesson instances."""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import (
+    select, delete, insert, and_, or_, func, cast, literal, union_all, text, Date, Integer
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.facilities import TimeTableSlot
+from ..models.scheduling import LessonInstance, WorkloadRollup
+
+logger = logging.getLogger(__name__)
+
+
+def _expected_rollups(org_id: Optional[int] = None):
+    """Rollup rows recomputed from lesson_instances."""
+    week_start = cast(func.date_trunc("week", LessonInstance.date), Date)
+    slot_minutes = cast(
+        func.extract("epoch", TimeTableSlot.end_time - TimeTableSlot.start_time) / 60,
+        Integer
+    )
+
+    def by_resource(kind: str, resource_column):
+        query = (
+            select(
+                LessonInstance.org_id.label("org_id"),
+                literal(kind).label("kind"),
+                resource_column.label("resource_id"),
+                week_start.label("week_start"),
+                LessonInstance.status.label("status"),
+                func.count().label("lesson_count"),
+                func.coalesce(func.sum(slot_minutes), 0).label("minutes")
+            )
+            .join(TimeTableSlot, TimeTableSlot.slot_id == LessonInstance.slot_id)
+            .where(resource_column.is_not(None))
+            .group_by(LessonInstance.org_id, resource_column, week_start, LessonInstance.status)
+        )
+        if org_id is not None:
+            query = query.where(LessonInstance.org_id == org_id)
+        return query
+
+    return union_all(
+        by_resource("teacher", LessonInstance.teacher_id),
+        by_resource("group", LessonInstance.group_id)
+    )
+
+
+async def reconcile_workload_rollups(
+    db: AsyncSession,
+    org_id: Optional[int] = None,
+    repair: bool = True
+) -> dict:
+    """Verify workload rollups against lesson_instances and rebuild on drift.
+
+    Intended for a nightly job. Rollup writes from lesson triggers are
+    blocked while the rebuild runs, so no concurrent delta is lost.
+    """
+    expected = _expected_rollups(org_id).subquery("expected")
+
+    drift_query = (
+        select(func.count())
+        .select_from(
+            expected.outerjoin(
+                WorkloadRollup,
+                and_(
+                    WorkloadRollup.org_id == expected.c.org_id,
+                    WorkloadRollup.kind == expected.c.kind,
+                    WorkloadRollup.resource_id == expected.c.resource_id,
+                    WorkloadRollup.week_start == expected.c.week_start,
+                    WorkloadRollup.status == expected.c.status
+                ),
+                full=True
+            )
+        )
+        .where(
+            or_(
+                # Rollup missing for existing lessons
+                WorkloadRollup.org_id.is_(None),
+                # Rollup left behind without lessons
+                and_(
+                    expected.c.org_id.is_(None),
+                    or_(WorkloadRollup.lesson_count != 0, WorkloadRollup.minutes != 0)
+                ),
+                WorkloadRollup.lesson_count != expected.c.lesson_count,
+                WorkloadRollup.minutes != expected.c.minutes
+            )
+        )
+    )
+    if org_id is not None:
+        drift_query = drift_query.where(
+            or_(WorkloadRollup.org_id == org_id, WorkloadRollup.org_id.is_(None))
+        )
+
+    drifted = (await db.execute(drift_query)).scalar() or 0
+
+    if drifted and repair:
+        logger.warning(f"Workload rollups drifted in {drifted} rows (org_id={org_id}), rebuilding")
+        # SQLite (tests) has a single writer and no rollup triggers to block
+        if db.bind.dialect.name == "postgresql":
+            await db.execute(text("LOCK TABLE workload_rollups IN SHARE ROW EXCLUSIVE MODE"))
+
+        clear = delete(WorkloadRollup)
+        if org_id is not None:
+            clear = clear.where(WorkloadRollup.org_id == org_id)
+        await db.execute(clear)
+
+        await db.execute(
+            insert(WorkloadRollup).from_select(
+                ["org_id", "kind", "resource_id", "week_start", "status", "lesson_count", "minutes"],
+                _expected_rollups(org_id)
+            )
+        )
+        await db.commit()
+
+    return {
+        "org_id": org_id,
+        "drifted_rows": drifted,
+        "repaired": bool(drifted and repair)
+    }
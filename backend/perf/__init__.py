@@ -0,0 +1 @@
+"""Performance tooling: synthetic datasets, generation benchmarks and load tests."""
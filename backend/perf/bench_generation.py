@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""Benchmarks of schedule generation over the synthetic size ladder.
+
+Each case loads a fresh synthetic organization (without lessons) and
+runs one algorithm on it in a child process, so the reported peak RSS
+belongs to that case alone:
+
+* ``greedy``: the block preview behind POST /generation/preview
+* ``cp_sat``: ``ScheduleGenerator``, timed per phase (load, model build,
+  solve, extraction) with the model's variable and constraint counts
+
+Results are written as JSON and compared against a baseline; a metric
+worse than its threshold fails the run with exit code 1. Without a
+baseline the run passes unless ``--require-baseline`` is given, which
+CI should use so a lost baseline file cannot hide regressions.
+
+    python -m perf.bench_generation --sizes xs,s --output bench.json
+    python -m perf.bench_generation --sizes xs,s --require-baseline
+    python -m perf.bench_generation --database-url postgresql+asyncpg://.../bench --update-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import time as timer
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from datetime import timedelta
+from multiprocessing import get_context
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "generation.json")
+
+# Size -> weeks of the term to generate, and whether CP-SAT is run at that size.
+# The CP-SAT model has a variable per enrollment, day, slot and room, so it
+# only fits the small end of the ladder.
+BENCHMARK_CASES: Dict[str, Dict[str, Any]] = {
+    "xs": {"weeks": 1, "cp_sat": True},
+    "s": {"weeks": 1, "cp_sat": True},
+    "m": {"weeks": 2, "cp_sat": False},
+    "l": {"weeks": 1, "cp_sat": False},
+}
+
+# Metric -> (allowed relative change, whether higher is better)
+REGRESSION_THRESHOLDS: Dict[str, tuple] = {
+    "load_seconds": (0.30, False),
+    "build_seconds": (0.25, False),
+    "solve_seconds": (0.25, False),
+    "total_seconds": (0.25, False),
+    "variables": (0.05, False),
+    "constraints": (0.05, False),
+    "peak_rss_mb": (0.15, False),
+    "lessons_placed": (0.05, True),
+}
+
+# Timings below this are noise and never count as regressions
+MIN_SECONDS = 0.05
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def _prepare(database_url: str, size: str, seed: int):
+    """Load a synthetic organization without lessons; returns the engine and dataset."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import StaticPool
+
+    import app.models  # noqa: F401  registers every table on Base.metadata
+    from app.core.database import Base
+    from perf.synthetic import SIZE_LADDER, create_synthetic_org
+
+    if database_url.startswith("sqlite"):
+        engine = create_async_engine(database_url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    else:
+        engine = create_async_engine(database_url)
+
+    spec = replace(SIZE_LADDER[size], seed=seed, lessons=False)
+    dataset = await create_synthetic_org(engine, spec)
+    return engine, dataset
+
+
+def _window(dataset, weeks: int):
+    start = dataset.term_dates[0]
+    return start, start + timedelta(weeks=weeks) - timedelta(days=1)
+
+
+async def _bench_greedy(session, dataset, weeks: int) -> Dict[str, Any]:
+    from app.routers.generation import GenerationRequest, _preview_generation_internal
+
+    start_date, end_date = _window(dataset, weeks)
+    request = GenerationRequest(term_id=dataset.term_id, from_date=start_date, to_date=end_date)
+    started = timer.perf_counter()
+    result = await _preview_generation_internal(request, session, SimpleNamespace(org_id=dataset.org_id))
+    return {
+        "total_seconds": timer.perf_counter() - started,
+        "lessons_placed": len(result.proposals),
+        "blocks": len(result.blocks),
+    }
+
+
+async def _bench_cp_sat(session, dataset, weeks: int, time_limit: float, workers: int) -> Dict[str, Any]:
+    from ortools.sat.python import cp_model
+
+    from app.schemas.generation import GenerationRuleSet
+    from app.services.generator import ScheduleGenerator
+
+    start_date, end_date = _window(dataset, weeks)
+    generator = ScheduleGenerator(session, dataset.org_id)
+    generator.solver.parameters.max_time_in_seconds = time_limit
+    generator.solver.parameters.num_workers = workers
+    generator.solver.parameters.random_seed = 0
+    ruleset = GenerationRuleSet()
+
+    started = timer.perf_counter()
+    data = await generator._load_scheduling_data(dataset.term_id, start_date, end_date)
+    loaded = timer.perf_counter()
+    variables = generator._build_model(data, ruleset)
+    built = timer.perf_counter()
+    status = generator.solver.Solve(generator.model)
+    solved = timer.perf_counter()
+    placed = 0
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        placed = len(generator._extract_solution(variables, data))
+    finished = timer.perf_counter()
+
+    proto = generator.model.Proto()
+    return {
+        "load_seconds": loaded - started,
+        "build_seconds": built - loaded,
+        "solve_seconds": solved - built,
+        "extract_seconds": finished - solved,
+        "total_seconds": finished - started,
+        "variables": len(proto.variables),
+        "constraints": len(proto.constraints),
+        "solver_status": generator.solver.StatusName(status),
+        "lessons_placed": placed,
+    }
+
+
+async def _run_case_async(size: str, algorithm: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    engine, dataset = await _prepare(options["database_url"], size, options["seed"])
+    weeks = BENCHMARK_CASES[size]["weeks"]
+    rss_before = _peak_rss_mb()
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            if algorithm == "greedy":
+                metrics = await _bench_greedy(session, dataset, weeks)
+            else:
+                metrics = await _bench_cp_sat(
+                    session, dataset, weeks, options["time_limit"], options["solver_workers"]
+                )
+    finally:
+        await engine.dispose()
+
+    metrics["peak_rss_mb"] = _peak_rss_mb()
+    metrics["peak_rss_before_mb"] = rss_before
+    metrics["enrollments"] = len(dataset.rows["enrollments"])
+    metrics["weeks"] = weeks
+    return {key: round(value, 4) if isinstance(value, float) else value for key, value in metrics.items()}
+
+
+def run_case(size: str, algorithm: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Entry point of the child process running one case."""
+    return asyncio.run(_run_case_async(size, algorithm, options))
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Regressions of results against a baseline, as readable lines."""
+    regressions = []
+    for case, metrics in results["cases"].items():
+        expected = baseline.get("cases", {}).get(case)
+        if not expected or "error" in metrics:
+            continue
+        for metric, (allowed, higher_is_better) in REGRESSION_THRESHOLDS.items():
+            if metric not in metrics or metric not in expected or not expected[metric]:
+                continue
+            current, reference = metrics[metric], expected[metric]
+            if metric.endswith("_seconds") and max(current, reference) < MIN_SECONDS:
+                continue
+            change = (current - reference) / reference
+            if (higher_is_better and change < -allowed) or (not higher_is_better and change > allowed):
+                regressions.append(
+                    f"{case} {metric}: {reference} -> {current} ({change:+.0%}, allowed {allowed:.0%})"
+                )
+    return regressions
+
+
+def main(args) -> int:
+    sizes = [size for size in args.sizes.split(",") if size]
+    algorithms = [algorithm for algorithm in args.algorithms.split(",") if algorithm]
+    options = {
+        "database_url": args.database_url,
+        "seed": args.seed,
+        "time_limit": args.time_limit,
+        "solver_workers": args.solver_workers,
+    }
+
+    cases: Dict[str, Any] = {}
+    for size in sizes:
+        for algorithm in algorithms:
+            if algorithm == "cp_sat" and not BENCHMARK_CASES[size]["cp_sat"]:
+                continue
+            name = f"{algorithm}/{size}"
+            print(f"⏱  {name} ...", flush=True)
+            # A fresh process per case keeps peak RSS per case
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                try:
+                    cases[name] = pool.submit(run_case, size, algorithm, options).result()
+                except Exception as e:
+                    cases[name] = {"error": str(e)}
+            print(f"   {json.dumps(cases[name], ensure_ascii=False)}", flush=True)
+
+    results = {
+        "seed": args.seed,
+        "database": args.database_url.split(":", 1)[0],
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": cases,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"📌 Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        if args.require_baseline:
+            print(f"❌ No baseline at {args.baseline}, run with --update-baseline to record one")
+            return 1
+        print(f"ℹ️  No baseline at {args.baseline}, run with --update-baseline to record one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("database") != results["database"]:
+        print(f"⚠️  Baseline was recorded on {baseline.get('database')}, comparing anyway")
+    regressions = compare(results, baseline)
+    failed = [name for name, metrics in cases.items() if "error" in metrics]
+    for line in regressions:
+        print(f"❌ {line}")
+    for name in failed:
+        print(f"❌ {name} failed: {cases[name]['error']}")
+    if not regressions and not failed:
+        print("✅ No regressions against the baseline")
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark schedule generation on synthetic organizations.")
+    parser.add_argument("--database-url", default="sqlite+aiosqlite://",
+                        help="Database to load synthetic organizations into (default: in-memory SQLite)")
+    parser.add_argument("--sizes", default="xs,s,m", help=f"Comma-separated sizes out of {','.join(BENCHMARK_CASES)}")
+    parser.add_argument("--algorithms", default="greedy,cp_sat")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--time-limit", type=float, default=30.0, help="CP-SAT time limit per case in seconds")
+    parser.add_argument("--solver-workers", type=int, default=4)
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--require-baseline", action="store_true", help="Fail when there is no baseline to compare to")
+    sys.exit(main(parser.parse_args()))
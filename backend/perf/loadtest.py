@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""HTTP load test of the API against an in-process ASGI app.
+
+A synthetic organization is loaded into a local database, the app's
+session dependencies are pointed at it, and requests go through
+``httpx.ASGITransport`` without opening sockets. Each scenario runs for
+a fixed duration or request count with N concurrent clients:
+
+* ``week_view``: GET /lessons/term for a random week, half of the time for one group
+* ``lesson_edit``: PATCH /lessons/{id} moving a lesson to another slot; 409 is
+  an expected answer when the move clashes
+* ``login_burst``: POST /auth/login as random synthetic users
+* ``generation``: POST /generation/preview for one week of the term
+
+Per scenario the report has throughput and p50/p95/p99 latency. The
+numbers are for one worker process: divide the expected peak request
+rate by the measured throughput to size the worker count.
+
+    python -m perf.loadtest --size s --concurrency 16 --duration 30
+    python -m perf.loadtest --database-url postgresql+asyncpg://.../loadtest --scenarios week_view,lesson_edit
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time as timer
+from dataclasses import dataclass, field, replace
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+API = "/api/v1"
+
+# Scenario -> status codes that are correct answers under contention
+EXPECTED_STATUSES: Dict[str, tuple] = {
+    "week_view": (200,),
+    "lesson_edit": (200, 409),
+    "login_burst": (200, 503),
+    "generation": (200,),
+}
+
+# Lessons sampled as edit targets
+EDIT_SAMPLE_SIZE = 2000
+
+
+@dataclass
+class ScenarioResult:
+    """Latencies and status codes collected for one scenario."""
+    name: str
+    concurrency: int
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=dict)
+    exceptions: int = 0
+    elapsed: float = 0.0
+
+    def record(self, status: int, latency: float) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        expected = EXPECTED_STATUSES[self.name]
+        errors = self.exceptions + sum(
+            number for status, number in self.statuses.items() if status not in expected
+        )
+        return {
+            "concurrency": self.concurrency,
+            "requests": count + self.exceptions,
+            "errors": errors,
+            "statuses": {str(status): number for status, number in sorted(self.statuses.items())},
+            "throughput_rps": round(count / self.elapsed, 1) if self.elapsed else 0.0,
+            "mean_ms": round(sum(latencies) / count * 1000, 1) if count else None,
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "max_ms": round(latencies[-1] * 1000, 1) if count else None,
+        }
+
+
+def percentile(sorted_values: List[float], rank: float) -> Optional[float]:
+    """Nearest-rank percentile in milliseconds of sorted latencies in seconds."""
+    if not sorted_values:
+        return None
+    index = max(0, -(-len(sorted_values) * rank // 100) - 1)
+    return round(sorted_values[int(index)] * 1000, 1)
+
+
+class LoadTest:
+    """Synthetic data, an authenticated client and the request builders of each scenario."""
+
+    def __init__(self, client, dataset, token: str, lessons: List[tuple]):
+        self.client = client
+        self.dataset = dataset
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.lessons = lessons
+        self.weeks = sorted({day - timedelta(days=day.weekday()) for day in dataset.term_dates})
+        self.group_ids = [row[0] for row in dataset.rows["groups"]]
+        self.slot_ids = [row[0] for row in dataset.rows["time_slots"]]
+        self.emails = [row[2] for row in dataset.rows["users"]]
+
+    async def week_view(self, rng: random.Random):
+        week = rng.choice(self.weeks)
+        params = {"start_date": week.isoformat(), "end_date": (week + timedelta(days=6)).isoformat()}
+        if rng.random() < 0.5:
+            params["group_id"] = rng.choice(self.group_ids)
+        return await self.client.get(f"{API}/lessons/term", params=params, headers=self.headers)
+
+    async def lesson_edit(self, rng: random.Random):
+        lesson_id, day = rng.choice(self.lessons)
+        # Another day of the same week keeps the lesson inside the term
+        day = day - timedelta(days=day.weekday()) + timedelta(days=rng.randrange(5))
+        return await self.client.patch(
+            f"{API}/lessons/{lesson_id}",
+            json={"date": day.isoformat(), "slot_id": rng.choice(self.slot_ids)},
+            headers=self.headers
+        )
+
+    async def login_burst(self, rng: random.Random):
+        from perf.synthetic import SYNTHETIC_PASSWORD
+
+        return await self.client.post(
+            f"{API}/auth/login",
+            json={"email": rng.choice(self.emails), "password": SYNTHETIC_PASSWORD}
+        )
+
+    async def generation(self, rng: random.Random):
+        week = rng.choice(self.weeks)
+        return await self.client.post(
+            f"{API}/generation/preview",
+            json={
+                "term_id": self.dataset.term_id,
+                "from_date": week.isoformat(),
+                "to_date": (week + timedelta(days=6)).isoformat()
+            },
+            headers=self.headers
+        )
+
+    async def run(
+        self,
+        name: str,
+        concurrency: int,
+        duration: Optional[float],
+        requests: Optional[int],
+        seed: int
+    ) -> ScenarioResult:
+        """Run one scenario with ``concurrency`` clients until the duration or request budget is spent."""
+        send: Callable = getattr(self, name)
+        result = ScenarioResult(name=name, concurrency=concurrency)
+        remaining = [requests]
+        started = timer.perf_counter()
+        deadline = started + duration if duration else None
+
+        async def client_loop(worker: int) -> None:
+            rng = random.Random(seed * 1000 + worker)
+            while True:
+                if deadline is not None and timer.perf_counter() >= deadline:
+                    return
+                if remaining[0] is not None:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                sent = timer.perf_counter()
+                try:
+                    response = await send(rng)
+                except Exception:
+                    result.exceptions += 1
+                    continue
+                result.record(response.status_code, timer.perf_counter() - sent)
+
+        await asyncio.gather(*(client_loop(worker) for worker in range(concurrency)))
+        result.elapsed = timer.perf_counter() - started
+        return result
+
+
+async def _prepare(database_url: Optional[str], size: str, seed: int):
+    """Create the schema when needed and load a synthetic organization with lessons."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    import app.models  # noqa: F401  registers every table on Base.metadata
+    from app.core.database import Base, engine_options
+    from perf.synthetic import SIZE_LADDER, create_synthetic_org
+
+    if database_url is None:
+        # A file rather than :memory: so concurrent sessions get their own connections
+        path = os.path.join(tempfile.mkdtemp(prefix="loadtest-"), "loadtest.db")
+        database_url = f"sqlite+aiosqlite:///{path}"
+
+    engine = create_async_engine(database_url, **engine_options(database_url))
+    if database_url.startswith("sqlite"):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    spec = replace(SIZE_LADDER[size], seed=seed, lessons=True)
+    dataset = await create_synthetic_org(engine, spec)
+    return engine, dataset
+
+
+async def _sample_lessons(session_factory, org_id: int, seed: int) -> List[tuple]:
+    from sqlalchemy import select
+
+    from app.models.scheduling import LessonInstance
+
+    async with session_factory() as db:
+        rows = (await db.execute(
+            select(LessonInstance.lesson_id, LessonInstance.date)
+            .where(LessonInstance.org_id == org_id)
+        )).all()
+    rng = random.Random(seed)
+    return [tuple(row) for row in rng.sample(rows, min(EDIT_SAMPLE_SIZE, len(rows)))]
+
+
+async def main_async(args) -> Dict[str, Any]:
+    import httpx
+    from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+    from app.core.database import get_db, get_read_db
+    from app.main import app
+    from app.services.audit import audit_log
+
+    print(f"🔄 Loading synthetic organization ({args.size}, seed {args.seed})...")
+    engine, dataset = await _prepare(args.database_url, args.size, args.seed)
+    if dataset.org_id != 1:
+        # Request auth currently pins every user to organization 1
+        print(f"⚠️  Synthetic data landed in organization {dataset.org_id}; use an empty database")
+
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    audit_log.session_factory = session_factory
+    await audit_log.start()
+
+    lessons = await _sample_lessons(session_factory, dataset.org_id, args.seed)
+    scenarios = [name for name in args.scenarios.split(",") if name]
+    report: Dict[str, Any] = {
+        "size": args.size,
+        "seed": args.seed,
+        "lessons": dataset.lesson_count,
+        "duration": args.duration,
+        "requests_per_scenario": args.requests,
+        "scenarios": {}
+    }
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            from perf.synthetic import SYNTHETIC_PASSWORD
+
+            response = await client.post(
+                f"{API}/auth/login",
+                json={"email": dataset.admin_email, "password": SYNTHETIC_PASSWORD}
+            )
+            response.raise_for_status()
+            load_test = LoadTest(client, dataset, response.json()["access_token"], lessons)
+
+            for name in scenarios:
+                for concurrency in args.concurrency:
+                    result = await load_test.run(name, concurrency, args.duration, args.requests, args.seed)
+                    summary = result.summary()
+                    report["scenarios"].setdefault(name, []).append(summary)
+                    print(
+                        f"{'✅' if not summary['errors'] else '❌'} {name} x{concurrency}: "
+                        f"{summary['requests']} requests, {summary['throughput_rps']} req/s, "
+                        f"p50 {summary['p50_ms']}ms p95 {summary['p95_ms']}ms p99 {summary['p99_ms']}ms, "
+                        f"{summary['errors']} errors {summary['statuses']}"
+                    )
+    finally:
+        await audit_log.stop()
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+    return report
+
+
+def main(args) -> int:
+    unknown = [name for name in args.scenarios.split(",") if name and name not in EXPECTED_STATUSES]
+    if unknown:
+        print(f"❌ Unknown scenarios: {', '.join(unknown)}")
+        return 2
+    if args.requests is None and args.duration is None:
+        args.duration = 10.0
+
+    report = asyncio.run(main_async(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.output}")
+
+    failed = any(summary["errors"] for summaries in report["scenarios"].values() for summary in summaries)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    from perf.synthetic import SIZE_LADDER
+
+    parser = argparse.ArgumentParser(description="Load-test the API in process against a synthetic organization.")
+    parser.add_argument("--database-url",
+                        help="Empty database to load into (default: a temporary SQLite file; "
+                             "migrate Postgres databases first)")
+    parser.add_argument("--size", choices=SIZE_LADDER, default="s")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", default=",".join(EXPECTED_STATUSES),
+                        help=f"Comma-separated scenarios out of {','.join(EXPECTED_STATUSES)}")
+    parser.add_argument("--concurrency", type=lambda value: [int(level) for level in value.split(",")],
+                        default=[8], help="Concurrent clients; a comma-separated list runs each level")
+    parser.add_argument("--duration", type=float, help="Seconds per scenario and level (default 10)")
+    parser.add_argument("--requests", type=int, help="Requests per scenario and level instead of a duration")
+    parser.add_argument("--output", help="Write the report JSON here")
+    sys.exit(main(parser.parse_args()))
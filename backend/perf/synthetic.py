@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""Deterministic synthetic organizations for performance testing.
+
+An organization is split into faculties, each with its own groups,
+teachers, courses and rooms, plus lecture halls shared by everyone.
+``cross_faculty_share`` controls how often a group takes a course of
+another faculty and how often a teacher also teaches there. With
+``lessons`` enabled a term of lessons is placed greedily without room,
+teacher or group clashes, which is how million-lesson datasets are made.
+
+The same spec and seed always produce the same rows, apart from the
+bcrypt salt of the users' shared password hash. On Postgres rows
+are loaded with COPY; on SQLite with executemany inserts.
+
+    python -m perf.synthetic --size l --seed 7
+    python -m perf.synthetic --size s --database-url sqlite+aiosqlite:///bench.db --create-schema
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import random
+import sys
+import time as timer
+from dataclasses import dataclass, field, replace
+from datetime import date, time, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app.core.auth import get_password_hash
+from app.core.config import settings
+from app.core.database import Base
+
+logger = logging.getLogger(__name__)
+
+# Every synthetic user logs in with this password
+SYNTHETIC_PASSWORD = "synthetic123"
+
+# Lessons are 1.5 academic hours over an 18 week term
+HOURS_PER_WEEKLY_LESSON = 27
+
+LESSONS_CHUNK_SIZE = 50000
+
+COURSE_TYPES = ("lecture", "seminar", "lab")
+ROOM_KINDS = ("classroom", "seminar room", "computer lab")
+FIRST_NAMES = ("Анна", "Иван", "Мария", "Сергей", "Елена", "Дмитрий", "Ольга", "Алексей", "Наталья", "Павел")
+LAST_NAMES = ("Иванов", "Петров", "Сидоров", "Смирнов", "Кузнецов", "Попов", "Волков", "Соколов", "Лебедев", "Козлов")
+
+
+@dataclass(frozen=True)
+class SyntheticOrgSpec:
+    """Shape of one synthetic organization."""
+    seed: int = 42
+    faculties: int = 4
+    groups_per_faculty: int = 12
+    teachers_per_faculty: int = 18
+    courses_per_faculty: int = 15
+    rooms_per_faculty: int = 10
+    shared_rooms: int = 6
+    courses_per_group: int = 8
+    cross_faculty_share: float = 0.15
+    slots_per_day: int = 6
+    term_start: date = date(2026, 9, 1)
+    term_weeks: int = 18
+    holidays: int = 3
+    # Share of teachers who are only available on four of five weekdays
+    restricted_availability_share: float = 0.3
+    users: int = 20
+    lessons: bool = True
+
+
+# Size ladder used by benchmarks and load tests; "xl" is about a million lessons
+SIZE_LADDER: Dict[str, SyntheticOrgSpec] = {
+    "xs": SyntheticOrgSpec(faculties=1, groups_per_faculty=3, teachers_per_faculty=4, courses_per_faculty=5,
+                           rooms_per_faculty=3, shared_rooms=1, courses_per_group=4, term_weeks=2),
+    "s": SyntheticOrgSpec(faculties=2, groups_per_faculty=6, teachers_per_faculty=8, courses_per_faculty=8,
+                          rooms_per_faculty=5, shared_rooms=2, courses_per_group=6, term_weeks=4),
+    "m": SyntheticOrgSpec(),
+    "l": SyntheticOrgSpec(faculties=10, groups_per_faculty=40, teachers_per_faculty=50, courses_per_faculty=30,
+                          rooms_per_faculty=30, shared_rooms=20, courses_per_group=10),
+    "xl": SyntheticOrgSpec(faculties=30, groups_per_faculty=110, teachers_per_faculty=200, courses_per_faculty=80,
+                           rooms_per_faculty=80, shared_rooms=40, courses_per_group=12, users=200),
+}
+
+
+# Table -> columns, in load order
+TABLE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "organizations": ("org_id", "name", "locale", "tz"),
+    "users": ("user_id", "org_id", "email", "password_hash", "role", "is_active"),
+    "academic_years": ("id", "org_id", "name", "start_date", "end_date"),
+    "terms": ("term_id", "org_id", "academic_year_id", "name", "start_date", "end_date"),
+    "groups": ("group_id", "org_id", "name", "size", "year_level", "generation_type", "is_active"),
+    "teachers": ("teacher_id", "org_id", "first_name", "last_name", "email", "phone", "is_active"),
+    "courses": ("course_id", "org_id", "name", "type", "is_active"),
+    "course_assignments": ("assignment_id", "org_id", "course_id", "teacher_id"),
+    "enrollments": ("enrollment_id", "org_id", "assignment_id", "group_id", "planned_hours", "unit"),
+    "rooms": ("room_id", "org_id", "number", "capacity", "kind", "building", "is_active"),
+    "time_slots": ("slot_id", "org_id", "start_time", "end_time", "break_minutes", "label", "weekday_mask"),
+    "teacher_availabilities": ("availability_id", "org_id", "teacher_id", "weekday", "start_time", "end_time",
+                               "is_available"),
+    "holidays": ("holiday_id", "org_id", "date", "name"),
+    "lesson_instances": ("lesson_id", "org_id", "term_id", "date", "slot_id", "room_id", "enrollment_id",
+                         "teacher_id", "group_id", "status", "created_by", "version", "change_seq"),
+}
+
+PRIMARY_KEYS = {table: columns[0] for table, columns in TABLE_COLUMNS.items()}
+
+
+@dataclass
+class SyntheticDataset:
+    """Generated rows per table; lessons are produced lazily by ``iter_lessons``."""
+    spec: SyntheticOrgSpec
+    org_id: int
+    term_id: int
+    admin_email: str
+    rows: Dict[str, List[Tuple]] = field(default_factory=dict)
+    lesson_count: int = 0
+    # Inputs of lesson placement
+    _placement: Dict[str, Any] = field(default_factory=dict, repr=False)
+    _first_lesson_id: int = 1
+
+    @property
+    def term_dates(self) -> List[date]:
+        return self._placement["dates"]
+
+    def iter_lessons(self) -> Iterator[Tuple]:
+        """Yield lesson rows week by week; deterministic for the dataset's seed."""
+        if not self.spec.lessons:
+            return
+        placement = self._placement
+        rng = random.Random(self.spec.seed * 7919 + 1)
+        lesson_id = self._first_lesson_id
+        change_seq = 0
+        slots = placement["slot_ids"]
+        dates = placement["dates"]
+        weeks = [list(week) for _, week in itertools.groupby(dates, key=lambda day: day.isocalendar()[1])]
+
+        for week in weeks:
+            busy_teacher = set()
+            busy_group = set()
+            busy_room = set()
+            for group_id, size, enrollments, rooms in placement["groups"]:
+                for enrollment_id, teacher_id, per_week in enrollments:
+                    for _ in range(per_week):
+                        for _attempt in range(12):
+                            day = rng.choice(week)
+                            slot_id = rng.choice(slots)
+                            if (day, slot_id, group_id) in busy_group or (day, slot_id, teacher_id) in busy_teacher:
+                                continue
+                            if not placement["available"](teacher_id, day):
+                                continue
+                            room_id = next(
+                                (room for room in rooms if (day, slot_id, room) not in busy_room),
+                                None
+                            )
+                            if room_id is None:
+                                continue
+                            busy_group.add((day, slot_id, group_id))
+                            busy_teacher.add((day, slot_id, teacher_id))
+                            busy_room.add((day, slot_id, room_id))
+                            roll = rng.random()
+                            status = "CANCELLED" if roll < 0.02 else "PLANNED" if roll < 0.2 else "CONFIRMED"
+                            change_seq += 1
+                            yield (
+                                lesson_id, self.org_id, self.term_id, day, slot_id, room_id, enrollment_id,
+                                teacher_id, group_id, status, placement["created_by"], 1, change_seq
+                            )
+                            lesson_id += 1
+                            break
+        self.lesson_count = change_seq
+
+
+def generate_org(spec: SyntheticOrgSpec, id_start: Optional[Dict[str, int]] = None) -> SyntheticDataset:
+    """Build every non-lesson row of an organization; ids continue after ``id_start``."""
+    rng = random.Random(spec.seed)
+    next_id = {table: (id_start or {}).get(table, 0) + 1 for table in TABLE_COLUMNS}
+
+    def new_id(table: str) -> int:
+        value = next_id[table]
+        next_id[table] += 1
+        return value
+
+    rows: Dict[str, List[Tuple]] = {table: [] for table in TABLE_COLUMNS if table != "lesson_instances"}
+    org_id = new_id("organizations")
+    rows["organizations"].append((org_id, f"Synthetic University {spec.seed}", "ru", settings.TZ))
+
+    password_hash = get_password_hash(SYNTHETIC_PASSWORD)
+    roles = ["ADMIN", "METHODIST"] + ["TEACHER"] * (spec.users // 2) + ["STUDENT"] * spec.users
+    emails = []
+    for index, role in enumerate(roles[:max(spec.users, 2)]):
+        email = f"{role.lower()}{index}.org{org_id}@synthetic.edu"
+        emails.append(email)
+        rows["users"].append((new_id("users"), org_id, email, password_hash, role, True))
+    created_by = rows["users"][0][0]
+
+    term_end = spec.term_start + timedelta(weeks=spec.term_weeks) - timedelta(days=1)
+    year_id = new_id("academic_years")
+    rows["academic_years"].append((
+        year_id, org_id, f"{spec.term_start.year}-{spec.term_start.year + 1}",
+        date(spec.term_start.year, 9, 1), date(spec.term_start.year + 1, 6, 30)
+    ))
+    term_id = new_id("terms")
+    rows["terms"].append((term_id, org_id, year_id, "Synthetic term", spec.term_start, term_end))
+
+    # Pairs of 90 minutes with 10 minute breaks from 08:30
+    slot_ids = []
+    for index in range(spec.slots_per_day):
+        start = 8 * 60 + 30 + index * 100
+        slot_id = new_id("time_slots")
+        slot_ids.append(slot_id)
+        rows["time_slots"].append((
+            slot_id, org_id, time(start // 60, start % 60), time((start + 90) // 60, (start + 90) % 60),
+            10, f"{index + 1} пара", 31
+        ))
+    day_start, day_end = rows["time_slots"][0][2], rows["time_slots"][-1][3]
+
+    shared_rooms = []
+    for index in range(spec.shared_rooms):
+        room_id = new_id("rooms")
+        shared_rooms.append((room_id, 120))
+        rows["rooms"].append((room_id, org_id, f"A-{index + 1}", 120, "lecture hall", "Main", True))
+
+    faculties = []
+    for faculty in range(spec.faculties):
+        rooms = []
+        for index in range(spec.rooms_per_faculty):
+            room_id = new_id("rooms")
+            capacity = rng.choice((20, 25, 30, 40))
+            rooms.append((room_id, capacity))
+            rows["rooms"].append((
+                room_id, org_id, f"F{faculty + 1}-{index + 101}", capacity,
+                rng.choice(ROOM_KINDS), f"Building {faculty + 1}", True
+            ))
+
+        teachers = []
+        for index in range(spec.teachers_per_faculty):
+            teacher_id = new_id("teachers")
+            teachers.append(teacher_id)
+            rows["teachers"].append((
+                teacher_id, org_id, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                f"teacher{teacher_id}.org{org_id}@synthetic.edu", None, True
+            ))
+
+        courses = []
+        for index in range(spec.courses_per_faculty):
+            course_id = new_id("courses")
+            courses.append(course_id)
+            rows["courses"].append((
+                course_id, org_id, f"Course F{faculty + 1}-{index + 1}", rng.choice(COURSE_TYPES), True
+            ))
+
+        groups = []
+        for index in range(spec.groups_per_faculty):
+            group_id = new_id("groups")
+            size = rng.randint(15, 30)
+            groups.append((group_id, size))
+            rows["groups"].append((
+                group_id, org_id, f"F{faculty + 1}-{index + 1:03d}", size, index % 4 + 1,
+                rng.choice((2, 3)), True
+            ))
+
+        faculties.append({"rooms": rooms, "teachers": teachers, "courses": courses, "groups": groups})
+
+    # Each course is taught by one or two teachers, sometimes from another faculty
+    assignments: Dict[int, List[Tuple[int, int]]] = {}
+    for faculty_index, faculty in enumerate(faculties):
+        for course_id in faculty["courses"]:
+            course_assignments = []
+            for _ in range(rng.choice((1, 1, 2))):
+                source = faculty
+                if len(faculties) > 1 and rng.random() < spec.cross_faculty_share:
+                    source = faculties[rng.choice([i for i in range(len(faculties)) if i != faculty_index])]
+                teacher_id = rng.choice(source["teachers"])
+                if any(teacher == teacher_id for _, teacher in course_assignments):
+                    continue
+                assignment_id = new_id("course_assignments")
+                course_assignments.append((assignment_id, teacher_id))
+                rows["course_assignments"].append((assignment_id, org_id, course_id, teacher_id))
+            assignments[course_id] = course_assignments
+
+    placement_groups = []
+    for faculty_index, faculty in enumerate(faculties):
+        for group_id, size in faculty["groups"]:
+            courses = set()
+            while len(courses) < min(spec.courses_per_group, spec.courses_per_faculty):
+                source = faculty
+                if len(faculties) > 1 and rng.random() < spec.cross_faculty_share:
+                    source = faculties[rng.choice([i for i in range(len(faculties)) if i != faculty_index])]
+                courses.add(rng.choice(source["courses"]))
+            group_enrollments = []
+            for course_id in sorted(courses):
+                assignment_id, teacher_id = rng.choice(assignments[course_id])
+                per_week = rng.choice((1, 1, 2, 2, 3))
+                enrollment_id = new_id("enrollments")
+                group_enrollments.append((enrollment_id, teacher_id, per_week))
+                rows["enrollments"].append((
+                    enrollment_id, org_id, assignment_id, group_id,
+                    per_week * HOURS_PER_WEEKLY_LESSON, "per_term"
+                ))
+            rooms = [
+                room_id for room_id, capacity in faculty["rooms"] + shared_rooms if capacity >= size
+            ]
+            rng.shuffle(rooms)
+            placement_groups.append((group_id, size, group_enrollments, rooms))
+
+    # Restricted teachers have one weekday off; others have no availability rows at all
+    day_off: Dict[int, int] = {}
+    all_teachers = [teacher for faculty in faculties for teacher in faculty["teachers"]]
+    for teacher_id in all_teachers:
+        if rng.random() >= spec.restricted_availability_share:
+            continue
+        day_off[teacher_id] = rng.randint(1, 5)
+        for weekday in range(1, 6):
+            if weekday != day_off[teacher_id]:
+                rows["teacher_availabilities"].append((
+                    new_id("teacher_availabilities"), org_id, teacher_id, weekday, day_start, day_end, True
+                ))
+
+    weekdays = [
+        spec.term_start + timedelta(days=offset)
+        for offset in range((term_end - spec.term_start).days + 1)
+        if (spec.term_start + timedelta(days=offset)).weekday() < 5
+    ]
+    holidays = set(rng.sample(weekdays, min(spec.holidays, len(weekdays))))
+    for holiday in sorted(holidays):
+        rows["holidays"].append((new_id("holidays"), org_id, holiday, "Synthetic holiday"))
+
+    dataset = SyntheticDataset(spec=spec, org_id=org_id, term_id=term_id, admin_email=emails[0], rows=rows)
+    dataset._first_lesson_id = next_id["lesson_instances"]
+    dataset._placement = {
+        "slot_ids": slot_ids,
+        "dates": [day for day in weekdays if day not in holidays],
+        "groups": placement_groups,
+        "created_by": created_by,
+        "available": lambda teacher_id, day: day_off.get(teacher_id) != day.isoweekday(),
+    }
+    return dataset
+
+
+async def next_ids(engine: AsyncEngine) -> Dict[str, int]:
+    """Highest primary key per table, so a dataset can be added to a non-empty database."""
+    async with engine.connect() as conn:
+        return {
+            table: (await conn.execute(text(f"SELECT coalesce(max({column}), 0) FROM {table}"))).scalar()
+            for table, column in PRIMARY_KEYS.items()
+        }
+
+
+def _chunks(rows: Iterator[Tuple], size: int) -> Iterator[List[Tuple]]:
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _load_postgres(engine: AsyncEngine, dataset: SyntheticDataset, disable_triggers: bool) -> None:
+    """COPY every table; lesson triggers can be disabled and their effects applied in bulk afterwards."""
+    async with engine.begin() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        for table, rows in dataset.rows.items():
+            if rows:
+                await raw.copy_records_to_table(table, records=rows, columns=TABLE_COLUMNS[table])
+
+        if disable_triggers:
+            await conn.execute(text("ALTER TABLE lesson_instances DISABLE TRIGGER USER"))
+        for chunk in _chunks(dataset.iter_lessons(), LESSONS_CHUNK_SIZE):
+            await raw.copy_records_to_table(
+                "lesson_instances", records=chunk, columns=TABLE_COLUMNS["lesson_instances"]
+            )
+        if disable_triggers:
+            await conn.execute(text("ALTER TABLE lesson_instances ENABLE TRIGGER USER"))
+
+        await conn.execute(
+            text("""
+                INSERT INTO schedule_versions (org_id, version)
+                VALUES (:org_id, 1)
+                ON CONFLICT (org_id) DO UPDATE
+                SET version = schedule_versions.version + 1
+            """),
+            {"org_id": dataset.org_id}
+        )
+        # Lessons copied with triggers off carry their own change numbers
+        await conn.execute(
+            text("SELECT setval('lesson_change_seq', greatest(:change_seq, (SELECT last_value FROM lesson_change_seq)))"),
+            {"change_seq": dataset.lesson_count}
+        )
+        # Explicit ids leave the serial sequences behind
+        for table, column in PRIMARY_KEYS.items():
+            await conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+                f"(SELECT coalesce(max({column}), 1) FROM {table}))"
+            ))
+
+    if disable_triggers:
+        from app.services.workload_rollups import reconcile_workload_rollups
+
+        async with AsyncSession(engine) as session:
+            await reconcile_workload_rollups(session, org_id=dataset.org_id, repair=True)
+
+
+async def _load_generic(engine: AsyncEngine, dataset: SyntheticDataset) -> None:
+    """Load with executemany inserts, for SQLite."""
+    async with engine.begin() as conn:
+        tables = [(table, rows) for table, rows in dataset.rows.items()]
+        tables.append(("lesson_instances", dataset.iter_lessons()))
+        for table, rows in tables:
+            columns = TABLE_COLUMNS[table]
+            for chunk in _chunks(iter(rows), LESSONS_CHUNK_SIZE):
+                await conn.execute(
+                    insert(Base.metadata.tables[table]),
+                    [dict(zip(columns, row)) for row in chunk]
+                )
+
+
+async def load_dataset(engine: AsyncEngine, dataset: SyntheticDataset, disable_triggers: bool = True) -> None:
+    """Load a generated dataset in one transaction."""
+    if engine.dialect.name == "postgresql":
+        await _load_postgres(engine, dataset, disable_triggers)
+    else:
+        await _load_generic(engine, dataset)
+
+
+async def create_synthetic_org(
+    engine: AsyncEngine,
+    spec: SyntheticOrgSpec,
+    disable_triggers: bool = True
+) -> SyntheticDataset:
+    """Generate an organization after the rows already in the database and load it."""
+    dataset = generate_org(spec, await next_ids(engine))
+    await load_dataset(engine, dataset, disable_triggers)
+    return dataset
+
+
+async def main(args) -> None:
+    import app.models  # noqa: F401  registers every table on Base.metadata
+
+    spec = replace(SIZE_LADDER[args.size], seed=args.seed)
+    if args.no_lessons:
+        spec = replace(spec, lessons=False)
+
+    engine = create_async_engine(args.database_url)
+    if args.create_schema:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    started = timer.perf_counter()
+    dataset = await create_synthetic_org(engine, spec, disable_triggers=not args.keep_triggers)
+    elapsed = timer.perf_counter() - started
+    await engine.dispose()
+
+    print(f"✅ Organization {dataset.org_id} ({args.size}, seed {spec.seed}) loaded in {elapsed:.1f}s")
+    for table, rows in dataset.rows.items():
+        print(f"   {table}: {len(rows)}")
+    print(f"   lesson_instances: {dataset.lesson_count}")
+    print(f"🔑 Log in as {dataset.admin_email} / {SYNTHETIC_PASSWORD}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate and load a synthetic organization.")
+    parser.add_argument("--size", choices=SIZE_LADDER, default="m")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--create-schema", action="store_true",
+                        help="Create tables from the models first (SQLite; use migrations on Postgres)")
+    parser.add_argument("--no-lessons", action="store_true", help="Only load catalog data")
+    parser.add_argument("--keep-triggers", action="store_true",
+                        help="Let lesson triggers run row by row instead of disabling them during COPY")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Nightly job: create upcoming monthly partitions, archive expired ones and prune old lesson tombstones."""
+
+import argparse
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.repositories.lesson import LessonRepository
+from app.services.partitions import maintain_partitions
+
+
+async def main(drop, dry_run):
+    async with AsyncSessionLocal() as session:
+        summary = await maintain_partitions(
+            session,
+            premake_months=settings.PARTITION_PREMAKE_MONTHS,
+            retention_months={
+                "lesson_instances": settings.LESSON_RETENTION_MONTHS,
+                "change_logs": settings.CHANGE_LOG_RETENTION_MONTHS
+            },
+            archive_schema=settings.PARTITION_ARCHIVE_SCHEMA,
+            drop=drop,
+            dry_run=dry_run
+        )
+        tombstones = 0
+        if settings.LESSON_TOMBSTONE_RETENTION_DAYS is not None:
+            before = datetime.now(timezone.utc) - timedelta(days=settings.LESSON_TOMBSTONE_RETENTION_DAYS)
+            tombstones = await LessonRepository(session).prune_tombstones(before, dry_run=dry_run)
+        if not dry_run:
+            await session.commit()
+    await engine.dispose()
+
+    verb = "would be" if dry_run else "were"
+    for table, result in summary.items():
+        print(f"📦 {table}: {len(result['created'])} partitions {verb} created, "
+              f"{len(result['archived'])} {verb} {'dropped' if drop else 'archived'}")
+        for name in result["archived"]:
+            print(f"   - {name}")
+    print(f"🪦 lesson_tombstones: {tombstones} {verb} pruned")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--drop", action="store_true", help="Drop expired partitions instead of archiving them")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be done")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.drop, args.dry_run))
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Nightly job: verify workload rollups against lesson instances and repair drift."""
+
+import argparse
+import asyncio
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services.workload_rollups import reconcile_workload_rollups
+
+
+async def main(org_id, repair):
+    async with AsyncSessionLocal() as session:
+        result = await reconcile_workload_rollups(session, org_id=org_id, repair=repair)
+    await engine.dispose()
+
+    if result["drifted_rows"]:
+        action = "rebuilt" if result["repaired"] else "left as is (--check)"
+        print(f"⚠️  {result['drifted_rows']} rollup rows drifted, {action}")
+    else:
+        print("✅ Workload rollups match lesson_instances")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--org-id", type=int, default=None, help="Only reconcile this organization")
+    parser.add_argument("--check", action="store_true", help="Report drift without repairing it")
+    args = parser.parse_args()
+
+    result = asyncio.run(main(args.org_id, repair=not args.check))
+    sys.exit(1 if result["drifted_rows"] and not result["repaired"] else 0)
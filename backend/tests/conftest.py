@@ -2,20 +2,49 @@
 
 import pytest
 import asyncio
+from contextlib import contextmanager
+from datetime import date, time, timedelta
 from httpx import AsyncClient
+from sqlalchemy import Date, event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql.elements import Cast
 
 from app.main import app
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, get_read_db
 from app.core.auth import get_password_hash
-from app.models import Organization, User, UserRole
+from app.core.query_stats import count_queries
+from app.models import (
+    Organization, User, UserRole, AcademicYear, Term, TimeTableSlot, Room,
+    Group, Teacher, Course, CourseAssignment, Enrollment
+)
 
 
 # Test database URL (in-memory SQLite)
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 
+def _sqlite_date_trunc(unit, value):
+    """date_trunc for ISO date strings, by day, week (Monday) or month."""
+    if value is None:
+        return None
+    day = date.fromisoformat(value[:10])
+    if unit == "week":
+        day -= timedelta(days=day.weekday())
+    elif unit == "month":
+        day = day.replace(day=1)
+    return day.isoformat()
+
+
+@compiles(Cast, "sqlite")
+def _sqlite_cast(element, compiler, **kw):
+    # SQLite stores dates as ISO strings; CAST(... AS DATE) would turn them into numbers
+    if isinstance(element.type, Date):
+        return compiler.process(element.clause, **kw)
+    return compiler.visit_cast(element, **kw)
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create an instance of the default event loop for the test session."""
@@ -24,9 +53,9 @@ def event_loop():
     loop.close()
 
 
-@pytest.fixture(scope="session")
+@pytest.fixture
 async def test_engine():
-    """Create test database engine."""
+    """Create a fresh test database engine for each test."""
     engine = create_async_engine(
         TEST_DATABASE_URL,
         echo=False,
@@ -34,6 +63,14 @@ async def test_engine():
         connect_args={"check_same_thread": False}
     )
     
+    @event.listens_for(engine.sync_engine, "connect")
+    def register_functions(dbapi_connection, connection_record):
+        # concat() is only built into SQLite from 3.44
+        dbapi_connection.create_function(
+            "concat", -1, lambda *parts: "".join("" if part is None else str(part) for part in parts)
+        )
+        dbapi_connection.create_function("date_trunc", 2, _sqlite_date_trunc)
+    
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
@@ -41,7 +78,7 @@ async def test_engine():
     await engine.dispose()
 
 
-@pytest.fixture(scope="session")
+@pytest.fixture
 async def test_session_factory(test_engine):
     """Create test session factory."""
     return async_sessionmaker(test_engine, expire_on_commit=False)
@@ -54,6 +91,22 @@ async def db_session(test_session_factory):
         yield session
 
 
+@pytest.fixture
+def assert_max_queries():
+    """Fail when a block runs more SQL statements than allowed.
+    
+        with assert_max_queries(3):
+            response = await client.get(...)
+    """
+    @contextmanager
+    def check(limit: int):
+        with count_queries() as stats:
+            yield stats
+        assert stats.count <= limit, f"{stats.count} queries executed, expected at most {limit}"
+    
+    return check
+
+
 @pytest.fixture
 async def test_organization(db_session: AsyncSession):
     """Create test organization."""
@@ -100,6 +153,65 @@ async def test_methodist_user(db_session: AsyncSession, test_organization):
     return user
 
 
+@pytest.fixture
+async def schedule_data(db_session: AsyncSession, test_organization):
+    """Create a term with two slots, two rooms and one enrolled group."""
+    org_id = test_organization.org_id
+    
+    academic_year = AcademicYear(
+        org_id=org_id,
+        name="2024-2025",
+        start_date=date(2024, 9, 1),
+        end_date=date(2025, 6, 30)
+    )
+    db_session.add(academic_year)
+    await db_session.flush()
+    
+    term = Term(
+        org_id=org_id,
+        academic_year_id=academic_year.id,
+        name="Fall 2024",
+        start_date=date(2024, 9, 1),
+        end_date=date(2024, 12, 31)
+    )
+    slots = [
+        TimeTableSlot(org_id=org_id, start_time=time(9, 0), end_time=time(10, 30)),
+        TimeTableSlot(org_id=org_id, start_time=time(10, 40), end_time=time(12, 10))
+    ]
+    rooms = [
+        Room(org_id=org_id, number="101", capacity=30),
+        Room(org_id=org_id, number="102", capacity=30)
+    ]
+    group = Group(org_id=org_id, name="Test Group", size=25)
+    teacher = Teacher(org_id=org_id, first_name="Test", last_name="Teacher")
+    course = Course(org_id=org_id, name="Test Subject", type="lecture")
+    db_session.add_all([term, *slots, *rooms, group, teacher, course])
+    await db_session.flush()
+    
+    assignment = CourseAssignment(org_id=org_id, course_id=course.course_id, teacher_id=teacher.teacher_id)
+    db_session.add(assignment)
+    await db_session.flush()
+    
+    enrollment = Enrollment(
+        org_id=org_id,
+        assignment_id=assignment.assignment_id,
+        group_id=group.group_id,
+        planned_hours=2
+    )
+    db_session.add(enrollment)
+    await db_session.commit()
+    
+    return {
+        "term": term,
+        "slots": slots,
+        "rooms": rooms,
+        "group": group,
+        "teacher": teacher,
+        "course": course,
+        "enrollment": enrollment
+    }
+
+
 @pytest.fixture
 async def client(db_session):
     """Create test client with database override."""
@@ -108,6 +220,7 @@ async def client(db_session):
         yield db_session
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     
     async with AsyncClient(app=app, base_url="http://test") as client:
         yield client
@@ -0,0 +1,40 @@
+"""Tests for the buffered audit writer."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ChangeLog
+from app.services.audit import AuditWriter
+
+
+@pytest.mark.asyncio
+async def test_stop_does_not_rewrite_committed_batch(
+    db_session: AsyncSession,
+    test_session_factory,
+    test_admin_user
+):
+    """Test a batch cancelled after its commit is not written again on stop."""
+    committed = asyncio.Event()
+    
+    @asynccontextmanager
+    async def slow_close_session():
+        async with test_session_factory() as db:
+            yield db
+        if not committed.is_set():
+            committed.set()
+            await asyncio.sleep(10)
+    
+    writer = AuditWriter(batch_size=1, flush_interval=0.01, queue_size=10, session_factory=slow_close_session)
+    await writer.start()
+    writer.record(test_admin_user.org_id, 1, test_admin_user.user_id, "updated")
+    await asyncio.wait_for(committed.wait(), 5)
+    
+    await asyncio.wait_for(writer.stop(), 5)
+    
+    count = await db_session.scalar(select(func.count()).select_from(ChangeLog))
+    assert count == 1
+    assert writer.stats()["written"] == 1
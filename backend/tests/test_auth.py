@@ -54,6 +54,19 @@ async def test_login_success(client: AsyncClient, test_admin_user):
     assert data["user"]["email"] == test_admin_user.email
 
 
+@pytest.mark.asyncio
+async def test_login_query_count(client: AsyncClient, test_admin_user, assert_max_queries):
+    """Test login stays within its query budget and reports it in Server-Timing."""
+    with assert_max_queries(2):
+        response = await client.post("/api/v1/auth/login", json={
+            "email": test_admin_user.email,
+            "password": "testpass"
+        })
+
+    assert response.status_code == 200
+    assert "queries" in response.headers["server-timing"]
+
+
 @pytest.mark.asyncio
 async def test_login_invalid_credentials(client: AsyncClient, test_admin_user):
     """Test login with invalid credentials."""
@@ -107,3 +120,106 @@ async def test_get_current_user_invalid_token(client: AsyncClient):
     )
     
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_token_carries_user_claims(client: AsyncClient, test_admin_user):
+    """Test that access tokens carry the claims used for auth without a lookup."""
+    from app.core.auth import decode_token
+    
+    response = await client.post("/api/v1/auth/login", json={
+        "email": test_admin_user.email,
+        "password": "testpass"
+    })
+    
+    assert response.status_code == 200
+    payload = decode_token(response.json()["access_token"])
+    
+    assert payload["sub"] == str(test_admin_user.user_id)
+    assert payload["org_id"] == test_admin_user.org_id
+    assert payload["role"] == "ADMIN"
+    assert payload["is_active"] is True
+    assert "iat" in payload
+
+
+@pytest.mark.asyncio
+async def test_invalidated_user_claims_not_trusted(test_admin_user):
+    """Test that claims issued before a user invalidation are ignored."""
+    from app.core.auth import create_user_access_token, decode_token, _user_from_claims
+    from app.core.user_cache import user_cache
+    
+    payload = decode_token(create_user_access_token(test_admin_user))
+    assert _user_from_claims(payload).user_id == test_admin_user.user_id
+    
+    user_cache.invalidate(test_admin_user.user_id)
+    try:
+        assert _user_from_claims(payload) is None
+        assert user_cache.get(test_admin_user.user_id) is None
+    finally:
+        user_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_deactivated_user_rejected_with_fresh_token(
+    client: AsyncClient,
+    db_session,
+    test_admin_user,
+    admin_auth_headers
+):
+    """Test deactivation is honoured for a token still young enough to be trusted on its claims."""
+    from app.core.user_cache import user_cache
+    from app.repositories.user import UserRepository
+    
+    response = await client.get("/api/v1/auth/me", headers=admin_auth_headers)
+    assert response.status_code == 200
+    
+    await UserRepository(db_session).update(test_admin_user, {"is_active": False})
+    try:
+        response = await client.get("/api/v1/auth/me", headers=admin_auth_headers)
+        assert response.status_code == 400
+        assert response.json()["error"]["message"] == "Inactive user"
+    finally:
+        user_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_password_executor_rejects_when_full():
+    """Test calls beyond the workers and queue are rejected with Retry-After."""
+    import asyncio
+    import threading
+    from fastapi import HTTPException
+    from app.core.auth import PasswordHashExecutor
+    
+    executor = PasswordHashExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+    running = [asyncio.create_task(executor.run(release.wait, 5)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert executor.stats()["queue_depth"] == 1
+    
+    with pytest.raises(HTTPException) as error:
+        await executor.run(release.wait, 5)
+    release.set()
+    await asyncio.gather(*running)
+    
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "1"}
+    assert executor.stats()["rejected"] == 1
+    assert executor.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_login_when_hash_pool_full(client: AsyncClient, test_admin_user, monkeypatch):
+    """Test login answers 503 with Retry-After instead of queueing without bound."""
+    from app.core.auth import password_executor
+    
+    monkeypatch.setattr(
+        password_executor, "in_flight", password_executor.max_workers + password_executor.max_queue
+    )
+    
+    response = await client.post("/api/v1/auth/login", json={
+        "email": test_admin_user.email,
+        "password": "testpass"
+    })
+    
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,164 @@
+"""Tests for engine setup and read routing."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import database
+from app.core.database import ReplicaLagMonitor
+
+
+def _monitor(monkeypatch, lag) -> ReplicaLagMonitor:
+    """Monitor whose lag query returns ``lag``, or raises it if it is an exception."""
+    monitor = ReplicaLagMonitor(max_lag_seconds=5.0, check_interval_seconds=60.0)
+
+    async def query_lag():
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+    monkeypatch.setattr(monitor, "_query_lag", query_lag)
+    return monitor
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("lag, usable", [
+    (0.0, True),
+    (4.5, True),
+    (30.0, False),
+    # No WAL receiver: the replica is not catching up however current it looks
+    (None, False),
+    (OSError("connection refused"), False)
+])
+async def test_replica_lag_monitor(monkeypatch, lag, usable):
+    """Test the replica serves reads only while its measured lag is within bounds."""
+    monitor = _monitor(monkeypatch, lag)
+
+    assert await monitor.is_usable() is usable
+    if usable:
+        assert monitor.lag_seconds == lag
+    else:
+        assert monitor.lag_seconds is None or monitor.lag_seconds > monitor.max_lag_seconds
+
+
+@pytest.mark.asyncio
+async def test_replica_lag_is_cached(monkeypatch):
+    """Test the lag is measured once per check interval."""
+    monitor = _monitor(monkeypatch, 1.0)
+    calls = []
+    query_lag = monitor._query_lag
+
+    async def counting_query_lag():
+        calls.append(1)
+        return await query_lag()
+
+    monkeypatch.setattr(monitor, "_query_lag", counting_query_lag)
+    assert await monitor.is_usable()
+    assert await monitor.is_usable()
+    assert len(calls) == 1
+
+
+class ReplicaSession(AsyncSession):
+    """Session class telling replica sessions apart in routing tests."""
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("lag, on_replica", [(1.0, True), (None, False), (30.0, False)])
+async def test_get_read_db_routing(monkeypatch, test_engine, test_session_factory, lag, on_replica):
+    """Test read sessions use the replica only while it is fresh."""
+    replica_factory = async_sessionmaker(test_engine, class_=ReplicaSession, expire_on_commit=False)
+    monkeypatch.setattr(database, "AsyncSessionLocal", test_session_factory)
+    monkeypatch.setattr(database, "ReplicaSessionLocal", replica_factory)
+    monkeypatch.setattr(database, "replica_monitor", _monitor(monkeypatch, lag))
+
+    dependency = database.get_read_db()
+    session = await dependency.__anext__()
+    await dependency.aclose()
+
+    assert isinstance(session, ReplicaSession) is on_replica
+
+
+@pytest.mark.asyncio
+async def test_get_read_db_without_replica(monkeypatch, test_session_factory):
+    """Test reads go to the primary when no replica is configured."""
+    monkeypatch.setattr(database, "AsyncSessionLocal", test_session_factory)
+    monkeypatch.setattr(database, "ReplicaSessionLocal", None)
+
+    assert await database._read_session_factory() is test_session_factory
+
+
+@pytest.mark.parametrize("pgbouncer", [False, True])
+def test_engine_options_asyncpg(monkeypatch, pgbouncer):
+    """Test statement caching is kept for direct connections and disabled behind PgBouncer."""
+    monkeypatch.setattr(database.settings, "DB_PGBOUNCER", pgbouncer)
+    monkeypatch.setattr(database.settings, "DB_STATEMENT_CACHE_SIZE", 200)
+
+    options = database.engine_options("postgresql+asyncpg://user:secret@db/app")
+
+    assert options["pool_size"] == database.settings.DB_POOL_SIZE
+    connect_args = options["connect_args"]
+    if pgbouncer:
+        assert connect_args["prepared_statement_cache_size"] == 0
+        assert connect_args["statement_cache_size"] == 0
+        name_func = connect_args["prepared_statement_name_func"]
+        assert name_func() != name_func()
+    else:
+        assert connect_args == {"prepared_statement_cache_size": 200}
+
+
+def test_engine_options_sqlite():
+    """Test SQLite engines get no sized pool or driver arguments."""
+    options = database.engine_options("sqlite+aiosqlite:///:memory:")
+
+    assert "pool_size" not in options
+    assert "connect_args" not in options
+
+
+class _CountingEngine:
+    """Engine stand-in counting connections held at once."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.open = 0
+        self.peak = 0
+
+    @asynccontextmanager
+    async def connect(self):
+        if self.fail:
+            raise OSError("connection refused")
+        self.open += 1
+        self.peak = max(self.peak, self.open)
+        try:
+            yield self
+        finally:
+            self.open -= 1
+
+    async def execute(self, statement):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_warm_up_pool_warms_replica(monkeypatch):
+    """Test warm-up opens connections on both the primary and the replica."""
+    primary, replica = _CountingEngine(), _CountingEngine()
+    monkeypatch.setattr(database, "engine", primary)
+    monkeypatch.setattr(database, "replica_engine", replica)
+    monkeypatch.setattr(database.settings, "DB_POOL_SIZE", 5)
+
+    assert await database.warm_up_pool(3) == 6
+    assert primary.peak == 3
+    assert replica.peak == 3
+
+
+@pytest.mark.asyncio
+async def test_warm_up_pool_survives_replica_failure(monkeypatch):
+    """Test an unreachable replica does not fail the primary warm-up."""
+    primary = _CountingEngine()
+    monkeypatch.setattr(database, "engine", primary)
+    monkeypatch.setattr(database, "replica_engine", _CountingEngine(fail=True))
+    monkeypatch.setattr(database.settings, "DB_POOL_SIZE", 5)
+
+    assert await database.warm_up_pool(2) == 2
+    assert primary.peak == 2
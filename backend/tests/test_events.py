@@ -0,0 +1,197 @@
+"""Tests for schedule change events and their streams."""
+
+import asyncio
+import json
+import time
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.user_cache import user_cache
+from app.routers import events
+from app.services import schedule_events as schedule_events_module
+from app.services.schedule_events import (
+    NOTIFY_CHANNEL, PostgresScheduleEventBroker, ScheduleEventBroker, Subscription, range_event
+)
+
+
+def _event(day: str, **fields) -> dict:
+    return {"kind": "updated", "lesson_id": 1, "date": day, "version": 2, **fields}
+
+
+def test_subscription_matches_date_range():
+    """Test lesson and bulk events match by date, previous date and overlap."""
+    subscription = Subscription(1, date(2024, 11, 11), date(2024, 11, 17), queue_size=10)
+
+    assert subscription.matches(_event("2024-11-11"))
+    assert subscription.matches(_event("2024-11-17"))
+    assert not subscription.matches(_event("2024-11-18"))
+    # A lesson moved out of the range still concerns its old week
+    assert subscription.matches(_event("2024-11-25", previous_date="2024-11-12"))
+    assert subscription.matches(range_event(date(2024, 11, 1), date(2024, 11, 11), 5, "bulk_create"))
+    assert not subscription.matches(range_event(date(2024, 11, 18), date(2024, 11, 30), 5, "bulk_create"))
+
+
+@pytest.mark.asyncio
+async def test_publish_reaches_matching_subscribers_only():
+    """Test events go to subscribers of the same organization and date range."""
+    broker = ScheduleEventBroker(queue_size=10)
+    this_week = broker.subscribe(1, date(2024, 11, 11), date(2024, 11, 17))
+    next_week = broker.subscribe(1, date(2024, 11, 18), date(2024, 11, 24))
+    other_org = broker.subscribe(2, date(2024, 11, 11), date(2024, 11, 17))
+
+    await broker.publish(1, [_event("2024-11-12")])
+
+    assert this_week.queue.get_nowait()["date"] == "2024-11-12"
+    assert next_week.queue.empty()
+    assert other_org.queue.empty()
+
+    broker.unsubscribe(this_week)
+    await broker.publish(1, [_event("2024-11-13")])
+    assert this_week.queue.empty()
+    assert broker.subscriber_count == 2
+
+
+@pytest.mark.asyncio
+async def test_overflow_replaces_queue_with_resync():
+    """Test a subscriber that falls behind gets a single resync instead of a backlog."""
+    broker = ScheduleEventBroker(queue_size=2)
+    subscription = broker.subscribe(1, date(2024, 11, 11), date(2024, 11, 17))
+
+    await broker.publish(1, [_event("2024-11-12"), _event("2024-11-13"), _event("2024-11-14")])
+
+    assert subscription.queue.qsize() == 1
+    assert subscription.queue.get_nowait() == {"kind": "resync"}
+
+
+@pytest.mark.asyncio
+async def test_sse_subscribes_only_while_streaming(monkeypatch):
+    """Test the SSE stream holds a subscription only while it is iterated."""
+    broker = ScheduleEventBroker(queue_size=10)
+    monkeypatch.setattr(events, "schedule_events", broker)
+
+    async def authenticate(access_token, start_date, end_date):
+        return SimpleNamespace(org_id=1)
+
+    monkeypatch.setattr(events, "_authenticate", authenticate)
+    response = await events.stream_schedule_events(
+        request=None, start_date=date(2024, 11, 11), end_date=date(2024, 11, 17), access_token="token"
+    )
+
+    # A response that is never sent leaves nothing behind
+    assert broker.subscriber_count == 0
+
+    stream = response.body_iterator
+    assert await stream.__anext__() == "retry: 5000\n\n"
+    assert broker.subscriber_count == 1
+
+    await broker.publish(1, [_event("2024-11-12")])
+    chunk = await stream.__anext__()
+    assert chunk.startswith("event: updated\n")
+    assert json.loads(chunk.split("data: ", 1)[1])["date"] == "2024-11-12"
+
+    await stream.aclose()
+    assert broker.subscriber_count == 0
+
+
+class _FakeConnection:
+    """Just enough of an asyncpg connection for the LISTEN supervisor."""
+
+    def __init__(self):
+        self.termination_listeners = []
+        self.listeners = {}
+        self.closed = False
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    async def fetchval(self, query):
+        return 1
+
+    def is_closed(self):
+        return self.closed
+
+    def terminate(self):
+        self.closed = True
+
+    async def close(self):
+        self.closed = True
+
+    def drop(self):
+        self.closed = True
+        for callback in self.termination_listeners:
+            callback(self)
+
+
+@pytest.mark.asyncio
+async def test_postgres_listener_reconnects_and_resyncs(monkeypatch):
+    """Test a dropped LISTEN connection is replaced and subscribers are told to resync."""
+    monkeypatch.setattr(schedule_events_module, "LISTEN_RECONNECT_MIN_SECONDS", 0)
+    connections = []
+
+    async def connect():
+        if len(connections) == 1:
+            # The first reconnect attempt fails and is retried
+            connections.append(None)
+            raise OSError("connection refused")
+        connection = _FakeConnection()
+        connections.append(connection)
+        return connection
+
+    broker = PostgresScheduleEventBroker(queue_size=10, database_url="postgresql+asyncpg://u:p@db/app")
+    monkeypatch.setattr(broker, "_connect", connect)
+    subscription = broker.subscribe(1, date(2024, 11, 11), date(2024, 11, 17))
+    issued_at = time.time() - 1
+    await broker.start()
+    try:
+        connections[0].drop()
+        for _ in range(100):
+            if len(connections) == 3 and not subscription.queue.empty():
+                break
+            await asyncio.sleep(0.01)
+
+        assert subscription.queue.get_nowait() == {"kind": "resync"}
+        # Invalidations sent while disconnected are unknown, so no claims are trusted
+        assert user_cache.invalidated_since(1, issued_at)
+
+        # Notifications on the new connection are delivered again
+        payload = json.dumps({"org_id": 1, "events": [_event("2024-11-12")]})
+        connections[2].listeners[NOTIFY_CHANNEL](connections[2], 0, NOTIFY_CHANNEL, payload)
+        assert subscription.queue.get_nowait()["date"] == "2024-11-12"
+    finally:
+        await broker.stop()
+        user_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_user_invalidation_reaches_other_workers(monkeypatch):
+    """Test an invalidation is sent over NOTIFY and applied by listening workers."""
+    sent = []
+
+    class NotifyConnection(_FakeConnection):
+        async def execute(self, query, channel, payload):
+            sent.append(payload)
+
+    async def connect():
+        return NotifyConnection()
+
+    sender = PostgresScheduleEventBroker(queue_size=10, database_url="postgresql+asyncpg://u:p@db/app")
+    monkeypatch.setattr(sender, "_connect", connect)
+    receiver = PostgresScheduleEventBroker(queue_size=10, database_url="postgresql+asyncpg://u:p@db/app")
+    issued_at = time.time() - 1
+
+    await sender.invalidate_user(42)
+    user_cache.clear()
+    try:
+        assert len(sent) == 1
+        # Another worker only learns of it from the notification
+        assert not user_cache.invalidated_since(42, issued_at)
+        receiver._on_notify(None, 0, NOTIFY_CHANNEL, sent[0])
+        assert user_cache.invalidated_since(42, issued_at)
+        assert not user_cache.invalidated_since(43, issued_at)
+    finally:
+        user_cache.clear()
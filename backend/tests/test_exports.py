@@ -0,0 +1,153 @@
+"""Tests for calendar feeds and schedule exports."""
+
+import pytest
+from httpx import AsyncClient
+
+from app.core import database
+
+
+@pytest.fixture
+def stream_sessions(monkeypatch, test_session_factory):
+    """Point the sessions streaming responses open at the test database."""
+    monkeypatch.setattr(database, "AsyncSessionLocal", test_session_factory)
+
+
+@pytest.mark.asyncio
+async def test_revoked_feed_link_stops_serving(
+    client: AsyncClient,
+    admin_auth_headers,
+    schedule_data,
+    stream_sessions
+):
+    """Test a revoked calendar link returns 404 while other links keep working."""
+    group_id = schedule_data["group"].group_id
+    links = []
+    for _ in range(2):
+        response = await client.get(
+            f"/api/v1/exports/ical/group/{group_id}/feed-url",
+            headers=admin_auth_headers
+        )
+        assert response.status_code == 200
+        links.append(response.json())
+    
+    response = await client.get(links[0]["url"])
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/calendar; charset=utf-8"
+    assert response.text.startswith("BEGIN:VCALENDAR")
+    
+    response = await client.delete(
+        f"/api/v1/exports/ical/feeds/{links[0]['feed_id']}",
+        headers=admin_auth_headers
+    )
+    assert response.status_code == 200
+    
+    assert (await client.get(links[0]["url"])).status_code == 404
+    assert (await client.get(links[1]["url"])).status_code == 200
+    
+    response = await client.get("/api/v1/exports/ical/feeds", headers=admin_auth_headers)
+    assert [feed["feed_id"] for feed in response.json()] == [links[1]["feed_id"]]
+
+
+@pytest.mark.asyncio
+async def test_forged_feed_token_not_found(client: AsyncClient):
+    """Test a token that is not a feed token is rejected."""
+    response = await client.get("/api/v1/exports/ical/feed/not-a-token.ics")
+    
+    assert response.status_code == 404
+
+
+async def _add_lessons(db_session, user, schedule_data):
+    from datetime import date
+    from app.models import LessonInstance, LessonStatus
+    
+    schedule_data["course"].name = "R&D <Lab>"
+    db_session.add_all([
+        LessonInstance(
+            org_id=user.org_id,
+            term_id=schedule_data["term"].term_id,
+            date=date(2024, 11, 11),
+            slot_id=slot.slot_id,
+            room_id=schedule_data["rooms"][0].room_id,
+            enrollment_id=schedule_data["enrollment"].enrollment_id,
+            status=LessonStatus.PLANNED,
+            created_by=user.user_id
+        )
+        for slot in schedule_data["slots"]
+    ])
+    await db_session.commit()
+
+
+EXPECTED_EXPORT_ROWS = [
+    ["date", "start_time", "end_time", "course", "course_type", "teacher", "group", "room", "building", "status"],
+    ["2024-11-11", "09:00", "10:30", "R&D <Lab>", "lecture", "Test Teacher", "Test Group", "101", None, "PLANNED"],
+    ["2024-11-11", "10:40", "12:10", "R&D <Lab>", "lecture", "Test Teacher", "Test Group", "101", None, "PLANNED"]
+]
+
+
+@pytest.mark.asyncio
+async def test_export_schedule_csv(
+    client: AsyncClient,
+    db_session,
+    test_admin_user,
+    admin_auth_headers,
+    schedule_data,
+    stream_sessions
+):
+    """Test the CSV export has a BOM, a header row and one row per lesson."""
+    import csv
+    import io
+    
+    await _add_lessons(db_session, test_admin_user, schedule_data)
+    
+    response = await client.get(
+        "/api/v1/exports/schedule",
+        params={"start_date": "2024-11-01", "end_date": "2024-11-30", "format": "csv"},
+        headers=admin_auth_headers
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"] == 'attachment; filename="schedule-20241101-20241130.csv"'
+    assert response.content.startswith("﻿".encode("utf-8"))
+    rows = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+    assert rows == [[cell or "" for cell in row] for row in EXPECTED_EXPORT_ROWS]
+
+
+@pytest.mark.asyncio
+async def test_export_schedule_xlsx(
+    client: AsyncClient,
+    db_session,
+    test_admin_user,
+    admin_auth_headers,
+    schedule_data,
+    stream_sessions
+):
+    """Test the streamed XLSX export opens as a workbook with the same rows."""
+    import io
+    from openpyxl import load_workbook
+    
+    await _add_lessons(db_session, test_admin_user, schedule_data)
+    
+    response = await client.get(
+        "/api/v1/exports/schedule",
+        params={"start_date": "2024-11-01", "end_date": "2024-11-30", "format": "xlsx"},
+        headers=admin_auth_headers
+    )
+    
+    assert response.status_code == 200
+    workbook = load_workbook(io.BytesIO(response.content), read_only=True)
+    sheet = workbook.worksheets[0]
+    assert sheet.title == "Schedule"
+    assert [list(row) for row in sheet.iter_rows(values_only=True)] == EXPECTED_EXPORT_ROWS
+
+
+@pytest.mark.asyncio
+async def test_export_schedule_single_resource(client: AsyncClient, admin_auth_headers):
+    """Test only one resource filter is accepted."""
+    response = await client.get(
+        "/api/v1/exports/schedule",
+        params={"start_date": "2024-11-01", "end_date": "2024-11-30", "teacher_id": 1, "group_id": 1},
+        headers=admin_auth_headers
+    )
+    
+    assert response.status_code == 400
@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import (
     Group, Teacher, Course, CourseAssignment, Enrollment, 
-    Room, TimeTableSlot, Term, AcademicYear, HoursUnit
+    Room, TimeTableSlot, Term, AcademicYear
 )
 
 
@@ -99,7 +99,7 @@ async def test_basic_data(db_session: AsyncSession, test_organization):
         assignment_id=assignment.assignment_id,
         group_id=group.group_id,
         planned_hours=2,
-        unit=HoursUnit.per_week
+        unit="per_week"
     )
     db_session.add(enrollment)
     await db_session.flush()
@@ -168,6 +168,10 @@ async def test_generation_preview(
     assert "stats" in data
     assert "success" in data
     assert isinstance(data["proposals"], list)
+    
+    phases = [phase["name"] for phase in data["stats"]["profile"]["phases"]]
+    assert "load.enrollments" in phases
+    assert "search" in phases
 
 
 @pytest.mark.asyncio
@@ -225,3 +229,115 @@ async def test_generation_wrong_organization(
     )
     
     assert response.status_code == 403
+
+
+def test_generation_profile_phases():
+    """Test phases are recorded in order with their object counts."""
+    from app.services.generation_profile import GenerationProfile
+    
+    profile = GenerationProfile(trace_memory=False)
+    with profile.phase("load") as objects:
+        objects["rows"] = 3
+    phase = profile.begin("solve")
+    phase.end(variables=10)
+    profile.add("presolve", 0.25, constraints=4)
+    profile.close()
+    
+    report = profile.as_dict()
+    assert [phase["name"] for phase in report["phases"]] == ["load", "solve", "presolve"]
+    assert report["phases"][0]["objects"] == {"rows": 3}
+    assert report["phases"][1]["objects"] == {"variables": 10}
+    assert report["phases"][2] == {"name": "presolve", "wall_seconds": 0.25, "objects": {"constraints": 4}}
+    assert "py_peak_mb" not in report["phases"][0]
+    assert report["wall_seconds"] >= 0 and report["peak_rss_mb"] > 0
+
+
+def test_generation_profile_traces_memory():
+    """Test memory tracing adds the heap peak and stops with the profile."""
+    import tracemalloc
+    from app.services.generation_profile import GenerationProfile
+    
+    profile = GenerationProfile(trace_memory=True)
+    with profile.phase("allocate"):
+        data = [0] * 100000
+    profile.close()
+    
+    assert profile.phases[0]["py_peak_mb"] > 0
+    assert not tracemalloc.is_tracing()
+    del data
+
+
+@pytest.mark.asyncio
+async def test_generation_run_records_job(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    methodist_auth_headers,
+    test_organization,
+    test_basic_data
+):
+    """Test a run saves a completed generation job with its phase profile."""
+    from sqlalchemy import select
+    from app.models import GenerationJob, GenerationStatus, LessonInstance
+    
+    response = await client.post(
+        "/api/v1/generation/run",
+        headers=methodist_auth_headers,
+        json={
+            "term_id": test_basic_data["term"].term_id,
+            "from_date": "2024-11-11",
+            "to_date": "2024-11-17"
+        }
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created_lessons"] > 0
+    assert data["stats"]["generation_time"].endswith("s")
+    
+    job = (await db_session.execute(
+        select(GenerationJob).where(GenerationJob.org_id == test_organization.org_id)
+    )).scalar_one()
+    assert job.status == GenerationStatus.COMPLETED
+    phases = [phase["name"] for phase in job.result_json["stats"]["profile"]["phases"]]
+    assert "persist.insert" in phases
+    assert "persist.commit" in phases
+    lessons = (await db_session.execute(select(LessonInstance))).scalars().all()
+    assert len(lessons) == data["created_lessons"]
+
+
+@pytest.mark.asyncio
+async def test_generation_run_failure_records_job(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    methodist_auth_headers,
+    test_organization,
+    test_basic_data,
+    monkeypatch
+):
+    """Test a run that raises still leaves a failed job with the error."""
+    from sqlalchemy import select
+    from app.models import GenerationJob, GenerationStatus
+    from app.routers import generation
+    
+    async def broken_preview(*args, **kwargs):
+        raise RuntimeError("solver exploded")
+    
+    monkeypatch.setattr(generation, "_preview_generation_internal", broken_preview)
+    
+    response = await client.post(
+        "/api/v1/generation/run",
+        headers=methodist_auth_headers,
+        json={
+            "term_id": test_basic_data["term"].term_id,
+            "from_date": "2024-11-11",
+            "to_date": "2024-11-17"
+        }
+    )
+    
+    assert response.json()["success"] is False
+    job = (await db_session.execute(
+        select(GenerationJob).where(GenerationJob.org_id == test_organization.org_id)
+    )).scalar_one()
+    assert job.status == GenerationStatus.FAILED
+    assert job.error == "solver exploded"
+    assert "profile" in job.result_json["stats"]
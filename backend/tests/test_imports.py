@@ -0,0 +1,85 @@
+"""Tests for catalog imports."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.educational import Group
+
+
+def _csv(text: str):
+    return {"file": ("catalog.csv", text.encode("utf-8"), "text/csv")}
+
+
+@pytest.mark.asyncio
+async def test_import_groups_upserts_by_name(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_admin_user,
+    admin_auth_headers
+):
+    """Test a re-import updates existing groups instead of duplicating them."""
+    response = await client.post(
+        "/api/v1/imports/groups",
+        headers=admin_auth_headers,
+        files=_csv("name;size\nA-1;20\nB-1;30\n")
+    )
+    assert response.status_code == 200
+    assert response.json()["upserted"] == 2
+    
+    response = await client.post(
+        "/api/v1/imports/groups",
+        headers=admin_auth_headers,
+        files=_csv("name,size\nB-1,35\nC-1,15\n")
+    )
+    assert response.status_code == 200
+    assert response.json()["upserted"] == 2
+    
+    result = await db_session.execute(
+        select(Group.name, Group.size)
+        .where(Group.org_id == test_admin_user.org_id)
+        .order_by(Group.name)
+    )
+    assert result.all() == [("A-1", 20), ("B-1", 35), ("C-1", 15)]
+
+
+@pytest.mark.asyncio
+async def test_import_reports_row_errors(client: AsyncClient, admin_auth_headers, schedule_data):
+    """Test invalid rows are reported by line while valid rows are imported."""
+    response = await client.post(
+        "/api/v1/imports/enrollments",
+        headers=admin_auth_headers,
+        files=_csv(
+            "group,course,teacher_email,planned_hours\n"
+            "Test Group,Test Subject,nobody@test.com,2\n"
+            ",Test Subject,nobody@test.com,2\n"
+            "Test Group,Unknown,nobody@test.com,two\n"
+        )
+    )
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["processed"] == 3
+    assert body["upserted"] == 0
+    assert body["error_count"] == 3
+    assert body["errors"] == [
+        {"row": 2, "errors": ["Unknown teacher 'nobody@test.com'"]},
+        {"row": 3, "errors": ["group is required"]},
+        {"row": 4, "errors": ["planned_hours: invalid value 'two'"]}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_missing_columns(client: AsyncClient, admin_auth_headers):
+    """Test a file without required columns is rejected on the header row."""
+    response = await client.post(
+        "/api/v1/imports/teachers",
+        headers=admin_auth_headers,
+        files=_csv("email\nteacher@test.com\n")
+    )
+    
+    assert response.status_code == 200
+    assert response.json()["errors"] == [
+        {"row": 1, "errors": ["Missing required columns: first_name, last_name"]}
+    ]
@@ -0,0 +1,425 @@
+"""Tests for lesson writes and conflict detection."""
+
+import pytest
+from datetime import date, datetime, timezone
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import LessonInstance, LessonStatus, LessonTombstone
+from app.repositories.lesson import (
+    LessonRepository, conflicts_from_integrity_error, ROOM_CONFLICT, TEACHER_CONFLICT, GROUP_CONFLICT
+)
+
+
+def _lesson(schedule_data, user, slot: int = 0, room: int = 0, **fields) -> dict:
+    lesson = {
+        "org_id": user.org_id,
+        "term_id": schedule_data["term"].term_id,
+        "date": date(2024, 11, 11),
+        "slot_id": schedule_data["slots"][slot].slot_id,
+        "room_id": schedule_data["rooms"][room].room_id,
+        "enrollment_id": schedule_data["enrollment"].enrollment_id,
+        "status": LessonStatus.PLANNED,
+        "created_by": user.user_id
+    }
+    lesson.update(fields)
+    return lesson
+
+
+@pytest.mark.asyncio
+async def test_double_booked_teacher_and_group_rejected(
+    db_session: AsyncSession,
+    test_admin_user,
+    schedule_data
+):
+    """Test the clash indexes reject a second lesson of the same enrollment in another room."""
+    lesson_repo = LessonRepository(db_session)
+    first = await lesson_repo.create(_lesson(schedule_data, test_admin_user))
+    
+    assert first.teacher_id == schedule_data["teacher"].teacher_id
+    assert first.group_id == schedule_data["group"].group_id
+    
+    with pytest.raises(IntegrityError) as error:
+        await lesson_repo.create(_lesson(schedule_data, test_admin_user, room=1))
+    await db_session.rollback()
+    
+    # The database reports the first clash index it hits
+    conflicts = conflicts_from_integrity_error(error.value)
+    assert len(conflicts) == 1
+    assert conflicts[0] in (TEACHER_CONFLICT, GROUP_CONFLICT)
+
+
+@pytest.mark.asyncio
+async def test_move_into_occupied_slot_conflicts(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_admin_user,
+    admin_auth_headers,
+    schedule_data
+):
+    """Test moving a lesson onto its group's other lesson returns 409."""
+    first = LessonInstance(**_lesson(schedule_data, test_admin_user))
+    second = LessonInstance(**_lesson(schedule_data, test_admin_user, slot=1, room=1))
+    db_session.add_all([first, second])
+    await db_session.commit()
+    
+    response = await client.patch(
+        f"/api/v1/lessons/{second.lesson_id}",
+        headers=admin_auth_headers,
+        json={"slot_id": first.slot_id}
+    )
+    
+    assert response.status_code == 409
+    assert response.json()["error"]["message"]["conflicts"][0] in (TEACHER_CONFLICT, GROUP_CONFLICT)
+
+
+@pytest.mark.asyncio
+async def test_changes_merge_lessons_and_tombstones(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_admin_user,
+    admin_auth_headers,
+    schedule_data
+):
+    """Test /changes interleaves updates and deletions by change number across pages."""
+    db_session.add_all([
+        LessonInstance(**_lesson(schedule_data, test_admin_user, change_seq=1)),
+        LessonInstance(**_lesson(schedule_data, test_admin_user, slot=1, change_seq=4)),
+        LessonTombstone(org_id=test_admin_user.org_id, lesson_id=900, date=date(2024, 11, 12), change_seq=2),
+        LessonTombstone(org_id=test_admin_user.org_id, lesson_id=901, date=date(2024, 11, 13), change_seq=5)
+    ])
+    await db_session.commit()
+    
+    response = await client.get("/api/v1/lessons/changes?since=0&limit=3", headers=admin_auth_headers)
+    
+    assert response.status_code == 200
+    page = response.json()
+    assert [change["change_seq"] for change in page["changes"]] == [1, 4]
+    assert [deletion["lesson_id"] for deletion in page["deleted"]] == [900]
+    assert page["next_since"] == 4
+    assert page["has_more"] is True
+    
+    response = await client.get(
+        f"/api/v1/lessons/changes?since={page['next_since']}&limit=3",
+        headers=admin_auth_headers
+    )
+    
+    page = response.json()
+    assert page["changes"] == []
+    assert [deletion["change_seq"] for deletion in page["deleted"]] == [5]
+    assert page["next_since"] == 5
+    assert page["has_more"] is False
+
+
+@pytest.mark.asyncio
+async def test_changes_after_pruned_tombstones_require_resync(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_admin_user,
+    admin_auth_headers
+):
+    """Test pruning old tombstones sends older cursors back to a full sync."""
+    org_id = test_admin_user.org_id
+    db_session.add_all([
+        LessonTombstone(
+            org_id=org_id, lesson_id=900, date=date(2024, 11, 12), change_seq=3,
+            deleted_at=datetime(2024, 1, 1, tzinfo=timezone.utc)
+        ),
+        LessonTombstone(org_id=org_id, lesson_id=901, date=date(2024, 11, 13), change_seq=7)
+    ])
+    await db_session.commit()
+    
+    pruned = await LessonRepository(db_session).prune_tombstones(datetime(2024, 6, 1, tzinfo=timezone.utc))
+    await db_session.commit()
+    
+    assert pruned == 1
+    response = await client.get("/api/v1/lessons/changes?since=2", headers=admin_auth_headers)
+    assert response.status_code == 410
+    response = await client.get("/api/v1/lessons/changes?since=3", headers=admin_auth_headers)
+    assert [deletion["lesson_id"] for deletion in response.json()["deleted"]] == [901]
+
+
+def _bulk_row(schedule_data, slot: int = 0, room: int = 0, **fields) -> dict:
+    row = {
+        "date": date(2024, 11, 11),
+        "slot_id": schedule_data["slots"][slot].slot_id,
+        "room_id": schedule_data["rooms"][room].room_id,
+        "enrollment_id": schedule_data["enrollment"].enrollment_id,
+        "status": LessonStatus.PLANNED
+    }
+    row.update(fields)
+    return row
+
+
+async def _lesson_count(db_session: AsyncSession) -> int:
+    return await db_session.scalar(select(func.count()).select_from(LessonInstance))
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_valid_batch(db_session: AsyncSession, test_admin_user, schedule_data):
+    """Test a clean batch is inserted with teacher and group stamped."""
+    lesson_repo = LessonRepository(db_session)
+    
+    results = await lesson_repo.bulk_create(test_admin_user.org_id, test_admin_user.user_id, [
+        _bulk_row(schedule_data, slot=0),
+        _bulk_row(schedule_data, slot=1)
+    ])
+    await db_session.commit()
+    
+    assert [row["errors"] for row in results] == [[], []]
+    assert all(row["lesson_id"] for row in results)
+    lesson = await lesson_repo.get_by_id(results[0]["lesson_id"])
+    assert lesson.term_id == schedule_data["term"].term_id
+    assert lesson.teacher_id == schedule_data["teacher"].teacher_id
+    assert lesson.group_id == schedule_data["group"].group_id
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_rejects_clashes_within_batch(db_session: AsyncSession, test_admin_user, schedule_data):
+    """Test later rows are checked against earlier rows of the same batch."""
+    lesson_repo = LessonRepository(db_session)
+    
+    results = await lesson_repo.bulk_create(test_admin_user.org_id, test_admin_user.user_id, [
+        _bulk_row(schedule_data, slot=0, room=0),
+        _bulk_row(schedule_data, slot=0, room=1),
+        _bulk_row(schedule_data, slot=1, room=0, status=LessonStatus.CANCELLED),
+        _bulk_row(schedule_data, slot=1, room=0)
+    ], atomic=True)
+    
+    assert results[0]["errors"] == []
+    assert results[1]["errors"] == [TEACHER_CONFLICT, GROUP_CONFLICT]
+    assert results[2]["errors"] == []
+    assert results[3]["errors"] == [ROOM_CONFLICT]
+    # Atomic: one rejected row keeps the whole batch out
+    assert all(row["lesson_id"] is None for row in results)
+    assert await _lesson_count(db_session) == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_partial_success(db_session: AsyncSession, test_admin_user, schedule_data):
+    """Test a non-atomic batch inserts its clean rows and reports the rest."""
+    lesson_repo = LessonRepository(db_session)
+    await lesson_repo.create(_lesson(schedule_data, test_admin_user, slot=0, room=0))
+    
+    results = await lesson_repo.bulk_create(test_admin_user.org_id, test_admin_user.user_id, [
+        _bulk_row(schedule_data, slot=0, room=1),
+        _bulk_row(schedule_data, slot=1, room=1),
+        _bulk_row(schedule_data, slot=1, room=0, date=date(2030, 1, 7)),
+        _bulk_row(schedule_data, slot=1, room=0, enrollment_id=999999)
+    ])
+    await db_session.commit()
+    
+    assert results[0]["errors"] == [TEACHER_CONFLICT, GROUP_CONFLICT]
+    assert results[1]["errors"] == [] and results[1]["lesson_id"] is not None
+    assert results[2]["errors"] == ["No term covers this date"]
+    assert results[3]["errors"] == ["Enrollment not found"]
+    assert await _lesson_count(db_session) == 2
+
+
+
+@pytest.mark.asyncio
+async def test_check_conflicts_batch(db_session: AsyncSession, test_admin_user, schedule_data):
+    """Test each candidate gets its own conflicts, in input order."""
+    lesson_repo = LessonRepository(db_session)
+    lesson = await lesson_repo.create(_lesson(schedule_data, test_admin_user, slot=0, room=0))
+    await lesson_repo.create(_lesson(
+        schedule_data, test_admin_user, slot=1, room=1, status=LessonStatus.CANCELLED
+    ))
+    candidate = {
+        "date": date(2024, 11, 11),
+        "enrollment_id": schedule_data["enrollment"].enrollment_id
+    }
+    slots = [slot.slot_id for slot in schedule_data["slots"]]
+    rooms = [room.room_id for room in schedule_data["rooms"]]
+    
+    conflicts = await lesson_repo.check_conflicts_batch(test_admin_user.org_id, [
+        {**candidate, "slot_id": slots[0], "room_id": rooms[0]},
+        {**candidate, "slot_id": slots[0], "room_id": rooms[1]},
+        {**candidate, "slot_id": slots[0]},
+        {**candidate, "slot_id": slots[0], "room_id": rooms[0], "exclude_lesson_id": lesson.lesson_id},
+        {**candidate, "slot_id": slots[1], "room_id": rooms[1]},
+        {**candidate, "slot_id": slots[0], "date": date(2024, 11, 12)}
+    ])
+    
+    assert conflicts == [
+        [ROOM_CONFLICT, TEACHER_CONFLICT, GROUP_CONFLICT],
+        [TEACHER_CONFLICT, GROUP_CONFLICT],
+        [TEACHER_CONFLICT, GROUP_CONFLICT],
+        [],
+        [],
+        []
+    ]
+    assert await lesson_repo.check_conflicts_batch(test_admin_user.org_id, []) == []
+
+
+def _create_payload(schedule_data, org_id: int) -> dict:
+    return {
+        "org_id": org_id,
+        "date": "2024-11-11",
+        "slot_id": schedule_data["slots"][0].slot_id,
+        "room_id": schedule_data["rooms"][0].room_id,
+        "enrollment_id": schedule_data["enrollment"].enrollment_id,
+        "status": "scheduled"
+    }
+
+
+@pytest.mark.asyncio
+async def test_create_lesson_in_own_organization(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_admin_user,
+    admin_auth_headers,
+    schedule_data
+):
+    """Test a created lesson gets its term, author and a planned status."""
+    response = await client.post(
+        "/api/v1/lessons/",
+        headers=admin_auth_headers,
+        json=_create_payload(schedule_data, test_admin_user.org_id)
+    )
+    
+    assert response.status_code == 200
+    assert response.json()["status"] == "PLANNED"
+    lesson = await db_session.get(LessonInstance, response.json()["lesson_id"])
+    assert lesson.term_id == schedule_data["term"].term_id
+    assert lesson.created_by == test_admin_user.user_id
+
+
+@pytest.mark.asyncio
+async def test_create_lesson_for_another_organization_rejected(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_admin_user,
+    admin_auth_headers,
+    schedule_data
+):
+    """Test a client-supplied org_id cannot place a lesson in another organization."""
+    response = await client.post(
+        "/api/v1/lessons/",
+        headers=admin_auth_headers,
+        json=_create_payload(schedule_data, test_admin_user.org_id + 1)
+    )
+    
+    assert response.status_code == 403
+    assert await _lesson_count(db_session) == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduling_create_for_another_organization_rejected(
+    db_session: AsyncSession,
+    test_admin_user,
+    schedule_data
+):
+    """Test the scheduling API rejects a lesson for another organization."""
+    from fastapi import HTTPException
+    from app.routers import scheduling
+    from app.schemas.scheduling import LessonInstanceCreate
+    
+    payload = _lesson(schedule_data, test_admin_user, org_id=test_admin_user.org_id + 1)
+    payload.pop("created_by")
+    
+    with pytest.raises(HTTPException) as error:
+        await scheduling.create_lesson(LessonInstanceCreate(**payload), db_session, test_admin_user)
+    
+    assert error.value.status_code == 403
+    assert await _lesson_count(db_session) == 0
+
+
+@pytest.mark.asyncio
+async def test_update_lesson_bumps_version(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_admin_user,
+    test_methodist_user,
+    methodist_auth_headers,
+    schedule_data
+):
+    """Test a PATCH records its author, bumps the version and enforces it."""
+    lesson = LessonInstance(**_lesson(schedule_data, test_admin_user))
+    db_session.add(lesson)
+    await db_session.commit()
+    
+    response = await client.patch(
+        f"/api/v1/lessons/{lesson.lesson_id}",
+        headers=methodist_auth_headers,
+        json={"room_id": schedule_data["rooms"][1].room_id, "version": 1}
+    )
+    assert response.status_code == 200
+    await db_session.refresh(lesson)
+    assert lesson.version == 2
+    assert lesson.updated_by == test_methodist_user.user_id
+    
+    stale = await client.patch(
+        f"/api/v1/lessons/{lesson.lesson_id}",
+        headers=methodist_auth_headers,
+        json={"room_id": schedule_data["rooms"][0].room_id, "version": 1}
+    )
+    assert stale.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_scheduling_delete_cancels_lesson(
+    db_session: AsyncSession,
+    test_admin_user,
+    schedule_data,
+    monkeypatch
+):
+    """Test the scheduling API deletes like the lessons API: cancel and keep the row."""
+    from app.routers import scheduling
+    
+    published = []
+    
+    async def publish(org_id, events):
+        published.extend(events)
+    
+    monkeypatch.setattr(scheduling.schedule_events, "publish", publish)
+    lesson = LessonInstance(**_lesson(schedule_data, test_admin_user))
+    db_session.add(lesson)
+    await db_session.commit()
+    
+    await scheduling.delete_lesson(lesson.lesson_id, db_session, test_admin_user)
+    
+    await db_session.refresh(lesson)
+    assert lesson.status == LessonStatus.CANCELLED
+    assert lesson.version == 2
+    assert [(event["kind"], event["changed"]) for event in published] == [("updated", ["status"])]
+
+
+@pytest.mark.asyncio
+async def test_listings_match_lesson_response(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_admin_user,
+    admin_auth_headers,
+    schedule_data
+):
+    """Test listings serialized with orjson are exactly what response_model validation would return."""
+    from app.schemas.lessons import LessonResponse
+    
+    lessons = [
+        LessonInstance(**_lesson(schedule_data, test_admin_user)),
+        LessonInstance(**_lesson(schedule_data, test_admin_user, slot=1, room=1, status=LessonStatus.CONFIRMED))
+    ]
+    db_session.add_all(lessons)
+    await db_session.commit()
+    
+    for url in (
+        "/api/v1/lessons/?date=2024-11-11",
+        "/api/v1/lessons/by-date/2024-11-11",
+        "/api/v1/lessons/term?start_date=2024-11-11&end_date=2024-11-17"
+    ):
+        response = await client.get(url, headers=admin_auth_headers)
+        assert response.status_code == 200
+        rows = response.json()
+        assert [row["lesson_id"] for row in rows] == [lesson.lesson_id for lesson in lessons]
+        
+        for row in rows:
+            assert LessonResponse.model_validate(row).model_dump(mode="json") == row
+            # Same payload as the single-lesson endpoint, which goes through response_model
+            single = await client.get(f"/api/v1/lessons/{row['lesson_id']}", headers=admin_auth_headers)
+            assert single.json() == row
+        
+        assert [row["date"] for row in rows] == ["2024-11-11", "2024-11-11"]
+        assert [row["status"] for row in rows] == ["PLANNED", "CONFIRMED"]
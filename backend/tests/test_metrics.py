@@ -0,0 +1,41 @@
+"""Tests for the Prometheus metrics endpoint."""
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.metrics import MetricsRegistry
+
+
+def test_histogram_exposition():
+    """Test histogram buckets are cumulative and labels escaped."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route='/a/"b"')
+    histogram.observe(0.5, route='/a/"b"')
+    histogram.observe(5, route='/a/"b"')
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{route="/a/\\"b\\"",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a/\\"b\\"",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a/\\"b\\"",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a/\\"b\\""} 3' in lines
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client: AsyncClient, test_admin_user):
+    """Test request latency is reported by route template."""
+    await client.post("/api/v1/auth/login", json={
+        "email": test_admin_user.email,
+        "password": "testpass"
+    })
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/v1/auth/login",status="200"}' in body
+    assert "user_cache_hit_ratio" in body
+    assert "schedule_event_subscribers 0" in body
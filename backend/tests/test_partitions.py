@@ -0,0 +1,174 @@
+"""Tests for monthly partition helpers and the nightly maintenance job."""
+
+import importlib.util
+import os
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from app.models import LessonTombstone
+from app.services.partitions import (
+    _bounds, add_months, archive_partitions, create_partitions, month_start, partition_name
+)
+
+
+def test_add_months_across_years():
+    """Test month arithmetic wraps years in both directions."""
+    assert add_months(date(2024, 11, 1), 1) == date(2024, 12, 1)
+    assert add_months(date(2024, 12, 1), 1) == date(2025, 1, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert add_months(date(2024, 3, 1), -14) == date(2023, 1, 1)
+    assert add_months(date(2024, 3, 1), 24) == date(2026, 3, 1)
+    assert add_months(month_start(date(2024, 1, 31)), 1) == date(2024, 2, 1)
+
+
+def test_partition_name():
+    """Test partition names sort in month order."""
+    assert partition_name("lesson_instances", date(2024, 3, 1)) == "lesson_instances_p2024_03"
+    assert partition_name("change_logs", date(2025, 12, 1)) == "change_logs_p2025_12"
+
+
+def test_bounds_by_column_type():
+    """Test date partitions get date bounds and timestamp partitions UTC midnights."""
+    assert _bounds("lesson_instances", date(2024, 12, 1)) == ("2024-12-01", "2025-01-01")
+    assert _bounds("change_logs", date(2024, 12, 1)) == (
+        "2024-12-01 00:00:00+00", "2025-01-01 00:00:00+00"
+    )
+
+
+
+class _RecordingSession:
+    """Session stand-in answering the catalog queries and recording DDL."""
+
+    def __init__(self, partitions=(), default_has_rows=False):
+        self.partitions = list(partitions)
+        self.default_has_rows = default_has_rows
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        if "pg_inherits" in sql:
+            return [(name,) for name in self.partitions]
+        if "_default WHERE" in sql:
+            return SimpleNamespace(scalar=lambda: self.default_has_rows)
+        self.statements.append(sql)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("table, start, end", [
+    ("lesson_instances", "{}", "{}"),
+    ("change_logs", "{} 00:00:00+00", "{} 00:00:00+00")
+])
+async def test_create_partitions_ddl(table, start, end):
+    """Test missing months are created with month bounds and existing ones are skipped."""
+    this_month = month_start(date.today())
+    db = _RecordingSession(partitions=[partition_name(table, this_month), f"{table}_default"])
+
+    created = await create_partitions(db, table, add_months(this_month, 2))
+
+    months = [add_months(this_month, 1), add_months(this_month, 2)]
+    assert created == [partition_name(table, month) for month in months]
+    assert db.statements == [
+        f"CREATE TABLE {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.format(month)}') TO ('{end.format(add_months(month, 1))}')"
+        for month in months
+    ]
+
+
+@pytest.mark.asyncio
+async def test_create_partitions_leaves_default_rows_alone():
+    """Test a month with rows in the DEFAULT partition is reported, not created."""
+    db = _RecordingSession(default_has_rows=True)
+
+    assert await create_partitions(db, "lesson_instances", month_start(date.today())) == []
+    assert db.statements == []
+
+
+@pytest.mark.asyncio
+async def test_archive_never_detaches_current_or_default():
+    """Test archiving with a cutoff in the future keeps the current month and DEFAULT attached."""
+    this_month = month_start(date.today())
+    old, last = add_months(this_month, -3), add_months(this_month, -1)
+    db = _RecordingSession(partitions=[
+        "lesson_instances_default",
+        partition_name("lesson_instances", add_months(this_month, 1)),
+        partition_name("lesson_instances", this_month),
+        partition_name("lesson_instances", last),
+        partition_name("lesson_instances", old)
+    ])
+
+    archived = await archive_partitions(db, "lesson_instances", add_months(this_month, 6), "archive")
+
+    assert archived == [partition_name("lesson_instances", old), partition_name("lesson_instances", last)]
+    detached = [sql for sql in db.statements if "DETACH" in sql]
+    assert detached == [f"ALTER TABLE lesson_instances DETACH PARTITION {name}" for name in archived]
+
+
+@pytest.mark.asyncio
+async def test_archive_honours_retention_cutoff():
+    """Test only months ending by the cutoff are detached, and dropped when asked."""
+    this_month = month_start(date.today())
+    names = [partition_name("change_logs", add_months(this_month, -offset)) for offset in (3, 2, 1)]
+    db = _RecordingSession(partitions=names)
+
+    archived = await archive_partitions(
+        db, "change_logs", add_months(this_month, -2), "archive", drop=True
+    )
+
+    assert archived == names[:1]
+    assert db.statements == [
+        f"ALTER TABLE change_logs DETACH PARTITION {names[0]}",
+        f"DROP TABLE {names[0]}"
+    ]
+
+
+def _load_maintenance_job():
+    path = os.path.join(os.path.dirname(__file__), "..", "scripts", "maintain_partitions.py")
+    spec = importlib.util.spec_from_file_location("maintain_partitions_job", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("dry_run", [False, True])
+async def test_nightly_job_prunes_tombstones_before_horizon(
+    monkeypatch,
+    db_session,
+    test_session_factory,
+    test_organization,
+    dry_run
+):
+    """Test the job prunes only tombstones older than LESSON_TOMBSTONE_RETENTION_DAYS."""
+    job = _load_maintenance_job()
+
+    async def maintain_partitions(session, **kwargs):
+        return {}
+
+    async def dispose():
+        pass
+
+    monkeypatch.setattr(job, "maintain_partitions", maintain_partitions)
+    monkeypatch.setattr(job, "AsyncSessionLocal", test_session_factory)
+    monkeypatch.setattr(job, "engine", SimpleNamespace(dispose=dispose))
+    monkeypatch.setattr(job.settings, "LESSON_TOMBSTONE_RETENTION_DAYS", 30)
+
+    now = datetime.now(timezone.utc)
+    db_session.add_all([
+        LessonTombstone(
+            org_id=test_organization.org_id, lesson_id=lesson_id, date=date(2024, 11, 11),
+            change_seq=change_seq, deleted_at=now - timedelta(days=age)
+        )
+        for lesson_id, change_seq, age in ((900, 1, 45), (901, 2, 31), (902, 3, 29))
+    ])
+    await db_session.commit()
+
+    await job.main(drop=False, dry_run=dry_run)
+
+    db_session.expire_all()
+    remaining = (await db_session.execute(
+        select(LessonTombstone.lesson_id).order_by(LessonTombstone.lesson_id)
+    )).scalars().all()
+    assert remaining == ([900, 901, 902] if dry_run else [902])
@@ -0,0 +1,57 @@
+"""Tests for the request sampling profiler."""
+
+import json
+
+from app.core.profiler import (
+    RequestProfile,
+    SamplingProfiler,
+    collapsed_stacks,
+    speedscope_json,
+)
+
+MAIN = ("main", "/app/main.py", 10)
+HANDLER = ("handler", "/app/api/lessons.py", 20)
+QUERY = ("query", "/app/repositories/lesson.py", 30)
+
+
+def _profile(*stacks):
+    profile = RequestProfile(None, "GET", "/api/v1/lessons")
+    for stack in stacks:
+        profile.add(stack)
+    return profile
+
+
+def test_collapsed_stacks():
+    """Test identical stacks are counted once, outermost frame first."""
+    profile = _profile((MAIN, HANDLER, QUERY), (MAIN, HANDLER, QUERY), (MAIN, HANDLER), (("<waiting>", "", 0),))
+
+    lines = collapsed_stacks(profile).splitlines()
+
+    assert lines[0] == "main (main.py:10);handler (lessons.py:20);query (lesson.py:30) 2"
+    assert "main (main.py:10);handler (lessons.py:20) 1" in lines
+    assert "<waiting> 1" in lines
+
+
+def test_speedscope_json():
+    """Test frames are shared between samples and weighted by the interval."""
+    profile = _profile((MAIN, HANDLER, QUERY), (MAIN, HANDLER))
+
+    document = json.loads(speedscope_json(profile, "GET /api/v1/lessons", 0.01))
+
+    frames = document["shared"]["frames"]
+    assert [frame["name"] for frame in frames] == ["main", "handler", "query"]
+    assert frames[2] == {"name": "query", "file": "/app/repositories/lesson.py", "line": 30}
+    sampled = document["profiles"][0]
+    assert sampled["samples"] == [[0, 1, 2], [0, 1]]
+    assert sampled["weights"] == [0.01, 0.01]
+    assert sampled["endValue"] == 0.02
+
+
+def test_allow_dump_rate_limit():
+    """Test dumps beyond the per-minute budget are refused and counted."""
+    profiler = SamplingProfiler(interval_seconds=0.01, max_dumps_per_minute=2, max_active=4)
+
+    assert profiler.allow_dump()
+    assert profiler.allow_dump()
+    assert not profiler.allow_dump()
+    assert profiler.stats()["rate_limited"] == 1
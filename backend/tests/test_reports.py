@@ -0,0 +1,236 @@
+"""Tests for schedule reports."""
+
+import pytest
+from datetime import date
+from httpx import AsyncClient
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    Course, CourseAssignment, Enrollment, Group, LessonInstance, LessonStatus, Teacher, WorkloadRollup
+)
+from app.services.workload_rollups import reconcile_workload_rollups
+
+
+async def _add_lessons(db_session: AsyncSession, user, schedule_data, placements) -> None:
+    """Lessons of the fixture enrollment, one per (date, slot index, status)."""
+    db_session.add_all([
+        LessonInstance(
+            org_id=user.org_id,
+            term_id=schedule_data["term"].term_id,
+            date=lesson_date,
+            slot_id=schedule_data["slots"][slot].slot_id,
+            room_id=schedule_data["rooms"][0].room_id,
+            enrollment_id=schedule_data["enrollment"].enrollment_id,
+            status=lesson_status,
+            created_by=user.user_id
+        )
+        for lesson_date, slot, lesson_status in placements
+    ])
+    await db_session.commit()
+
+
+WEEK_LESSONS = [
+    (date(2024, 11, 11), 0, LessonStatus.PLANNED),
+    (date(2024, 11, 11), 1, LessonStatus.CONFIRMED),
+    (date(2024, 11, 13), 0, LessonStatus.COMPLETED),
+    (date(2024, 11, 14), 0, LessonStatus.CANCELLED),
+    (date(2024, 11, 18), 0, LessonStatus.PLANNED)
+]
+
+
+async def _second_enrollment(db_session: AsyncSession, org_id: int) -> dict:
+    """Another group taught another course by another teacher."""
+    group = Group(org_id=org_id, name="Second Group", size=20)
+    teacher = Teacher(org_id=org_id, first_name="Second", last_name="Teacher")
+    course = Course(org_id=org_id, name="Second Subject", type="lecture")
+    db_session.add_all([group, teacher, course])
+    await db_session.flush()
+    
+    assignment = CourseAssignment(org_id=org_id, course_id=course.course_id, teacher_id=teacher.teacher_id)
+    db_session.add(assignment)
+    await db_session.flush()
+    
+    enrollment = Enrollment(
+        org_id=org_id,
+        assignment_id=assignment.assignment_id,
+        group_id=group.group_id,
+        planned_hours=2
+    )
+    db_session.add(enrollment)
+    await db_session.commit()
+    return {"assignment": assignment, "enrollment": enrollment}
+
+
+@pytest.mark.asyncio
+async def test_conflicts_report_finds_stale_teacher(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_admin_user,
+    admin_auth_headers,
+    schedule_data
+):
+    """Test a teacher clash hidden from the clash index by a stale lesson teacher_id is reported."""
+    org_id = test_admin_user.org_id
+    second = await _second_enrollment(db_session, org_id)
+    lessons = [
+        LessonInstance(
+            org_id=org_id,
+            term_id=schedule_data["term"].term_id,
+            date=date(2024, 11, 11),
+            slot_id=schedule_data["slots"][0].slot_id,
+            room_id=room.room_id,
+            enrollment_id=enrollment.enrollment_id,
+            status=LessonStatus.PLANNED,
+            created_by=test_admin_user.user_id
+        )
+        for room, enrollment in zip(schedule_data["rooms"], [schedule_data["enrollment"], second["enrollment"]])
+    ]
+    db_session.add_all(lessons)
+    await db_session.commit()
+    
+    response = await client.get(
+        "/api/v1/reports/conflicts",
+        params={"start_date": "2024-11-01", "end_date": "2024-11-30"},
+        headers=admin_auth_headers
+    )
+    assert response.json()["summary"]["total"] == 0
+    
+    # Reassigned behind the ORM's back; Postgres triggers would re-stamp the lessons
+    await db_session.execute(
+        update(CourseAssignment)
+        .where(CourseAssignment.assignment_id == second["assignment"].assignment_id)
+        .values(teacher_id=schedule_data["teacher"].teacher_id)
+    )
+    await db_session.commit()
+    
+    response = await client.get(
+        "/api/v1/reports/conflicts",
+        params={"start_date": "2024-11-01", "end_date": "2024-11-30"},
+        headers=admin_auth_headers
+    )
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["summary"]["total"] == 1
+    assert body["summary"]["teacher"] == {"conflicts": 1, "lessons": 2}
+    assert body["items"] == [{
+        "kind": "teacher",
+        "resource_id": schedule_data["teacher"].teacher_id,
+        "date": "2024-11-11",
+        "slot_id": schedule_data["slots"][0].slot_id,
+        "lesson_count": 2,
+        "lesson_ids": sorted(lesson.lesson_id for lesson in lessons)
+    }]
+
+
+@pytest.mark.asyncio
+async def test_teacher_workload_report(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_admin_user,
+    admin_auth_headers,
+    schedule_data
+):
+    """Test lessons are counted per status and bucketed by day within the range."""
+    await _add_lessons(db_session, test_admin_user, schedule_data, WEEK_LESSONS)
+    
+    response = await client.get(
+        "/api/v1/reports/workload/teacher",
+        params={"start_date": "2024-11-11", "end_date": "2024-11-17", "bucket": "day"},
+        headers=admin_auth_headers
+    )
+    
+    assert response.status_code == 200
+    [item] = response.json()["items"]
+    assert item["resource_id"] == schedule_data["teacher"].teacher_id
+    assert item["name"] == "Test Teacher"
+    assert item["total_lessons"] == 3
+    assert item["by_status"]["PLANNED"] == 1
+    assert item["by_status"]["CONFIRMED"] == 1
+    assert item["by_status"]["COMPLETED"] == 1
+    assert item["by_status"]["CANCELLED"] == 0
+    # 2 hours per week over one week
+    assert item["planned_hours"] == 2.0
+    # Slot minutes need Postgres interval arithmetic, so only lesson counts are checked
+    assert [(bucket["period"], bucket["lessons"]) for bucket in item["buckets"]] == [
+        ("2024-11-11", 2), ("2024-11-13", 1)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_group_workload_report_by_week(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_admin_user,
+    admin_auth_headers,
+    schedule_data
+):
+    """Test weekly buckets start on Monday and per-week hours scale with the range."""
+    await _add_lessons(db_session, test_admin_user, schedule_data, WEEK_LESSONS)
+    
+    response = await client.get(
+        "/api/v1/reports/workload/group",
+        params={"start_date": "2024-11-06", "end_date": "2024-11-20", "bucket": "week"},
+        headers=admin_auth_headers
+    )
+    
+    assert response.status_code == 200
+    [item] = response.json()["items"]
+    assert item["name"] == "Test Group"
+    assert item["total_lessons"] == 4
+    assert item["planned_hours"] == 6.0
+    assert [(bucket["period"], bucket["lessons"]) for bucket in item["buckets"]] == [
+        ("2024-11-11", 3), ("2024-11-18", 1)
+    ]
+
+
+
+@pytest.mark.asyncio
+async def test_reconcile_rebuilds_rollups(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_admin_user,
+    admin_auth_headers,
+    schedule_data
+):
+    """Test reconcile fills missing rollups, repairs drift and matches the raw report."""
+    org_id = test_admin_user.org_id
+    # No rollup triggers on SQLite, so every rollup row starts out missing
+    await _add_lessons(db_session, test_admin_user, schedule_data, WEEK_LESSONS)
+    
+    result = await reconcile_workload_rollups(db_session, org_id)
+    assert result["drifted_rows"] > 0 and result["repaired"]
+    assert (await reconcile_workload_rollups(db_session, org_id))["drifted_rows"] == 0
+    
+    rollup = await db_session.scalar(
+        select(WorkloadRollup).where(
+            WorkloadRollup.kind == "teacher",
+            WorkloadRollup.week_start == date(2024, 11, 11),
+            WorkloadRollup.status == LessonStatus.PLANNED
+        )
+    )
+    assert rollup.lesson_count == 1
+    rollup.lesson_count = 5
+    await db_session.commit()
+    
+    result = await reconcile_workload_rollups(db_session, org_id, repair=False)
+    assert result == {"org_id": org_id, "drifted_rows": 1, "repaired": False}
+    assert (await reconcile_workload_rollups(db_session, org_id))["repaired"]
+    
+    # Whole weeks are read from the rollups and must agree with the raw lessons
+    reports = []
+    for end_date in ("2024-11-24", "2024-11-23"):
+        response = await client.get(
+            "/api/v1/reports/workload/teacher",
+            params={"start_date": "2024-11-11", "end_date": end_date, "bucket": "week"},
+            headers=admin_auth_headers
+        )
+        [item] = response.json()["items"]
+        reports.append((
+            item["total_lessons"],
+            item["by_status"],
+            [(bucket["period"], bucket["lessons"]) for bucket in item["buckets"]]
+        ))
+    assert reports[0] == reports[1]
+    assert reports[0][0] == 4
@@ -0,0 +1,40 @@
+"""Tests for synthetic organization generation."""
+
+from dataclasses import replace
+
+from app.core.auth import verify_password
+from perf.synthetic import SIZE_LADDER, SYNTHETIC_PASSWORD, TABLE_COLUMNS, generate_org
+
+PASSWORD_HASH = TABLE_COLUMNS["users"].index("password_hash")
+
+
+def _rows(dataset):
+    """All rows of a dataset, with bcrypt's random salt masked out."""
+    rows = dict(dataset.rows)
+    assert verify_password(SYNTHETIC_PASSWORD, rows["users"][0][PASSWORD_HASH])
+    rows["users"] = [row[:PASSWORD_HASH] + row[PASSWORD_HASH + 1:] for row in rows["users"]]
+    rows["lesson_instances"] = list(dataset.iter_lessons())
+    return rows
+
+
+def test_same_seed_same_rows():
+    """Test a spec and seed always produce the same organization and lessons."""
+    spec = SIZE_LADDER["xs"]
+    
+    first = _rows(generate_org(spec))
+    second = _rows(generate_org(spec))
+    
+    assert first == second
+    assert first["lesson_instances"]
+
+
+def test_other_seed_other_rows():
+    """Test the seed drives the generated data, and ids continue after id_start."""
+    spec = SIZE_LADDER["xs"]
+    
+    base = _rows(generate_org(spec))
+    reseeded = _rows(generate_org(replace(spec, seed=spec.seed + 1)))
+    assert base["lesson_instances"] != reseeded["lesson_instances"]
+    
+    shifted = generate_org(spec, id_start={"groups": 100})
+    assert [row[0] for row in shifted.rows["groups"]][:2] == [101, 102]
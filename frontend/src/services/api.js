@@ -162,6 +162,7 @@ export const reportsAPI = {
   getGroupWorkload: (params) => api.get('/reports/workload/group', { params }),
   getConflicts: (params) => api.get('/reports/conflicts', { params }),
   exportIcal: (params) => api.get('/exports/ical', { params, responseType: 'blob' }),
+  exportSchedule: (params) => api.get('/exports/schedule', { params, responseType: 'blob' }),
 }
 
 // All APIs now use real backend